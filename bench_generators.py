@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark the movie page generators on synthetic catalogs
+Each (generator, size) case runs in its own subprocess against a temp output
+folder, so peak RSS is per case. Reports pages/sec, peak RSS, bytes written and
+the split between rendering and file I/O as JSON.
+Run this: python bench_generators.py --sizes 1k,10k,100k --output bench.json
+1M movies write roughly 12 GB of pages; pick --tmp on a disk with room.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import platform
+import resource
+import contextlib
+import subprocess
+import tracemalloc
+
+from movie_record import Movie
+from movie_template import render_movie_page
+
+DEFAULT_SIZES = '1k,10k'
+
+# firebase: build_pages() with a manifest, as in a full build
+# firebase-indexes: same plus slug registry, catalog and search index
+# simple: generate_movie_pages.py
+GENERATORS = ('firebase', 'firebase-indexes', 'simple')
+
+_LATIN_WORDS = ('sevgi', 'yulduz', 'tun', 'shahar', 'qalb', 'dengiz', 'yo‘l', 'bahor',
+                'o‘g‘il', 'shamol', 'night', 'city', 'last', 'dream', 'river', 'king')
+_CYRILLIC_WORDS = ('любовь', 'звезда', 'ночь', 'город', 'сердце', 'море', 'дорога', 'весна',
+                   'ўғил', 'шамол', 'қалб', 'ҳаёт', 'последний', 'мечта', 'река', 'король')
+_GENRES = ('Drama', 'Comedy', 'Action', 'Thriller', 'Fantasy', 'Melodrama', 'Horror', 'Documentary')
+
+
+def parse_size(text):
+    """'10k' / '1M' / '2500' -> int"""
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def synthetic_movies(count, seed=42):
+    """Yield Movie records shaped like Firestore documents, lazily"""
+    rng = random.Random(seed)
+    for i in range(count):
+        words = _CYRILLIC_WORDS if rng.random() < 0.5 else _LATIN_WORDS
+        title = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4))).capitalize()
+        original = ' '.join(rng.choice(_LATIN_WORDS) for _ in range(rng.randint(1, 3))).title()
+        sentence = ' '.join(rng.choice(words) for _ in range(12))
+        yield Movie(**{
+            'id': f'bench{i:07d}',
+            'title': f'{title} {i}',
+            'originalTitle': original,
+            'year': str(rng.randint(1960, 2025)),
+            # Long descriptions with characters every escaper has to touch
+            'description': (f'{sentence}. "Quotes" & <tags>, ' * rng.randint(5, 25)).strip(),
+            'genre': ', '.join(rng.sample(_GENRES, rng.randint(1, 3))),
+            'poster': f'https://example.com/posters/{i}.jpg',
+            'rating': f'{rng.randint(10, 99) / 10}/10',
+            'sndVotes': rng.randint(0, 5000),
+        })
+
+
+def dir_bytes(path):
+    """Total size of the files under path"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def peak_rss_bytes():
+    """Peak RSS of this process plus finished worker processes"""
+    scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss is KiB on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own, children
+
+
+def time_render(generator, count):
+    """Seconds spent building fields and rendering, with no file I/O"""
+    if generator == 'simple':
+        from generate_movie_pages import movie_page_fields
+    else:
+        from firebase_movie_generator import movie_page_fields
+    started = time.perf_counter()
+    for movie in synthetic_movies(count):
+        render_movie_page(movie_page_fields(movie))
+    return time.perf_counter() - started
+
+
+def run_generator(generator, count, output_dir, workers, mode):
+    """Generate every page once; returns seconds"""
+    started = time.perf_counter()
+    if generator == 'simple':
+        from generate_movie_pages import generate_movie_pages
+        generate_movie_pages(synthetic_movies(count), output_dir, workers, mode)
+    else:
+        import firebase_movie_generator as fmg
+        from movie_slugs import SlugRegistry
+        indexes, registry = (), None
+        if generator == 'firebase-indexes':
+            indexes = fmg.open_indexes(output_dir, fresh=True)
+            registry = SlugRegistry(os.path.join(output_dir, 'registry.json'))
+        fmg.build_pages(synthetic_movies(count), output_dir, {}, workers, mode, indexes=indexes, registry=registry)
+        if indexes:
+            fmg.save_indexes(indexes, verbose=False)
+            registry.save(output_dir)
+    return time.perf_counter() - started
+
+
+def trace_generator(generator, count, output_dir, workers, mode):
+    """Python heap of a second, traced run: (peak bytes, live blocks at the end)
+
+    Separate from the timed run because tracemalloc slows allocation down.
+    Retained blocks growing with the catalog size mean per-movie state.
+    """
+    tracemalloc.start()
+    try:
+        run_generator(generator, count, output_dir, workers, mode)
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+    return peak, blocks
+
+
+def run_case(generator, count, workers, mode, tmp_root, trace_memory=False):
+    """One benchmark case in this process; returns the result dict"""
+    output_dir = tempfile.mkdtemp(prefix='snd-bench-', dir=tmp_root)
+    traced_peak = retained_blocks = None
+    try:
+        # Page generators print one line per page; keep that out of the timing
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            render_seconds = time_render(generator, count)
+            total_seconds = run_generator(generator, count, output_dir, workers, mode)
+        bytes_written = dir_bytes(output_dir)
+        rss_self, rss_children = peak_rss_bytes()
+        if trace_memory:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            os.makedirs(output_dir)
+            with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+                traced_peak, retained_blocks = trace_generator(generator, count, output_dir, workers, mode)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    # Generation repeats the render work, so the rest of its time is I/O and overhead
+    io_seconds = max(0.0, total_seconds - render_seconds) if workers <= 1 else None
+    return {
+        'generator': generator,
+        'movies': count,
+        'workers': workers,
+        'mode': mode,
+        'seconds': round(total_seconds, 4),
+        'pages_per_sec': round(count / total_seconds, 1) if total_seconds else None,
+        'render_seconds': round(render_seconds, 4),
+        'io_seconds': round(io_seconds, 4) if io_seconds is not None else None,
+        'render_share': round(render_seconds / total_seconds, 3) if io_seconds is not None and total_seconds else None,
+        'bytes_written': bytes_written,
+        'bytes_per_page': round(bytes_written / count, 1) if count else 0,
+        'peak_rss_bytes': rss_self,
+        'peak_rss_children_bytes': rss_children,
+        'traced_peak_bytes': traced_peak,
+        'traced_peak_bytes_per_movie': round(traced_peak / count, 1) if traced_peak and count else None,
+        'retained_blocks': retained_blocks,
+    }
+
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the movie page generators on synthetic catalogs.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"Comma separated catalog sizes, e.g. 1k,10k,100k,1M (default: {DEFAULT_SIZES})")
+    parser.add_argument('--generators', default=','.join(GENERATORS),
+                        help=f"Comma separated subset of {', '.join(GENERATORS)}")
+    parser.add_argument('--workers', type=int, default=1, help="Pool size passed to the generators (default: 1)")
+    parser.add_argument('--mode', choices=('thread', 'process'), default='thread', help="Pool type")
+    parser.add_argument('--tmp', default=None, help="Folder for the temp output directories")
+    parser.add_argument('--output', default=None, help="Write the JSON report here instead of stdout")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Also run each case under tracemalloc and report Python heap peak and retained blocks")
+    parser.add_argument('--case', nargs=2, metavar=('GENERATOR', 'SIZE'), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.case:
+        # Child process: run one case and hand the result back on stdout
+        result = run_case(args.case[0], int(args.case[1]), args.workers, args.mode, args.tmp, args.trace_memory)
+        sys.stdout.write(json.dumps(result) + '\n')
+        return
+
+    generators = [g.strip() for g in args.generators.split(',') if g.strip()]
+    unknown = set(generators) - set(GENERATORS)
+    if unknown:
+        sys.exit(f"Unknown generator(s): {', '.join(sorted(unknown))}")
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+
+    results = []
+    for size in sizes:
+        for generator in generators:
+            print(f"Running {generator} on {size:,} movies...", file=sys.stderr)
+            command = [sys.executable, os.path.abspath(__file__), '--case', generator, str(size),
+                       '--workers', str(args.workers), '--mode', args.mode]
+            if args.tmp:
+                command += ['--tmp', args.tmp]
+            if args.trace_memory:
+                command.append('--trace-memory')
+            completed = subprocess.run(command, stdout=subprocess.PIPE, text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)))
+            if completed.returncode != 0:
+                print(f"ERROR: {generator} on {size:,} movies failed (exit {completed.returncode})", file=sys.stderr)
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"  {result['pages_per_sec']:,} pages/s, {result['bytes_written']:,} bytes, "
+                  f"peak RSS {result['peak_rss_bytes'] / 2 ** 20:.1f} MiB", file=sys.stderr)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"✓ Report written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,155 +3,580 @@
 Firebase Movie HTML Generator
 Fetches all movies from Firestore and generates individual HTML pages
 Run this: python firebase_movie_generator.py
+
+Delta run (only movies edited since the last run, plus deletions):
+    python firebase_movie_generator.py --since
+Run a full build now and then: it is the reconciliation pass that prunes
+pages of movies deleted without a tombstone.
+
+Offline builds from a local snapshot (no credentials or network needed):
+    python firebase_movie_generator.py --export-snapshot movies.ndjson.gz
+    python firebase_movie_generator.py --from-snapshot movies.ndjson.gz
+
+Daemon (regenerate pages within seconds of an edit in admin.html):
+    python firebase_movie_generator.py --daemon
+
+Against the local emulator (firebase emulators:start --only firestore):
+    FIRESTORE_EMULATOR_HOST=localhost:8080 python firebase_movie_generator.py
+
+Async client (full builds and exports): pages of movies and the related
+titles they reference are fetched with up to --concurrency requests in
+flight while earlier pages are rendered:
+    python firebase_movie_generator.py --async --concurrency 32
+
+Per-stage timings (p50/p95/p99) are printed after every run; add
+--metrics movie_run_metrics.jsonl to keep them, -v to list every page.
+
+Responsive posters (needs Pillow, see poster_pipeline.py):
+    python firebase_movie_generator.py --posters
+
+Store canonical slug, page URL, search tokens and page hash on the movie
+documents, writing only movies where one of them changed (movie_writeback.py):
+    python firebase_movie_generator.py --writeback
 """
 
 import os
+import sys
 import json
-import re
-import firebase_admin
-from firebase_admin import credentials, firestore
-
-# HTML template
-TEMPLATE_HTML = """<!DOCTYPE html>
-<html lang="uz">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta http-equiv="X-UA-Compatible" content="ie=edge">
-    
-    <!-- SEO Meta Tags -->
-    <title>{movie_title} ({movie_year}) - SND</title>
-    <meta name="description" content="{movie_description}">
-    <meta name="keywords" content="{movie_title}, {movie_original_title}, {movie_genre}, смотреть онлайн, SND, фильм, кино">
-    
-    <!-- Open Graph / Facebook -->
-    <meta property="og:type" content="video.movie">
-    <meta property="og:url" content="{page_url}">
-    <meta property="og:title" content="{movie_title} ({movie_year}) - SND">
-    <meta property="og:description" content="{movie_description}">
-    <meta property="og:image" content="{movie_poster}">
-    <meta property="og:site_name" content="SND - Streaming Network of Dreams">
-    
-    <!-- Twitter -->
-    <meta name="twitter:card" content="summary_large_image">
-    <meta name="twitter:url" content="{page_url}">
-    <meta name="twitter:title" content="{movie_title} ({movie_year}) - SND">
-    <meta name="twitter:description" content="{movie_description}">
-    <meta name="twitter:image" content="{movie_poster}">
-    
-    <!-- Canonical URL -->
-    <link rel="canonical" href="{page_url}">
-    
-    <!-- Favicon -->
-    <link rel="icon" type="image/x-icon" href="favicon.ico">
-    
-    <!-- Tailwind CSS -->
-    <script src="https://cdn.tailwindcss.com"></script>
-    
-    <!-- Font Awesome -->
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    
-    <!-- Structured Data -->
-    <script type="application/ld+json">
-    {{
-        "@context": "https://schema.org",
-        "@type": "Movie",
-        "name": "{movie_title}",
-        "alternateName": "{movie_original_title}",
-        "image": "{movie_poster}",
-        "description": "{movie_description}",
-        "datePublished": "{movie_year}-01-01",
-        "genre": "{movie_genre}",
-        "url": "{page_url}",
-        "aggregateRating": {{
-            "@type": "AggregateRating",
-            "ratingValue": "{movie_rating}",
-            "bestRating": "10",
-            "ratingCount": "{movie_votes}"
-        }}
-    }}
-    </script>
-    
-    <style>
-        body {{
-            background: #000;
-            color: #fff;
-            font-family: system-ui, -apple-system, sans-serif;
-        }}
-        .loading {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            min-height: 100vh;
-        }}
-    </style>
-</head>
-<body>
-    <div class="loading">
-        <i class="fas fa-spinner fa-spin text-white text-4xl"></i>
-    </div>
-    
-    <script>
-        // Redirect to main app with movie details hash
-        const movieId = '{movie_id}';
-        const movieSlug = '{movie_slug}';
+import time
+import queue
+import signal
+import asyncio
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+
+try:
+    from firebase_admin import firestore
+except ImportError:
+    # Offline builds with --from-snapshot don't need the Admin SDK
+    firestore = None
+
+from firestore_client import init_firestore, init_firestore_async, parse_timestamp
+from movie_template import TEMPLATE_VERSION, escape_html, render_movie_page
+from movie_record import Movie
+from movie_catalog import CatalogBuilder, format_stats as format_catalog_stats
+from movie_search import SearchIndexBuilder, format_stats as format_search_stats
+from movie_sitemap import SitemapWriter
+from movie_slugs import SlugRegistry, slugify, wanted_slug
+from movie_snapshot import iter_snapshot_batches, write_snapshot
+from movie_writeback import DERIVED_FIELDS, MAX_WRITE_RATE, DerivedFieldWriter
+from poster_pipeline import Image as PosterImage, PosterPipeline
+from precompress import precompress
+from run_metrics import METRICS_PATH, RunMetrics
+from page_writer import POOL_MODES, atomic_write, make_pool, prefetch, remove_file, run_pool
+
+# Build manifest (slug -> hash of rendered inputs), kept outside the assets folder
+MANIFEST_PATH = 'movie_pages_manifest.json'
+
+# Last fully processed document id, so a failed run can resume from there
+CHECKPOINT_PATH = 'movie_fetch_checkpoint.json'
+
+# Highest updatedAt (and deletedAt of tombstones) already turned into pages
+WATERMARK_PATH = 'movie_watermark.json'
+
+# admin.html writes {slug, deletedAt} here when it deletes a movie
+TOMBSTONE_COLLECTION = 'movieTombstones'
+
+# Only the fields movie_page_fields() reads are fetched from Firestore,
+# plus updatedAt for the delta watermark and the stored derived fields
+# that --writeback compares with
+PAGE_FIELDS = ('id', 'slug', 'title', 'year', 'originalTitle', 'description',
+               'genre', 'poster', 'rating', 'sndRating', 'sndVotes', 'updatedAt', 'related') + DERIVED_FIELDS
+
+DEFAULT_PAGE_SIZE = 500
+
+# `related` holds ids of other movies; the first MAX_RELATED are linked from
+# the page, looked up GET_ALL_BATCH documents per get_all request
+RELATED_FIELDS = ('slug', 'title')
+MAX_RELATED = 12
+GET_ALL_BATCH = 100
+
+# --async: Firestore requests in flight at once
+DEFAULT_CONCURRENCY = 16
+
+# Movie page sitemaps (see movie_sitemap.py), updated after every run/daemon batch
+SITE_URL = 'https://www.soundora-music.com'
+
+# Manifest, registry and resume cursor (or watermark) are saved at most this
+# often during a run or daemon (and always at the end); rewriting them after
+# every page of results or micro-batch made 1M document runs quadratic
+STATE_SAVE_SECONDS = 30
+
+# Daemon mode: quiet period that closes a micro-batch, batch cap and event queue bound
+DEBOUNCE_SECONDS = 2.0
+MAX_BATCH = 500
+EVENT_QUEUE_SIZE = 10000
+
+
+def manifest_entry(digest, lastmod):
+    """In-memory manifest entry (hash, lastmod); equal dates share one string"""
+    return (digest, sys.intern(lastmod))
+
+
+class TrackedManifest(dict):
+    """Manifest that records the slugs set or deleted since the last take_changed()
+
+    Delta runs and the daemon use it to update only the sitemap shards of
+    the movies they touched.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.changed = set()
+
+    def __setitem__(self, slug, entry):
+        if self.get(slug) != entry:
+            self.changed.add(slug)
+        super().__setitem__(slug, entry)
+
+    def __delitem__(self, slug):
+        super().__delitem__(slug)
+        self.changed.add(slug)
+
+    def pop(self, slug, *default):
+        if slug in self:
+            self.changed.add(slug)
+        return super().pop(slug, *default)
+
+    def take_changed(self):
+        """Slugs changed since the last call"""
+        changed, self.changed = self.changed, set()
+        return changed
+
+
+def load_manifest(path):
+    """Load slug -> (hash, lastmod) mapping from the previous run"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"WARNING: ignoring unreadable manifest {path}: {e}")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    # Entries from older manifests (bare hash strings) are rebuilt
+    return {sys.intern(slug): manifest_entry(entry.get('hash'), entry.get('lastmod') or '')
+            for slug, entry in data.get('pages', {}).items() if isinstance(entry, dict)}
+
+
+def save_manifest(path, pages):
+    """Write manifest atomically so an interrupted run keeps the old one
+
+    Entries are serialised line by line rather than through a temporary
+    dict per page; the file reads back as {'pages': {slug: {hash, lastmod}}}.
+    """
+    lines = ',\n'.join(
+        f'  {json.dumps(slug, ensure_ascii=False)}: {{"hash": "{digest}", "lastmod": "{lastmod}"}}'
+        for slug, (digest, lastmod) in sorted(pages.items()))
+    data = f'{{\n "pages": {{\n{lines}\n }},\n "template_version": "{TEMPLATE_VERSION}"\n}}\n'
+    atomic_write(path, data)
+
+
+def page_hash(fields):
+    """Hash of the template inputs for one page plus the template version"""
+    payload = json.dumps(fields, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{TEMPLATE_VERSION}\n{payload}".encode('utf-8')).hexdigest()
+
+
+def page_lastmod(movie_data):
+    """Sitemap lastmod: the movie's updatedAt date, or today for a page written now"""
+    updated_at = movie_data.get('updatedAt')
+    if isinstance(updated_at, datetime):
+        return updated_at.date().isoformat()
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def remove_stale_pages(manifest, seen_slugs, output_dir):
+    """Delete pages of movies that no longer exist in Firestore"""
+    removed = 0
+    for slug in [s for s in manifest if s not in seen_slugs]:
+        if remove_file(os.path.join(output_dir, f"{slug}.html")):
+            print(f"✗ Removed: {slug}.html")
+        del manifest[slug]
+        removed += 1
+    return removed
+
+
+def write_sitemap(manifest, output_dir, sitemap=None):
+    """Bring the sharded movie sitemaps in line with the manifest
+
+    Given the SitemapWriter of a delta run or daemon and a TrackedManifest,
+    only the shards of the slugs changed since the last call are rendered;
+    otherwise every shard is.
+    """
+    def entry(slug):
+        return f"{SITE_URL}/{slug}.html", manifest[slug][1] or None
+
+    if sitemap is None:
+        written, unchanged, removed = SitemapWriter(output_dir, SITE_URL).write_all(manifest, entry)
+    else:
+        written, unchanged, removed = sitemap.update(manifest, manifest.take_changed(), entry)
+    print(f"✓ Sitemaps: {written} written, {unchanged} unchanged, {removed} removed")
+
+
+def load_checkpoint(path):
+    """Return the document id to resume after, or None for a fresh run"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('cursor')
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"WARNING: ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def save_checkpoint(path, cursor, count):
+    """Record the last document whose page has been written"""
+    atomic_write(path, json.dumps({'cursor': cursor, 'count': count}))
+
+
+def clear_checkpoint(path):
+    """Forget the checkpoint after a complete run"""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def load_watermark(path):
+    """Return {'updatedAt', 'id', 'deletedAt'} from the last run, or {}"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"WARNING: ignoring unreadable watermark {path}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_watermark(path, watermark):
+    """Persist the delta watermark"""
+    atomic_write(path, json.dumps(watermark, sort_keys=True, indent=1))
+
+
+def newest_update(movies, current=None):
+    """Return the (updatedAt, id) of the most recently updated movie"""
+    for movie_data in movies:
+        ts = movie_data.get('updatedAt')
+        if isinstance(ts, datetime) and (current is None or (ts, movie_data['id']) > current):
+            current = (ts, movie_data['id'])
+    return current
+
+
+def fetch_page(query, metrics=None):
+    """Run one page query to completion, timing it as a fetch_page span"""
+    if metrics is None:
+        return list(query.stream())
+    with metrics.span('fetch_page'):
+        docs = list(query.stream())
+    metrics.count('documents', len(docs))
+    return docs
+
+
+def iter_movie_batches(db, page_size=DEFAULT_PAGE_SIZE, start_after=None, metrics=None):
+    """Yield (movies, last_doc_id) pages from the movies collection
+
+    Pages are ordered by document id and fetched with select(PAGE_FIELDS),
+    each one a short query resumed with start_after from the previous page,
+    so no stream stays open for the whole run.
+    """
+    doc_id = firestore.FieldPath.document_id()
+    query = db.collection('movies').select(PAGE_FIELDS).order_by(doc_id).limit(page_size)
+    cursor = start_after
+    
+    while True:
+        page_query = query.start_after({doc_id: cursor}) if cursor else query
+        docs = fetch_page(page_query, metrics)
+        if not docs:
+            return
+        
+        movies = [movie for movie in map(Movie.from_snapshot, docs) if movie is not None]
         
-        // Redirect to index.html with hash
-        window.location.href = 'index.html#' + movieSlug + '.html';
-    </script>
-</body>
-</html>"""
-
-
-def slugify(text):
-    """Convert text to URL-friendly slug"""
-    if not text:
-        return ''
-    # Convert to lowercase
-    text = str(text).lower()
-    # Replace spaces and special chars with hyphens
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '-', text)
-    return text.strip('-')
-
-
-def escape_html(text):
-    """Escape HTML special characters"""
-    if not text:
-        return ''
-    text = str(text)
-    text = text.replace('&', '&amp;')
-    text = text.replace('<', '&lt;')
-    text = text.replace('>', '&gt;')
-    text = text.replace('"', '&quot;')
-    text = text.replace("'", '&#39;')
-    return text
-
-
-def generate_movie_page(movie_data, output_dir):
-    """Generate HTML file for a single movie"""
+        cursor = docs[-1].id
+        yield movies, cursor
+        
+        if len(docs) < page_size:
+            return
+
+
+def iter_changed_batches(db, since, since_id=None, page_size=DEFAULT_PAGE_SIZE, metrics=None):
+    """Yield (movies, (updatedAt, doc_id)) pages of movies updated after since
+
+    Ordered by (updatedAt, document id) so the cursor of the last page is also
+    the new watermark, and equal timestamps never straddle a page boundary.
+    """
+    doc_id = firestore.FieldPath.document_id()
+    query = (db.collection('movies')
+             .select(PAGE_FIELDS)
+             .where('updatedAt', '>=' if since_id else '>', since)
+             .order_by('updatedAt')
+             .order_by(doc_id)
+             .limit(page_size))
+    cursor = (since, since_id) if since_id else None
+    
+    while True:
+        page_query = query.start_after({'updatedAt': cursor[0], doc_id: cursor[1]}) if cursor else query
+        docs = fetch_page(page_query, metrics)
+        if not docs:
+            return
+        
+        movies = [movie for movie in map(Movie.from_snapshot, docs) if movie is not None]
+        
+        last = docs[-1]
+        cursor = (last.get('updatedAt'), last.id)
+        yield movies, cursor
+        
+        if len(docs) < page_size:
+            return
+
+
+def related_ids(movies):
+    """Ids of the movies a batch links to"""
+    return {str(movie_id) for movie in movies for movie_id in (movie.get('related') or ())[:MAX_RELATED]}
+
+
+def related_titles(snapshots):
+    """get_all() results -> {id: (slug, title)}, None for a movie that no longer exists"""
+    titles = {}
+    for snapshot in snapshots:
+        data = snapshot.to_dict() if snapshot.exists else None
+        if data:
+            titles[snapshot.id] = (wanted_slug({'id': snapshot.id, **data}), data.get('title', 'Movie'))
+        else:
+            titles[snapshot.id] = None
+    return titles
+
+
+def attach_related(movies, titles):
+    """Set relatedTitles [[id, slug, title]] on every movie that has a related list"""
+    for movie in movies:
+        if not movie.get('related'):
+            continue
+        movie['relatedTitles'] = [[movie_id, *titles[movie_id]]
+                                  for movie_id in map(str, movie['related'][:MAX_RELATED])
+                                  if titles.get(movie_id)]
+
+
+def lookup_related(db, movies, titles, metrics=None):
+    """Resolve a batch's related ids with batched get_all calls; titles caches results"""
+    missing = sorted(related_ids(movies) - titles.keys())
+    for start in range(0, len(missing), GET_ALL_BATCH):
+        refs = [db.collection('movies').document(movie_id) for movie_id in missing[start:start + GET_ALL_BATCH]]
+        started = time.perf_counter()
+        titles.update(related_titles(db.get_all(refs, field_paths=RELATED_FIELDS)))
+        if metrics is not None:
+            metrics.observe('related_lookup', time.perf_counter() - started)
+            metrics.count('related_documents', len(refs))
+    attach_related(movies, titles)
+
+
+def with_related(db, batches, metrics=None):
+    """Pass (movies, cursor) pages through, with their related titles attached"""
+    titles = {}
+    for movies, cursor in batches:
+        lookup_related(db, movies, titles, metrics)
+        yield movies, cursor
+
+
+async def fetch_page_async(query, semaphore, metrics=None):
+    """Async fetch_page(): one page query, holding a request slot while it runs"""
+    async with semaphore:
+        started = time.perf_counter()
+        docs = [doc async for doc in query.stream()]
+    if metrics is not None:
+        metrics.observe('fetch_page', time.perf_counter() - started)
+        metrics.count('documents', len(docs))
+    return docs
+
+
+async def get_related_async(db, movie_ids, semaphore, metrics=None):
+    """One get_all request for up to GET_ALL_BATCH referenced movies"""
+    refs = [db.collection('movies').document(movie_id) for movie_id in movie_ids]
+    async with semaphore:
+        started = time.perf_counter()
+        snapshots = [snapshot async for snapshot in db.get_all(refs, field_paths=RELATED_FIELDS)]
+    if metrics is not None:
+        metrics.observe('related_lookup', time.perf_counter() - started)
+        metrics.count('related_documents', len(refs))
+    return related_titles(snapshots)
+
+
+async def resolve_page_async(db, movies, cursor, lookups, semaphore, metrics=None):
+    """Attach related titles to one page; returns (movies, cursor)
+
+    lookups maps movie id -> the task fetching it, so an id referenced from
+    several pages is requested once even while its first request is in flight.
+    """
+    wanted = related_ids(movies)
+    missing = sorted(wanted - lookups.keys())
+    for start in range(0, len(missing), GET_ALL_BATCH):
+        chunk = missing[start:start + GET_ALL_BATCH]
+        task = asyncio.ensure_future(get_related_async(db, chunk, semaphore, metrics))
+        for movie_id in chunk:
+            lookups[movie_id] = task
+    titles = {}
+    for result in await asyncio.gather(*{lookups[movie_id] for movie_id in wanted}):
+        titles.update(result)
+    attach_related(movies, titles)
+    return movies, cursor
+
+
+async def iter_movie_batches_async(db, page_size=DEFAULT_PAGE_SIZE, start_after=None,
+                                   concurrency=DEFAULT_CONCURRENCY, metrics=None):
+    """Async iter_movie_batches() on an AsyncClient, with related titles attached
+
+    Page queries follow each other (every cursor comes from the page before),
+    but the get_all lookups of a page run concurrently with the next page
+    query, all bounded by one semaphore of `concurrency` requests.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    lookups = {}
+    doc_id = firestore.FieldPath.document_id()
+    query = db.collection('movies').select(PAGE_FIELDS).order_by(doc_id).limit(page_size)
+    cursor = start_after
+    pending = None
+    
+    while True:
+        page_query = query.start_after({doc_id: cursor}) if cursor else query
+        docs = await fetch_page_async(page_query, semaphore, metrics)
+        task = None
+        if docs:
+            movies = [movie for movie in map(Movie.from_snapshot, docs) if movie is not None]
+            cursor = docs[-1].id
+            task = asyncio.ensure_future(resolve_page_async(db, movies, cursor, lookups, semaphore, metrics))
+        if pending is not None:
+            yield await pending
+        pending = task
+        if len(docs) < page_size:
+            break
+    
+    if pending is not None:
+        yield await pending
+
+
+def iter_async(agen):
+    """Drive an async generator on a private event loop and yield its items
+
+    Used under prefetch(), so the loop lives on the prefetch thread and the
+    calling thread renders pages while the next ones are fetched.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(agen.aclose())
+        # Lookups still in flight when the run stops early
+        leftover = asyncio.all_tasks(loop)
+        for task in leftover:
+            task.cancel()
+        if leftover:
+            loop.run_until_complete(asyncio.wait(leftover))
+        loop.close()
+
+
+def movie_batches(db, args, start_after=None, metrics=None):
+    """(movies, cursor) pages of the whole collection from the sync or async client"""
+    if args.use_async:
+        return iter_async(iter_movie_batches_async(db, args.page_size, start_after, args.concurrency, metrics))
+    return with_related(db, iter_movie_batches(db, args.page_size, start_after, metrics), metrics)
+
+
+def iter_tombstones(db, since=None):
+    """Yield (movie_id, slug, deletedAt) for movies deleted after since"""
+    query = db.collection(TOMBSTONE_COLLECTION)
+    if since is not None:
+        query = query.where('deletedAt', '>', since)
+    for tomb_doc in query.stream():
+        data = tomb_doc.to_dict() or {}
+        yield tomb_doc.id, data.get('slug') or slugify(tomb_doc.id), data.get('deletedAt')
+
+
+def delete_movie_page(movie_id, slug, manifest, output_dir, indexes=(), registry=None):
+    """Delete a removed movie's page and index entries; returns True if a page was deleted"""
+    if registry is not None:
+        # The registry knows the final slug, including collision suffixes
+        slug = registry.owned_slug(movie_id, slug)
+        if slug is None:
+            return False
+        registry.release(slug)
+    manifest.pop(slug, None)
+    for index in indexes:
+        index.remove(slug)
+    if not remove_file(os.path.join(output_dir, f"{slug}.html")):
+        return False
+    print(f"✗ Removed: {slug}.html")
+    return True
+
+
+def remove_deleted_pages(db, since, manifest, output_dir, indexes=(), registry=None):
+    """Delete pages listed in the tombstone collection; returns (removed, newest deletedAt)"""
+    removed = 0
+    newest = since
+    for movie_id, slug, deleted_at in iter_tombstones(db, since):
+        if delete_movie_page(movie_id, slug, manifest, output_dir, indexes, registry):
+            removed += 1
+        if isinstance(deleted_at, datetime) and (newest is None or deleted_at > newest):
+            newest = deleted_at
+    return removed, newest
+
+
+def poster_card_fields(movie_data):
+    """Poster variants for catalog cards; the page itself has no slots for them"""
+    poster_variants = movie_data.get('posterVariants') or {}
+    return dict(
+        poster_src=poster_variants.get('src', movie_data.get('poster', '')),
+        poster_srcset=poster_variants.get('srcset', ''),
+        poster_blurhash=poster_variants.get('blurhash', ''),
+    )
+
+
+def movie_page_fields(movie_data, registry=None):
+    """Collect the raw template fields for one movie; escaping happens per slot"""
     
     # Get movie data with defaults
     movie_id = str(movie_data.get('id', ''))
-    movie_title = escape_html(movie_data.get('title', 'Movie'))
-    movie_slug = movie_data.get('slug') or slugify(movie_id)
+    movie_title = movie_data.get('title', 'Movie')
+    movie_slug = wanted_slug(movie_data)
+    if registry is not None:
+        movie_slug = registry.assign(movie_id, movie_slug)
     movie_year = str(movie_data.get('year', ''))
-    movie_original_title = escape_html(movie_data.get('originalTitle', movie_title))
-    movie_description = escape_html(movie_data.get('description', f'Watch {movie_title} online'))
-    movie_genre = escape_html(movie_data.get('genre', ''))
+    movie_original_title = movie_data.get('originalTitle', movie_title)
+    movie_description = movie_data.get('description', f'Watch {movie_title} online')
+    movie_genre = movie_data.get('genre', '')
     movie_poster = movie_data.get('poster', '')
+    # Published variants and placeholders from poster_pipeline.py: og:image gets the wide JPEG
+    poster_variants = movie_data.get('posterVariants') or {}
+    lqip = poster_variants.get('lqip')
+    poster_placeholder_css = f"background-image: url({lqip})" if lqip else ''
+    movie_poster = poster_variants.get('og', movie_poster)
     
-    # Extract rating
+    # Extract rating; the aggregate from rating_aggregates.py wins once there are votes
     rating_str = movie_data.get('rating', '0/10')
     movie_rating = rating_str.split('/')[0] if '/' in rating_str else '0'
     movie_votes = str(movie_data.get('sndVotes', 0))
+    if movie_data.get('sndVotes') and movie_data.get('sndRating') is not None:
+        movie_rating = str(movie_data['sndRating'])
+    
+    # Links to related titles; the registry knows the final slug of movies already built
+    related_links = ''.join(
+        f'<a href="{escape_html((registry and registry.slug_for(related_id)) or related_slug)}.html">'
+        f'{escape_html(related_title)}</a>'
+        for related_id, related_slug, related_title in movie_data.get('relatedTitles') or ())
     
     # Generate filename
     filename = f"{movie_slug}.html"
     page_url = f"https://www.soundora-music.com/{filename}"
     
-    # Fill template
-    html = TEMPLATE_HTML.format(
+    return dict(
         movie_id=movie_id,
         movie_slug=movie_slug,
         movie_title=movie_title,
@@ -160,70 +585,701 @@ def generate_movie_page(movie_data, output_dir):
         movie_description=movie_description,
         movie_genre=movie_genre,
         movie_poster=movie_poster,
+        poster_placeholder_css=poster_placeholder_css,
+        related_links=related_links,
         movie_rating=movie_rating,
         movie_votes=movie_votes,
         page_url=page_url
     )
+
+
+def write_movie_page(fields, output_dir, fsync=False):
+    """Render the template and write it atomically; safe to run in a worker
+
+    Returns (filename, (render_seconds, write_seconds, fsync_seconds, bytes)).
+    """
+    filename = f"{fields['movie_slug']}.html"
+    started = time.perf_counter()
+    data = render_movie_page(fields).encode('utf-8')
+    rendered = time.perf_counter()
+    fsync_seconds = atomic_write(os.path.join(output_dir, filename), data, fsync)
+    write_seconds = time.perf_counter() - rendered - fsync_seconds
+    return filename, (rendered - started, write_seconds, fsync_seconds, len(data))
+
+
+def record_page(metrics, filename, timings):
+    """Add a written page to the render/write/fsync histograms; print it when verbose"""
+    if metrics is not None:
+        render_seconds, write_seconds, fsync_seconds, size = timings
+        metrics.observe('render', render_seconds)
+        metrics.observe('write', write_seconds)
+        if fsync_seconds:
+            metrics.observe('fsync', fsync_seconds)
+        metrics.count('pages_written')
+        metrics.count('bytes_written', size)
+    if metrics is None or metrics.verbose:
+        print(f"✓ Created: {filename}")
+
+
+def is_unchanged(fields, digest, output_dir, manifest):
+    """True when the manifest says this page is already up to date on disk"""
+    entry = manifest.get(fields['movie_slug']) if manifest is not None else None
+    if entry is None or entry[0] != digest:
+        return False
+    return os.path.exists(os.path.join(output_dir, f"{fields['movie_slug']}.html"))
+
+
+def generate_movie_page(movie_data, output_dir, manifest=None, indexes=(), registry=None,
+                        metrics=None, fsync=False, writeback=None):
+    """Generate HTML file for a single movie
+
+    When a manifest dict is given, the page is skipped if its inputs did not
+    change since the last run. Returns (filename, written).
+    """
+    fields = movie_page_fields(movie_data, registry)
+    filename = f"{fields['movie_slug']}.html"
+    for index in indexes:
+        index.upsert({**fields, **poster_card_fields(movie_data)})
+    
+    # Skip unchanged pages (their derived fields may still need writing back)
+    digest = page_hash(fields)
+    if writeback is not None:
+        writeback.observe(movie_data, fields, digest)
+    if is_unchanged(fields, digest, output_dir, manifest):
+        if metrics is not None:
+            metrics.count('pages_skipped')
+        return filename, False
+    
+    _, timings = write_movie_page(fields, output_dir, fsync)
     
-    # Write file
-    filepath = os.path.join(output_dir, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html)
+    if manifest is not None:
+        manifest[fields['movie_slug']] = manifest_entry(digest, page_lastmod(movie_data))
     
-    print(f"✓ Created: {filename}")
-    return filename
+    record_page(metrics, filename, timings)
+    return filename, True
 
 
-def main():
-    """Main function to fetch from Firebase and generate pages"""
+def open_indexes(output_dir, fresh=False):
+    """Slug catalog and search index builders that build_pages() feeds"""
+    return [CatalogBuilder(output_dir, fresh), SearchIndexBuilder(output_dir, fresh)]
+
+
+def save_indexes(indexes, verbose=True, metrics=None):
+    """Write the catalog and search index shards that changed"""
+    catalog, search = indexes
+    started = time.perf_counter()
+    catalog_stats = catalog.save()
+    search_stats = search.save()
+    if metrics is not None:
+        metrics.record('indexes', time.perf_counter() - started, emit=verbose)
+    if verbose:
+        print(format_catalog_stats(catalog_stats))
+        print(format_search_stats(search_stats))
+
+
+def retire_renamed_pages(registry, manifest, output_dir, indexes=()):
+    """Delete pages left under a movie's previous slug; the redirect map covers the old URL"""
+    for old_slug, new_slug in registry.take_renamed():
+        if remove_file(os.path.join(output_dir, f"{old_slug}.html")):
+            print(f"✗ Renamed: {old_slug}.html -> {new_slug}.html")
+        manifest.pop(old_slug, None)
+        for index in indexes:
+            index.remove(old_slug)
+
+
+def open_posters(args, output_dir):
+    """PosterPipeline when --posters is given and Pillow is installed, else None"""
+    if not args.posters:
+        return None
+    if PosterImage is None:
+        print("WARNING: Pillow is not installed (pip install Pillow); keeping original poster URLs")
+        return None
+    return PosterPipeline(output_dir, workers=args.workers, base_url=SITE_URL)
+
+
+def annotate_posters(posters, movies, metrics=None):
+    """Attach posterVariants to a batch before its pages are rendered"""
+    if posters is None:
+        return
+    if metrics is None:
+        posters.annotate(movies)
+        return
+    failed = posters.stats['failed']
+    with metrics.span('posters'):
+        posters.annotate(movies)
+    metrics.count('posters_failed', posters.stats['failed'] - failed)
+
+
+def close_posters(posters, retain=False):
+    """Save the poster cache; retain=True after a complete pass drops unused posters"""
+    if posters is None:
+        return
+    if retain:
+        posters.retain(posters.seen)
+    posters.close()
+    print(posters.summary())
+
+
+def open_writeback(args, db, metrics=None):
+    """DerivedFieldWriter when --writeback is given, else None"""
+    if not args.writeback:
+        return None
+    # Batched writes go through the sync client, also in --async runs
+    return DerivedFieldWriter(firestore.client() if args.use_async else db, args.writeback_rate, metrics=metrics)
+
+
+def close_writeback(writeback):
+    """Print the write-back summary; updates still queued were never confirmed"""
+    if writeback is None:
+        return
+    if writeback.pending:
+        print(f"WARNING: {len(writeback.pending)} derived field updates not written; the next run retries them")
+    print(writeback.summary())
+
+
+def save_page_state(manifest, registry, output_dir):
+    """Persist the manifest and slug registry once their pages are on disk"""
+    save_manifest(MANIFEST_PATH, manifest)
+    registry.save(output_dir)
+
+
+def build_pages(movies, output_dir, manifest, workers=1, mode='thread', pool=None, indexes=(), registry=None,
+                metrics=None, fsync=False, writeback=None):
+    """Generate pages for an iterable of movie dicts
+
+    With workers > 1 the iterable is drained by a prefetch thread and pages are
+    rendered and written on a bounded pool. Manifest and slug registry
+    bookkeeping stays on the calling thread. Returns (seen_slugs, written, skipped).
+    """
+    seen_slugs = set()
+    written = skipped = 0
     
-    # Initialize Firebase
-    print("Initializing Firebase...")
+    if workers <= 1:
+        for movie_data in movies:
+            filename, was_written = generate_movie_page(movie_data, output_dir, manifest, indexes, registry,
+                                                        metrics, fsync, writeback)
+            seen_slugs.add(filename[:-len('.html')])
+            if was_written:
+                written += 1
+            else:
+                skipped += 1
+        if registry is not None:
+            retire_renamed_pages(registry, manifest, output_dir, indexes)
+        return seen_slugs, written, skipped
     
-    # You need to download service account key from Firebase Console
-    # and save it as 'serviceAccountKey.json'
-    cred_path = 'serviceAccountKey.json'
+    # Manifest entries of pages still in flight, keyed by slug
+    pending = {}
     
-    if not os.path.exists(cred_path):
-        print(f"ERROR: {cred_path} not found!")
-        print("\nPlease download your Firebase service account key:")
-        print("1. Go to Firebase Console > Project Settings > Service Accounts")
-        print("2. Click 'Generate New Private Key'")
-        print(f"3. Save it as '{cred_path}' in this directory")
-        return
+    def tasks():
+        nonlocal skipped
+        for movie_data in prefetch(movies):
+            fields = movie_page_fields(movie_data, registry)
+            seen_slugs.add(fields['movie_slug'])
+            for index in indexes:
+                index.upsert({**fields, **poster_card_fields(movie_data)})
+            digest = page_hash(fields)
+            if writeback is not None:
+                writeback.observe(movie_data, fields, digest)
+            if is_unchanged(fields, digest, output_dir, manifest):
+                skipped += 1
+                if metrics is not None:
+                    metrics.count('pages_skipped')
+                continue
+            pending[fields['movie_slug']] = manifest_entry(digest, page_lastmod(movie_data))
+            yield fields, output_dir, fsync
+    
+    for (fields, _, _), (filename, timings) in run_pool(write_movie_page, tasks(), workers, mode, pool):
+        slug = fields['movie_slug']
+        manifest[slug] = pending.pop(slug, None) or manifest_entry(page_hash(fields), page_lastmod({}))
+        written += 1
+        record_page(metrics, filename, timings)
+    
+    if registry is not None:
+        retire_renamed_pages(registry, manifest, output_dir, indexes)
+    return seen_slugs, written, skipped
+
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Generate movie HTML pages from Firestore.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Render/write pages on a pool of this many workers (default: 1, serial)")
+    parser.add_argument('--mode', choices=POOL_MODES, default='thread',
+                        help="Worker type: threads for I/O bound runs, processes for render bound runs")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Documents fetched per Firestore query (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--checkpoint', default=CHECKPOINT_PATH,
+                        help=f"Resume checkpoint file (default: {CHECKPOINT_PATH})")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore an existing checkpoint and fetch from the beginning")
+    parser.add_argument('--export-snapshot', metavar='PATH',
+                        help="Stream the movies collection into an NDJSON snapshot (.gz compresses) and exit")
+    parser.add_argument('--from-snapshot', metavar='PATH',
+                        help="Build pages from a local NDJSON snapshot instead of Firestore")
+    parser.add_argument('--precompress', action='store_true',
+                        help="After the build, write .gz/.br sidecars for changed assets (see precompress.py)")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep running and regenerate pages as movies change in Firestore")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                        help=f"Daemon: seconds of quiet that close a batch (default: {DEBOUNCE_SECONDS})")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Full builds and exports: fetch with the asyncio Firestore client")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"--async: Firestore requests in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--posters', action='store_true',
+                        help="Download posters and publish WebP/JPEG width variants (see poster_pipeline.py)")
+    parser.add_argument('--writeback', action='store_true',
+                        help="Write changed canonicalSlug/pageUrl/searchTokens/pageHash back to the movie documents")
+    parser.add_argument('--writeback-rate', type=int, default=MAX_WRITE_RATE,
+                        help=f"Write-back ceiling in writes/s after the 500/50/5 ramp-up (default: {MAX_WRITE_RATE})")
+    parser.add_argument('--fsync', action='store_true',
+                        help="fsync every page before renaming it into place (slower, crash safe)")
+    parser.add_argument('--metrics', nargs='?', const=METRICS_PATH, metavar='PATH',
+                        help=f"Append per-stage timing spans and a run summary as JSONL (default: {METRICS_PATH})")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Print a line for every page written")
+    parser.add_argument('--since', nargs='?', const='watermark', metavar='TIMESTAMP',
+                        help="Delta mode: only movies with updatedAt after TIMESTAMP (ISO 8601), "
+                             f"or after the watermark in {WATERMARK_PATH} when no value is given")
+    return parser.parse_args(argv)
+
+
+def run_full(db, args, output_dir, manifest, metrics=None):
+    """Regenerate every page; also the reconciliation pass for delta runs"""
+    metrics = metrics or RunMetrics(verbose=True)
+    start_after = None if args.restart else load_checkpoint(args.checkpoint)
+    started_at = datetime.now(timezone.utc)
+    seen_slugs = set()
+    written = skipped = fetched = 0
+    newest = None
+    pool = make_pool(args.workers, args.mode) if args.workers > 1 else None
+    # A complete pass rebuilds the catalog, which also drops deleted movies
+    indexes = open_indexes(output_dir, fresh=not start_after)
+    registry = SlugRegistry()
+    posters = open_posters(args, output_dir)
+    writeback = open_writeback(args, db, metrics)
+    complete = False
+    saved_at = time.monotonic()
+    
+    if start_after:
+        print(f"\nResuming after document '{start_after}' from {args.checkpoint}")
+    print(f"\nFetching movies from Firestore ({args.page_size} per page)...")
     
     try:
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
+        # Next page is fetched in the background while this one is written
+        batches = movie_batches(db, args, start_after, metrics)
+        for movies, cursor in prefetch(batches, maxsize=2):
+            annotate_posters(posters, movies, metrics)
+            page_seen, page_written, page_skipped = build_pages(
+                movies, output_dir, manifest, args.workers, args.mode, pool, indexes, registry,
+                metrics, args.fsync, writeback)
+            seen_slugs |= page_seen
+            written += page_written
+            skipped += page_skipped
+            fetched += len(movies)
+            newest = newest_update(movies, newest)
+            
+            # Page is on disk: commit manifest first, then the cursor
+            if time.monotonic() - saved_at >= STATE_SAVE_SECONDS:
+                save_page_state(manifest, registry, output_dir)
+                save_checkpoint(args.checkpoint, cursor, fetched)
+                saved_at = time.monotonic()
+        
+        # Only prune after a complete pass, otherwise we'd delete live pages
+        removed = 0
+        if start_after:
+            print("\nResumed run: skipping stale page removal (run again with --restart to prune)")
+        else:
+            removed = remove_stale_pages(manifest, seen_slugs, output_dir)
+            registry.retain(seen_slugs)
+            complete = True
+            # A complete pass covers every edit and deletion before it started;
+            # a newer updatedAt may belong to a document edited mid-run after an
+            # earlier edit was already fetched, so the watermark stops at the start
+            watermark = {'deletedAt': started_at.isoformat(), 'updatedAt': started_at.isoformat()}
+            if newest and newest[0] < started_at:
+                watermark.update(updatedAt=newest[0].isoformat(), id=newest[1])
+            save_watermark(WATERMARK_PATH, watermark)
+        with metrics.span('sitemap'):
+            write_sitemap(manifest, output_dir)
+        save_indexes(indexes, metrics=metrics)
+        if writeback is not None:
+            writeback.flush()
+        clear_checkpoint(args.checkpoint)
+        
+        print(f"\n✓ Done! {written} written, {skipped} skipped, {removed} removed in {output_dir}")
+        
     except Exception as e:
-        print(f"ERROR initializing Firebase: {e}")
-        return
+        print(f"ERROR fetching movies: {e}")
+        print(f"Run again to resume from {args.checkpoint}")
+    finally:
+        save_page_state(manifest, registry, output_dir)
+        close_posters(posters, complete)
+        close_writeback(writeback)
+        if pool is not None:
+            pool.shutdown()
+
+
+def run_from_snapshot(args, output_dir, manifest, metrics=None):
+    """Build every page from a local NDJSON snapshot, without Firestore"""
+    metrics = metrics or RunMetrics(verbose=True)
+    seen_slugs = set()
+    written = skipped = 0
+    pool = make_pool(args.workers, args.mode) if args.workers > 1 else None
+    indexes = open_indexes(output_dir, fresh=True)
+    registry = SlugRegistry()
+    posters = open_posters(args, output_dir)
+    complete = False
     
-    # Get Firestore client
-    db = firestore.client()
+    print(f"\nReading movies from {args.from_snapshot}...")
     
-    # Define output directory
-    output_dir = os.path.join('app', 'src', 'main', 'assets')
-    os.makedirs(output_dir, exist_ok=True)
+    try:
+        # Parsing the next batch overlaps with writing this one
+        batches = iter_snapshot_batches(args.from_snapshot, args.page_size)
+        for movies in prefetch(batches, maxsize=2):
+            metrics.count('documents', len(movies))
+            annotate_posters(posters, movies, metrics)
+            page_seen, page_written, page_skipped = build_pages(
+                movies, output_dir, manifest, args.workers, args.mode, pool, indexes, registry,
+                metrics, args.fsync)
+            seen_slugs |= page_seen
+            written += page_written
+            skipped += page_skipped
+        
+        removed = remove_stale_pages(manifest, seen_slugs, output_dir)
+        registry.retain(seen_slugs)
+        complete = True
+        with metrics.span('sitemap'):
+            write_sitemap(manifest, output_dir)
+        save_indexes(indexes, metrics=metrics)
+        
+        print(f"\n✓ Done! {written} written, {skipped} skipped, {removed} removed in {output_dir}")
+        
+    except (OSError, ValueError) as e:
+        print(f"ERROR reading snapshot: {e}")
+    finally:
+        save_page_state(manifest, registry, output_dir)
+        close_posters(posters, complete)
+        if pool is not None:
+            pool.shutdown()
+
+
+def run_export(db, args):
+    """Stream the movies collection into a local NDJSON snapshot"""
+    print(f"\nExporting movies to {args.export_snapshot} ({args.page_size} per page)...")
     
-    print(f"\nFetching movies from Firestore...")
+    def movies():
+        for batch, _ in movie_batches(db, args):
+            for movie in batch:
+                yield movie.to_dict()
     
     try:
-        # Fetch all movies
-        movies_ref = db.collection('movies')
-        movies = movies_ref.stream()
+        count = write_snapshot(prefetch(movies(), maxsize=args.page_size * 2), args.export_snapshot)
+        print(f"\n✓ Done! Exported {count} movies to {args.export_snapshot}")
+    except Exception as e:
+        print(f"ERROR exporting movies: {e}")
+
+
+def run_delta(db, args, output_dir, manifest, metrics=None):
+    """Re-render only movies changed after the watermark and drop tombstoned pages"""
+    metrics = metrics or RunMetrics(verbose=True)
+    watermark = load_watermark(WATERMARK_PATH)
+    if args.since != 'watermark':
+        watermark = {'updatedAt': parse_timestamp(args.since).isoformat(),
+                     'deletedAt': parse_timestamp(args.since).isoformat()}
+    if not watermark.get('updatedAt'):
+        print(f"ERROR: no watermark in {WATERMARK_PATH}; run a full build first or pass --since TIMESTAMP")
+        return
+    
+    since = parse_timestamp(watermark['updatedAt'])
+    since_id = watermark.get('id')
+    deleted_since = parse_timestamp(watermark['deletedAt']) if watermark.get('deletedAt') else None
+    written = skipped = 0
+    pool = make_pool(args.workers, args.mode) if args.workers > 1 else None
+    # Only the shards of changed or deleted movies are rewritten
+    indexes = open_indexes(output_dir)
+    registry = SlugRegistry()
+    posters = open_posters(args, output_dir)
+    writeback = open_writeback(args, db, metrics)
+    saved_at = time.monotonic()
+    
+    print(f"\nFetching movies updated after {since.isoformat()}...")
+    
+    try:
+        # Deletions first, so a movie re-created since then gets its page back
+        removed, newest_deleted = remove_deleted_pages(db, deleted_since, manifest, output_dir, indexes, registry)
+        if newest_deleted:
+            watermark['deletedAt'] = newest_deleted.isoformat()
+        save_page_state(manifest, registry, output_dir)
+        save_watermark(WATERMARK_PATH, watermark)
         
-        count = 0
-        for movie_doc in movies:
-            movie_data = movie_doc.to_dict()
-            if movie_data:
-                generate_movie_page(movie_data, output_dir)
-                count += 1
+        batches = with_related(db, iter_changed_batches(db, since, since_id, args.page_size, metrics), metrics)
+        for movies, (updated_at, doc_id) in prefetch(batches, maxsize=2):
+            annotate_posters(posters, movies, metrics)
+            _, page_written, page_skipped = build_pages(
+                movies, output_dir, manifest, args.workers, args.mode, pool, indexes, registry,
+                metrics, args.fsync, writeback)
+            written += page_written
+            skipped += page_skipped
+            
+            # The cursor doubles as the watermark, so an interrupted run resumes here
+            if isinstance(updated_at, datetime):
+                watermark.update(updatedAt=updated_at.isoformat(), id=doc_id)
+            if time.monotonic() - saved_at >= STATE_SAVE_SECONDS:
+                save_page_state(manifest, registry, output_dir)
+                save_watermark(WATERMARK_PATH, watermark)
+                saved_at = time.monotonic()
         
-        print(f"\n✓ Done! Generated {count} movie HTML pages in {output_dir}")
+        save_page_state(manifest, registry, output_dir)
+        save_watermark(WATERMARK_PATH, watermark)
+        with metrics.span('sitemap'):
+            write_sitemap(manifest, output_dir, SitemapWriter(output_dir, SITE_URL))
+        save_indexes(indexes, metrics=metrics)
+        if writeback is not None:
+            writeback.flush()
+        print(f"\n✓ Done! {written} written, {skipped} skipped, {removed} removed in {output_dir}")
         
     except Exception as e:
-        print(f"ERROR fetching movies: {e}")
+        print(f"ERROR fetching changed movies: {e}")
+    finally:
+        save_page_state(manifest, registry, output_dir)
+        close_posters(posters)
+        close_writeback(writeback)
+        if pool is not None:
+            pool.shutdown()
+
+
+def project_movie(movie_doc):
+    """Snapshot -> Movie record, or None if empty"""
+    return Movie.from_snapshot(movie_doc)
+
+
+def collect_batch(events, stop, debounce, max_batch=MAX_BATCH):
+    """Block for the first event, then gather more until debounce seconds of quiet
+
+    Events are (kind, doc_id, movie_data); later events for the same document
+    replace earlier ones. Returns {} when stopping with nothing queued.
+    """
+    batch = {}
+    while not batch:
+        try:
+            kind, doc_id, movie_data = events.get(timeout=0.5)
+            batch[doc_id] = (kind, movie_data)
+        except queue.Empty:
+            if stop.is_set():
+                return batch
+    
+    deadline = time.monotonic() + debounce
+    while len(batch) < max_batch:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            kind, doc_id, movie_data = events.get(timeout=remaining)
+        except queue.Empty:
+            break
+        batch[doc_id] = (kind, movie_data)
+        # Every new event pushes the deadline out, up to max_batch
+        deadline = time.monotonic() + debounce
+    return batch
+
+
+def apply_batch(batch, output_dir, manifest, workers=1, mode='thread', pool=None, indexes=(), registry=None,
+                metrics=None, fsync=False, writeback=None):
+    """Render upserts and delete removed pages for one micro-batch"""
+    upserts = [movie_data for kind, movie_data in batch.values() if kind == 'upsert']
+    removed = 0
+    for kind, movie_data in batch.values():
+        if kind != 'remove':
+            continue
+        if delete_movie_page(movie_data.get('id'), wanted_slug(movie_data), manifest,
+                             output_dir, indexes, registry):
+            removed += 1
+    _, written, skipped = build_pages(upserts, output_dir, manifest, workers, mode, pool, indexes, registry,
+                                      metrics, fsync, writeback)
+    return written, skipped, removed
+
+
+def run_daemon(db, args, output_dir, manifest, metrics=None):
+    """Listen for movie changes and regenerate affected pages in micro-batches
+
+    With a watermark only movies updated after it are listened to, so startup
+    doesn't rescan the whole collection; deletions come from tombstones and
+    from documents leaving the listened result set. The listener blocks on a
+    bounded queue when batches fall behind. SIGINT/SIGTERM stop it cleanly.
+    """
+    metrics = metrics or RunMetrics(verbose=True)
+    events = queue.Queue(EVENT_QUEUE_SIZE)
+    stop = threading.Event()
+    watermark = load_watermark(WATERMARK_PATH)
+    pool = make_pool(args.workers, args.mode) if args.workers > 1 else None
+    indexes = open_indexes(output_dir)
+    sitemap = SitemapWriter(output_dir, SITE_URL)
+    registry = SlugRegistry()
+    posters = open_posters(args, output_dir)
+    # Write-back updates re-deliver their movies here; unchanged values stop the echo
+    writeback = open_writeback(args, db, metrics)
+    saved_at = time.monotonic()
+    
+    def enqueue(event):
+        # Backpressure: hold the listener thread until the batcher catches up
+        while not stop.is_set():
+            try:
+                events.put(event, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+    
+    def on_movies(docs, changes, read_time):
+        for change in changes:
+            if change.type.name == 'REMOVED':
+                movie_data = project_movie(change.document) or {'id': change.document.id}
+                enqueue(('remove', change.document.id, movie_data))
+            else:
+                movie_data = project_movie(change.document)
+                if movie_data:
+                    enqueue(('upsert', change.document.id, movie_data))
+    
+    def on_tombstones(docs, changes, read_time):
+        for change in changes:
+            if change.type.name == 'REMOVED':
+                continue
+            data = change.document.to_dict() or {}
+            movie_data = {'id': change.document.id, 'slug': data.get('slug')}
+            enqueue(('remove', change.document.id, movie_data))
+    
+    def request_stop(signum, frame):
+        print("\nStopping daemon...")
+        stop.set()
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
+    movies_query = db.collection('movies')
+    tombstones_query = db.collection(TOMBSTONE_COLLECTION)
+    if watermark.get('updatedAt'):
+        movies_query = movies_query.where('updatedAt', '>', parse_timestamp(watermark['updatedAt']))
+    if watermark.get('deletedAt'):
+        tombstones_query = tombstones_query.where('deletedAt', '>', parse_timestamp(watermark['deletedAt']))
+    watches = [movies_query.on_snapshot(on_movies), tombstones_query.on_snapshot(on_tombstones)]
+    
+    print(f"\nListening for movie changes (debounce {args.debounce}s, Ctrl+C to stop)...")
+    
+    try:
+        while not stop.is_set() or not events.empty():
+            batch = collect_batch(events, stop, args.debounce)
+            if not batch:
+                continue
+            started = time.monotonic()
+            metrics.count('documents', len(batch))
+            upserts = [movie_data for kind, movie_data in batch.values() if kind == 'upsert']
+            # Fresh lookups every batch: a related movie may have been renamed since
+            lookup_related(db, upserts, {}, metrics)
+            annotate_posters(posters, upserts, metrics)
+            written, skipped, removed = apply_batch(batch, output_dir, manifest,
+                                                    args.workers, args.mode, pool, indexes, registry,
+                                                    metrics, args.fsync, writeback)
+            if writeback is not None:
+                writeback.flush()
+            # Pages, sitemap and indexes only touch this batch's movies; the
+            # manifest and watermark are whole-file rewrites and wait for STATE_SAVE_SECONDS
+            with metrics.span('sitemap', emit=False):
+                write_sitemap(manifest, output_dir, sitemap)
+            save_indexes(indexes, verbose=False, metrics=metrics)
+            
+            newest = newest_update(movie_data for kind, movie_data in batch.values() if kind == 'upsert')
+            if newest and (not watermark.get('updatedAt') or newest[0] > parse_timestamp(watermark['updatedAt'])):
+                watermark.update(updatedAt=newest[0].isoformat(), id=newest[1])
+            if time.monotonic() - saved_at >= STATE_SAVE_SECONDS:
+                save_page_state(manifest, registry, output_dir)
+                save_watermark(WATERMARK_PATH, watermark)
+                saved_at = time.monotonic()
+            
+            print(f"✓ Batch of {len(batch)}: {written} written, {skipped} skipped, "
+                  f"{removed} removed in {time.monotonic() - started:.2f}s")
+    finally:
+        stop.set()
+        for watch in watches:
+            watch.unsubscribe()
+        save_page_state(manifest, registry, output_dir)
+        if watermark:
+            save_watermark(WATERMARK_PATH, watermark)
+        close_posters(posters)
+        close_writeback(writeback)
+        if pool is not None:
+            pool.shutdown()
+        print("✓ Daemon stopped")
+
+
+def run_precompress(args, output_dir):
+    """Post-build stage: gzip/brotli sidecars for everything that changed"""
+    print(f"\nPrecompressing assets in {output_dir}...")
+    compressed, skipped, bytes_in, bytes_gz, bytes_br = precompress(
+        [output_dir], args.workers if args.workers > 1 else None, verbose=False)
+    summary = f"✓ Precompressed {compressed} files, {skipped} unchanged"
+    if bytes_in:
+        summary += f" ({bytes_in:,} -> gz {bytes_gz:,}" + (f", br {bytes_br:,})" if bytes_br else ")")
+    print(summary)
+
+
+def run(args, output_dir, metrics):
+    """Dispatch to the run mode selected on the command line"""
+    if args.from_snapshot:
+        if args.writeback:
+            print("WARNING: --writeback needs Firestore; ignored with --from-snapshot")
+        run_from_snapshot(args, output_dir, load_manifest(MANIFEST_PATH), metrics)
+        if args.precompress:
+            with metrics.span('precompress'):
+                run_precompress(args, output_dir)
+        return
+    
+    if args.use_async and (args.daemon or args.since is not None):
+        print("ERROR: --async covers full builds and --export-snapshot, not --since or --daemon")
+        return
+    
+    # Initialize Firebase
+    print("Initializing Firebase...")
+    with metrics.span('firestore_init'):
+        db = init_firestore_async() if args.use_async else init_firestore()
+    if db is None:
+        return
+    
+    if args.export_snapshot:
+        run_export(db, args)
+        return
+    
+    manifest = load_manifest(MANIFEST_PATH)
+    if args.daemon or args.since is not None:
+        manifest = TrackedManifest(manifest)
+    
+    if args.daemon:
+        run_daemon(db, args, output_dir, manifest, metrics)
+    elif args.since is not None:
+        run_delta(db, args, output_dir, manifest, metrics)
+    else:
+        run_full(db, args, output_dir, manifest, metrics)
+    
+    if args.precompress and not args.daemon:
+        with metrics.span('precompress'):
+            run_precompress(args, output_dir)
+
+
+def main(argv=None):
+    """Main function to fetch from Firebase and generate pages"""
+    args = parse_args(argv)
+    
+    # Define output directory
+    output_dir = os.path.join('app', 'src', 'main', 'assets')
+    os.makedirs(output_dir, exist_ok=True)
+    
+    metrics = RunMetrics(args.metrics, args.verbose)
+    metrics.event('start', argv=argv if argv is not None else sys.argv[1:])
+    try:
+        run(args, output_dir, metrics)
+    finally:
+        if metrics.spans or metrics.counters:
+            metrics.print_summary()
+        metrics.close()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Firestore client setup shared by firebase_movie_generator.py and rating_aggregates.py
+Kept apart from the page generator so tools that only talk to Firestore
+don't import the template, index and poster modules with it.
+"""
+
+import os
+from datetime import datetime, timezone
+
+try:
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+except ImportError:
+    # Offline builds with --from-snapshot don't need the Admin SDK
+    firebase_admin = None
+
+try:
+    from firebase_admin import firestore_async
+except ImportError:
+    # firebase-admin < 6.0 has no async client; --async needs it
+    firestore_async = None
+
+
+def parse_timestamp(value):
+    """ISO 8601 string from the watermark file -> aware datetime"""
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def init_firestore():
+    """Initialize Firebase and return a Firestore client, or None on failure
+
+    With FIRESTORE_EMULATOR_HOST set no service account key is needed, which
+    lets the generator run against the local Firestore emulator.
+    """
+    
+    # You need to download service account key from Firebase Console
+    # and save it as 'serviceAccountKey.json'
+    cred_path = 'serviceAccountKey.json'
+    
+    if firebase_admin is None:
+        print("ERROR: firebase-admin is not installed (pip install firebase-admin)")
+        return None
+    
+    if os.environ.get('FIRESTORE_EMULATOR_HOST') and not os.path.exists(cred_path):
+        project_id = os.environ.get('GCLOUD_PROJECT', 'soundora-music')
+        print(f"Using Firestore emulator at {os.environ['FIRESTORE_EMULATOR_HOST']} ({project_id})")
+        firebase_admin.initialize_app(options={'projectId': project_id})
+        return firestore.client()
+    
+    if not os.path.exists(cred_path):
+        print(f"ERROR: {cred_path} not found!")
+        print("\nPlease download your Firebase service account key:")
+        print("1. Go to Firebase Console > Project Settings > Service Accounts")
+        print("2. Click 'Generate New Private Key'")
+        print(f"3. Save it as '{cred_path}' in this directory")
+        return None
+    
+    try:
+        cred = credentials.Certificate(cred_path)
+        firebase_admin.initialize_app(cred)
+    except Exception as e:
+        print(f"ERROR initializing Firebase: {e}")
+        return None
+    
+    # Get Firestore client
+    return firestore.client()
+
+
+def init_firestore_async():
+    """Initialize Firebase like init_firestore() and return an AsyncClient, or None on failure"""
+    if firebase_admin is not None and firestore_async is None:
+        print("ERROR: --async needs firebase-admin 6.0 or newer (pip install -U firebase-admin)")
+        return None
+    if init_firestore() is None:
+        return None
+    return firestore_async.client()
@@ -1,72 +0,0 @@
-# coding: utf-8
-import codecs
-import re
-
-# Read the file
-with codecs.open('c:\\Users\\emroa\\Downloads\\SND\\app\\src\\main\\assets\\index.html', 'r', 'utf-8') as f:
-    lines = f.readlines()
-
-# Dictionary of broken Russian text to correct text
-fixes = {
-    'Р—Р°РіСЂСѓР·РєРё': 'Загрузки',
-    'РќРµС‚ Р·Р°РіСЂСѓР¶РµРЅРЅС‹С… С„РёР»СЊРјРѕРІ.': 'Нет загруженных фильмов.',
-    'Р¤РёР»СЊРј РґРѕР±Р°РІР»РµРЅ РІ Р·Р°РіСЂСѓР·РєРё': 'Фильм добавлен в загрузки',
-    'РќР°С‡Р°Р»Р°СЃСЊ Р·Р°РіСЂСѓР·РєР°. Р¤РёР»СЊРј РїРѕСЏРІРёС‚СЃСЏ РІ СЂР°Р·РґРµР»Рµ Р·Р°РіСЂСѓР·РѕРє': 'Началась загрузка. Фильм появится в разделе загрузок',
-    'Р—Р°РіСЂСѓР¶РµРЅРѕ': 'Загружено',
-    'РЎРєР°С‡Р°С‚СЊ': 'Скачать',
-    'Р'С‹ РѕС„Р»Р°Р№РЅ': 'Вы офлайн',
-    'Р'С‹ РѕРЅР»Р°Р№РЅ': 'Вы онлайн',
-    'Р'С‹ РѕСЃС‚Р°РЅРѕРІРёР»РёСЃСЊ СЂР°РЅРµРµ. РџСЂРѕРґРѕР»Р¶РёС‚СЊ РїСЂРѕСЃРјРѕС‚СЂ СЃ СЌС‚РѕРіРѕ РјРµСЃС‚Р°?': 'Вы остановились ранее. Продолжить просмотр с этого места?',
-    'Р"Р°': 'Да',
-    'РќРµС‚': 'Нет',
-    'РџРѕРєР°Р·С‹РІР°С‚СЊ Р·Р°РїСЂРѕСЃ РїСЂРѕРґРѕР»Р¶РµРЅРёСЏ': 'Показывать запрос продолжения',
-    'РџСЂРё РІРѕР·РІСЂР°С‚Рµ Рє С„РёР»СЊРјСѓ СЃРїСЂР°С€РёРІР°С‚СЊ, С…РѕС‚РёС‚Рµ Р»Рё РїСЂРѕРґРѕР»Р¶РёС‚СЊ СЃ СЃРѕС…СЂР°РЅС'РЅРЅРѕРіРѕ РјРµСЃС‚Р°': 'При возврате к фильму спрашивать, хотите ли продолжить с сохранённого места',
-    'Р"РµР№СЃС‚РІРёС‚РµР»СЊРЅРѕ РґРѕ': 'Действительно до',
-    'РґРЅРµР№ РѕСЃС‚Р°Р»РѕСЃСЊ': 'дней осталось',
-    'РѕС†РµРЅРѕРє': 'оценок',
-    'Р"РѕР±Р°РІРёС‚СЊ РїСЂРѕС„РёР»СЊ': 'Добавить профиль',
-    'Р"РѕР±Р°РІРёС‚СЊ РґРµС‚СЃРєРёР№': 'Добавить детский',
-    'РџСЂРѕРјРѕРєРѕРґ': 'Промокод',
-    'Р'РІРµРґРёС‚Рµ РїСЂРѕРјРѕРєРѕРґ': 'Введите промокод',
-    'РђРєС‚РёРІРёСЂРѕРІР°С‚СЊ': 'Активировать',
-    'Р'Р°С€Рё РїСЂРѕРјРѕРєРѕРґС‹': 'Ваши промокоды',
-    'РђРєС‚РёРІРёСЂРѕРІР°РЅ': 'Активирован',
-    'РќРµ РёСЃРїРѕР»СЊР·РѕРІР°РЅ': 'Не использован',
-    'РљРѕРїРёСЂРѕРІР°С‚СЊ': 'Копировать',
-    'РЎРѕР·РґР°С‚СЊ РєРѕРґ': 'Создать код',
-    'РџСЂРѕРјРѕРєРѕРґРѕРІ РЅРµС‚.': 'Промокодов нет.',
-    'РџСЂРѕРјРѕРєРѕРґ СЃРєРѕРїРёСЂРѕРІР°РЅ!': 'Промокод скопирован!',
-    'Р§Р°С‚ РїРѕРґРґРµСЂР¶РєРё': 'Чат поддержки',
-    'РџРѕР¶Р°Р»СѓР№СЃС‚Р°, РґРѕР¶РґРёС‚РµСЃСЊ РїРѕРґРєР»СЋС‡РµРЅРёСЏ РѕРїРµСЂР°С‚РѕСЂР°.': 'Пожалуйста, дождитесь подключения оператора.',
-    'Р'Р°С€Р° РїРѕР·РёС†РёСЏ РІ РѕС‡РµСЂРµРґРё:': 'Ваша позиция в очереди:',
-    'Р'РІРµРґРёС‚Рµ СЃРѕРѕР±С‰РµРЅРёРµ...': 'Введите сообщение...',
-    'РћС‚РїСЂР°РІРёС‚СЊ': 'Отправить',
-    'РЎРёСЃС‚РµРјР°': 'Система',
-    'РћРїРµСЂР°С‚РѕСЂ': 'Оператор',
-    'Р'С‹': 'Вы',
-    'РћРїРµСЂР°С‚РѕСЂ Р·Р°РєСЂС‹Р» С‡Р°С‚.': 'Оператор закрыл чат.',
-    '2. РћС‚РєСЂРѕР№С‚Рµ С‡Р°С‚ РїРѕРґРґРµСЂР¶РєРё (РЅР°РїРёС€РёС‚Рµ \'РѕРїРµСЂР°С‚РѕСЂ\' РІ AI-С‡Р°С‚) Рё РѕС‚РїСЂР°РІСЊС‚Рµ СЃРІРѕР№ ID РѕРїРµСЂР°С‚РѕСЂСѓ.': '2. Откройте чат поддержки (напишите \'оператор\' в AI-чат) и отправьте свой ID оператору.',
-    'РЎРїР°СЃРёР±Рѕ Р·Р° РѕС†РµРЅРєСѓ!': 'Спасибо за оценку!',
-    'SND СЂРµР№С‚РёРЅРі': 'SND рейтинг',
-    'РћС†РµРЅРёС‚СЊ С„РёР»СЊРј': 'Оценить фильм',
-    'Р РµР¶РёСЃСЃС'СЂ': 'Режиссёр',
-    'РџРѕСЃР»РµРґРЅРµРµ РѕР±РЅРѕРІР»РµРЅРёРµ: 23 Р°РІРіСѓСЃС‚Р° 2025': 'Последнее обновление: 23 августа 2025',
-    'РЎРјРµРЅРёС‚СЊ Р°РєРєР°СѓРЅС‚': 'Сменить аккаунт',
-}
-
-# Apply fixes to all lines
-new_lines = []
-count = 0
-for line in lines:
-    new_line = line
-    for broken, correct in fixes.items():
-        if broken in new_line:
-            new_line = new_line.replace(broken, correct)
-            count += 1
-    new_lines.append(new_line)
-
-# Write back
-with codecs.open('c:\\Users\\emroa\\Downloads\\SND\\app\\src\\main\\assets\\index.html', 'w', 'utf-8') as f:
-    f.writelines(new_lines)
-
-print(f"Done! Fixed {count} broken Russian texts.")
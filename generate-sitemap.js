@@ -2,6 +2,8 @@
  * Simple sitemap generator for SND movie slugs.
  * Usage (PowerShell): node generate-sitemap.js > sitemap.xml
  * Ensure you have a movies JSON export with id,title in movies.json OR adapt fetchMovies().
+ * Movie page sitemaps (sitemap-movies.xml + gzipped shards) are written by
+ * firebase_movie_generator.py with the same slugs as the pages; prefer those.
  */
 const fs = require('fs');
 
@@ -10,14 +12,29 @@ const DOMAIN = process.env.SND_DOMAIN || 'https://YOUR_DOMAIN'; // no trailing s
 const BASE_PATH = process.env.SND_BASE_PATH || ''; // e.g. '' or '/app'
 const FORCE_HASH_ROUTING = false; // keep consistent with client if needed
 
+// Same rules as slugify() in movie_slugs.py, so URLs match the generated pages
 function slugify(str) {
   return String(str || '')
     .toLowerCase()
-    .replace(/[^a-z0-9]+/g, '-')
-    .replace(/^-+|-+$/g, '')
-    .replace(/--+/g, '-');
+    .replace(/[^\p{L}\p{N}_\s-]/gu, '')
+    .replace(/[-\s]+/g, '-')
+    .replace(/^-+|-+$/g, '');
 }
 
+// movie id -> final slug (collision suffixes included) from the Python generators
+function loadSlugRegistry() {
+  try {
+    const data = JSON.parse(fs.readFileSync('movie_slug_registry.json', 'utf-8'));
+    const slugById = new Map();
+    Object.entries(data.slugs || {}).forEach(([slug, id]) => slugById.set(String(id), slug));
+    return slugById;
+  } catch (e) {
+    return new Map();
+  }
+}
+
+const SLUG_BY_ID = loadSlugRegistry();
+
 function loadMovies() {
   try {
     const raw = fs.readFileSync('movies.json', 'utf-8');
@@ -32,7 +49,8 @@ function loadMovies() {
 }
 
 function buildUrl(movie) {
-  const slug = slugify(movie.title) || movie.id;
+  // canonicalSlug is written back to the movie documents by firebase_movie_generator.py --writeback
+  const slug = movie.canonicalSlug || SLUG_BY_ID.get(String(movie.id)) || movie.slug || slugify(movie.id) || movie.id;
   if (!FORCE_HASH_ROUTING) {
     return DOMAIN + (BASE_PATH ? BASE_PATH.replace(/\/$/, '') : '') + '/' + encodeURIComponent(slug);
   }
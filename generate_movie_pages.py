@@ -6,117 +6,23 @@ Run this: python generate_movie_pages.py
 
 import os
 import json
-import re
-
-# HTML template for each movie page
-TEMPLATE_HTML = """<!DOCTYPE html>
-<html lang="uz">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta http-equiv="X-UA-Compatible" content="ie=edge">
-    
-    <!-- SEO Meta Tags -->
-    <title>{movie_title} ({movie_year}) - SND</title>
-    <meta name="description" content="{movie_description}">
-    <meta name="keywords" content="{movie_title}, {movie_original_title}, {movie_genre}, смотреть онлайн, SND, фильм, кино">
-    
-    <!-- Open Graph / Facebook -->
-    <meta property="og:type" content="video.movie">
-    <meta property="og:url" content="{page_url}">
-    <meta property="og:title" content="{movie_title} ({movie_year}) - SND">
-    <meta property="og:description" content="{movie_description}">
-    <meta property="og:image" content="{movie_poster}">
-    <meta property="og:site_name" content="SND - Streaming Network of Dreams">
-    
-    <!-- Twitter -->
-    <meta name="twitter:card" content="summary_large_image">
-    <meta name="twitter:url" content="{page_url}">
-    <meta name="twitter:title" content="{movie_title} ({movie_year}) - SND">
-    <meta name="twitter:description" content="{movie_description}">
-    <meta name="twitter:image" content="{movie_poster}">
-    
-    <!-- Canonical URL -->
-    <link rel="canonical" href="{page_url}">
-    
-    <!-- Favicon -->
-    <link rel="icon" type="image/x-icon" href="favicon.ico">
-    
-    <!-- Tailwind CSS -->
-    <script src="https://cdn.tailwindcss.com"></script>
-    
-    <!-- Font Awesome -->
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-    
-    <!-- Structured Data -->
-    <script type="application/ld+json">
-    {{
-        "@context": "https://schema.org",
-        "@type": "Movie",
-        "name": "{movie_title}",
-        "alternateName": "{movie_original_title}",
-        "image": "{movie_poster}",
-        "description": "{movie_description}",
-        "datePublished": "{movie_year}-01-01",
-        "genre": "{movie_genre}",
-        "url": "{page_url}",
-        "aggregateRating": {{
-            "@type": "AggregateRating",
-            "ratingValue": "{movie_rating}",
-            "bestRating": "10",
-            "ratingCount": "{movie_votes}"
-        }}
-    }}
-    </script>
-    
-    <style>
-        body {{
-            background: #000;
-            color: #fff;
-            font-family: system-ui, -apple-system, sans-serif;
-        }}
-        .loading {{
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            min-height: 100vh;
-        }}
-    </style>
-</head>
-<body>
-    <div class="loading">
-        <i class="fas fa-spinner fa-spin text-white text-4xl"></i>
-    </div>
-    
-    <script>
-        // Redirect to main app with movie details hash
-        const movieId = '{movie_id}';
-        const movieSlug = '{movie_slug}';
-        
-        // Redirect to index.html with hash
-        window.location.href = 'index.html#' + movieSlug + '.html';
-    </script>
-</body>
-</html>"""
-
-
-def slugify(text):
-    """Convert text to URL-friendly slug"""
-    # Convert to lowercase
-    text = text.lower()
-    # Replace spaces and special chars with hyphens
-    text = re.sub(r'[^\w\s-]', '', text)
-    text = re.sub(r'[-\s]+', '-', text)
-    return text.strip('-')
-
-
-def generate_movie_page(movie, output_dir):
-    """Generate HTML file for a single movie"""
+import argparse
+
+from movie_snapshot import iter_snapshot
+from movie_template import render_movie_page
+from movie_slugs import SlugRegistry, wanted_slug
+from page_writer import POOL_MODES, atomic_write, prefetch, remove_file, run_pool
+
+
+def movie_page_fields(movie, registry=None):
+    """Collect the raw template fields for one movie; escaping happens per slot"""
     
     # Get movie data with defaults
     movie_id = str(movie.get('id', ''))
     movie_title = movie.get('title', 'Movie')
-    movie_slug = movie.get('slug', slugify(movie_id))
+    movie_slug = wanted_slug(movie)
+    if registry is not None:
+        movie_slug = registry.assign(movie_id, movie_slug)
     movie_year = str(movie.get('year', ''))
     movie_original_title = movie.get('originalTitle', movie_title)
     movie_description = movie.get('description', f'Watch {movie_title} online')
@@ -132,8 +38,7 @@ def generate_movie_page(movie, output_dir):
     filename = f"{movie_slug}.html"
     page_url = f"https://www.soundora-music.com/{filename}"
     
-    # Fill template
-    html = TEMPLATE_HTML.format(
+    return dict(
         movie_id=movie_id,
         movie_slug=movie_slug,
         movie_title=movie_title,
@@ -142,22 +47,64 @@ def generate_movie_page(movie, output_dir):
         movie_description=movie_description,
         movie_genre=movie_genre,
         movie_poster=movie_poster,
+        poster_placeholder_css='',
+        related_links='',
         movie_rating=movie_rating,
         movie_votes=movie_votes,
         page_url=page_url
     )
-    
-    # Write file
-    filepath = os.path.join(output_dir, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html)
-    
+
+
+def write_movie_page(fields, output_dir):
+    """Render the template and write it atomically; safe to run in a worker"""
+    filename = f"{fields['movie_slug']}.html"
+    html = render_movie_page(fields)
+    atomic_write(os.path.join(output_dir, filename), html)
+    return filename
+
+
+def generate_movie_page(movie, output_dir, registry=None):
+    """Generate HTML file for a single movie"""
+    filename = write_movie_page(movie_page_fields(movie, registry), output_dir)
     print(f"Created: {filename}")
     return filename
 
 
-def main():
+def generate_movie_pages(movies, output_dir, workers=1, mode='thread', registry=None):
+    """Generate pages for an iterable of movies, optionally on a worker pool
+
+    Movies are consumed as a stream; returns the number of pages written.
+    """
+    count = 0
+    if workers <= 1:
+        for movie in movies:
+            generate_movie_page(movie, output_dir, registry)
+            count += 1
+        return count
+    
+    tasks = ((movie_page_fields(movie, registry), output_dir) for movie in prefetch(movies))
+    for _, filename in run_pool(write_movie_page, tasks, workers, mode):
+        print(f"Created: {filename}")
+        count += 1
+    return count
+
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Generate movie HTML pages.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Render/write pages on a pool of this many workers (default: 1, serial)")
+    parser.add_argument('--mode', choices=POOL_MODES, default='thread',
+                        help="Worker type: threads for I/O bound runs, processes for render bound runs")
+    parser.add_argument('--from-snapshot', metavar='PATH',
+                        help="Generate pages for every movie in an NDJSON snapshot "
+                             "(see firebase_movie_generator.py --export-snapshot)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main function to generate all movie pages"""
+    args = parse_args(argv)
     
     # Define output directory
     output_dir = os.path.join('app', 'src', 'main', 'assets')
@@ -193,13 +140,24 @@ def main():
         }
     ]
     
-    print('Generating movie HTML pages...')
-    
-    for movie in sample_movies:
-        generate_movie_page(movie, output_dir)
-    
-    print(f'\nDone! Generated {len(sample_movies)} movie pages in {output_dir}')
-    print('\nTo generate pages from Firebase data, modify the script to fetch from Firestore.')
+    if args.from_snapshot:
+        print(f'Generating movie HTML pages from {args.from_snapshot}...')
+        movies = iter_snapshot(args.from_snapshot)
+    else:
+        print('Generating movie HTML pages...')
+        movies = sample_movies
+    
+    # Shared with firebase_movie_generator.py, so both hand out the same slugs
+    registry = SlugRegistry()
+    count = generate_movie_pages(movies, output_dir, args.workers, args.mode, registry)
+    for old_slug, new_slug in registry.take_renamed():
+        if remove_file(os.path.join(output_dir, f"{old_slug}.html")):
+            print(f"Renamed: {old_slug}.html -> {new_slug}.html")
+    registry.save(output_dir)
+    
+    print(f'\nDone! Generated {count} movie pages in {output_dir}')
+    if not args.from_snapshot:
+        print('\nTo generate pages from Firebase data, pass --from-snapshot with an export from firebase_movie_generator.py.')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Mojibake repair engine for the Russian/Uzbek UI strings
+UTF-8 text that was once read as Windows-1251 turns every Cyrillic letter
+into two characters ("Загрузки" -> "Р—Р°РіСЂСѓР·РєРё"). The fix_*.py scripts
+each carried a table of such pairs and ran one count() + replace() over the
+whole file per pair. Their tables are merged here and compiled once into a
+single longest-match-first regex, so every file is repaired in one linear
+pass with a hit count per pattern, and the result doesn't depend on the
+order of the tables (a phrase always wins over the letters inside it).
+
+Detector needs no table at all: a precompiled scanner finds runs of garbled
+UTF-8 sequences, each run is turned back into bytes and decoded as UTF-8,
+and the result is kept only if it reads as Russian/Uzbek text. Correct
+Cyrillic around a run is never touched, and each distinct run is decoded
+once. It is the default; --tables switches to the merged tables.
+
+Files are streamed: CHUNK_SIZE bytes at a time are decoded from an mmap,
+and the last few characters of each chunk (the engine's overlap) are held
+back until the next one, so no run is cut in two. The repaired text goes
+to a temp file that replaces the original, so memory stays bounded for
+exported bundles of any size.
+
+Files, directories and glob patterns are repaired on a process pool. Size,
+mtime and content hash of every file left clean are kept in
+MOJIBAKE_MANIFEST, so the next run skips those without scanning them.
+
+--check is the read-only lint for CI: every run that would be repaired is
+reported as file:line:col with its fix, and the exit status is 1 if there
+was any. Line numbers come from a line-start index searched with bisect,
+built only for files that have findings.
+Run this: python mojibake_repair.py [files, directories or globs...]
+Example: python mojibake_repair.py app/src/main/assets "*.txt" --dry-run
+CI: python mojibake_repair.py . --check
+Benchmark: python mojibake_repair.py --bench 1000000
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import mmap
+import time
+import codecs
+import hashlib
+import argparse
+from bisect import bisect_right
+
+from page_writer import atomic_write, run_pool
+from precompress import DEFAULT_ASSETS_DIR, load_hashes
+
+
+def _c1_error(error):
+    """Codec error handler: undefined cp1251 byte <-> C1 control of the same value"""
+    if isinstance(error, UnicodeDecodeError):
+        return ''.join(map(chr, error.object[error.start:error.end])), error.end
+    return bytes(map(ord, error.object[error.start:error.end])), error.end
+
+
+# cp1251 leaves 0x98 undefined; in the broken files it survives as U+0098
+# ("И" -> "Р\x98") and has to become 0x98 again on the way back
+codecs.register_error('mojibake-c1', _c1_error)
+
+# UI phrases repaired by fix_cyrillic.py, fix_encoding_comprehensive.py and
+# fix_russian.py; the garbled side of each is derived with garble()
+PHRASES = (
+    'Загрузки', 'Нет загруженных фильмов', 'Нет загруженных фильмов.', 'Фильм добавлен в загрузки',
+    'Началась загрузка', 'Фильм появится в разделе загрузок',
+    'Началась загрузка. Фильм появится в разделе загрузок', 'Загружено', 'Скачать',
+    'Вы', 'Вы офлайн', 'Вы онлайн', 'Вы остановились ранее',
+    'Вы остановились ранее. Продолжить просмотр с этого места?', 'Продолжить просмотр с этого места',
+    'Показывать запрос продолжения', 'При возврате к фильму спрашивать',
+    'хотите ли продолжить с сохранённого места',
+    'При возврате к фильму спрашивать, хотите ли продолжить с сохранённого места',
+    'Действительно до', 'дней осталось', 'оценок', 'Добавить профиль', 'Добавить детский',
+    'Промокод', 'Введите промокод', 'Активировать', 'Ваши промокоды', 'Активирован', 'Не использован',
+    'Копировать', 'Создать код', 'Промокодов нет', 'Промокодов нет.', 'Промокод скопирован',
+    'Промокод скопирован!', 'Чат поддержки', 'Пожалуйста, дождитесь подключения оператора',
+    'Пожалуйста, дождитесь подключения оператора.', 'Ваша позиция в очереди', 'Ваша позиция в очереди:',
+    'Введите сообщение', 'Введите сообщение...', 'Отправить', 'Система', 'Оператор', 'Оператор закрыл чат',
+    'Оператор закрыл чат.', 'Откройте чат поддержки', 'напишите', 'отправьте свой ID оператору',
+    "2. Откройте чат поддержки (напишите 'оператор' в AI-чат) и отправьте свой ID оператору.",
+    'Спасибо за оценку', 'Спасибо за оценку!', 'SND рейтинг', 'Оценить фильм', 'Режиссёр',
+    'Последнее обновление', 'Последнее обновление: 23 августа 2025', 'августа 2025', 'Сменить аккаунт',
+    'Да', 'Нет', 'Детали', 'Актеры', 'Актёры', 'Рейтинг', 'Создатели', 'Твоя оценка',
+    'Оценки улучшают рекомендации', 'Режиссура', 'Сюжет', 'Зрелищность', 'Оценить', 'Кто смотрит SND',
+    'Войти в другой аккаунт', 'Поделиться подпиской',
+)
+
+# Letter table of fix_soundora_encoding.py (two of its hand-typed keys were
+# wrong, which derived keys can't be)
+LETTERS = 'АВДЗНОРСТФабвгдежийклмнорстуфхчщыьюяё'
+
+# Punctuation of fix_encoding.py/fix_enc2.py. Uzbek o‘/g‘ lost their 0x98
+# byte altogether ("boвЂlimida"); the UI strings spell them with "'"
+PUNCTUATION = '—–‑‘’“”…•№«»'
+LOST_APOSTROPHE = ('вЂ', "'")
+
+# UTF-8 continuation bytes 0x80-0xBF as they read in cp1251
+CONTINUATION = bytes(range(0x80, 0xC0)).decode('cp1251', 'mojibake-c1')
+
+# Lead bytes of the sequences Russian/Uzbek text is made of, as cp1251:
+# C2 (« »), CA (Uzbek ʻ ʼ), D0-D3 (Cyrillic) and E2 (dashes, quotes, №)
+_PAIR = f"[ВКРСТУ][{re.escape(CONTINUATION)}]"
+_TRIPLE = f"в[{re.escape(CONTINUATION)}]{{2}}"
+_SEQUENCE = f"(?:{_PAIR}|{_TRIPLE})+"
+# Words of a garbled phrase are scanned as one run, across spaces and ASCII
+# punctuation, so a whole UI string costs one match and one cache lookup
+RUN_PATTERN = re.compile(f"{_SEQUENCE}(?:[ !,.:;?()'-]{{1,4}}{_SEQUENCE})*")
+SEQUENCE_PATTERN = re.compile(_SEQUENCE)
+
+# What a repaired run may consist of (prices use ₽ and ₸)
+CYRILLIC = 'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯабвгдеёжзийклмнопрстуфхцчшщъыьэюяЎўҚқҒғҲҳ'
+PLAUSIBLE = frozenset(CYRILLIC + PUNCTUATION + "₽₸ʻʼ !,.:;?()'-")
+
+# Punctuation that also follows a capital Р/С/В... in correct text ("СМС…",
+# "«ТВ»"); such a pair alone is only garbled next to a lowercase letter
+AMBIGUOUS = frozenset('…«»“”‘’–—•№')
+
+# Letters that follow a capital at the start of correct words ("Рёв",
+# Uzbek "Рўйхат", "Рі"); such a pair alone is only garbled after a
+# lowercase letter or in a word with more garbled letters ("РїодРїиска")
+NATIVE_LETTERS = frozenset('ЁёЎўІіЄєҐґ')
+LONE_AMBIGUOUS = AMBIGUOUS | NATIVE_LETTERS
+
+# The rest of a word (letters and garbled continuations), as far as the
+# detector looks for more garbled letters in it
+WORD_TAIL = re.compile(f"(?:[^\\W\\d_]|[{re.escape(CONTINUATION)}]){{1,24}}")
+
+NEWLINE_PATTERN = re.compile('\n')
+
+# Bytes read from the mmap per chunk
+CHUNK_SIZE = 1 << 20
+
+# Files a directory is searched for; files named explicitly are always read
+EXTENSIONS = ('.html', '.js', '.css', '.json', '.txt')
+
+# Files known to be clean after the last run, kept outside the assets folder
+MOJIBAKE_MANIFEST = 'mojibake_manifest.json'
+
+# One engine per worker process, so the detector's run cache lives on
+# from file to file
+_ENGINES = {}
+
+
+def garble(text):
+    """What text turns into when its UTF-8 bytes are decoded as cp1251"""
+    return text.encode('utf-8').decode('cp1251', 'mojibake-c1')
+
+
+def build_table():
+    """Merged garbled -> fixed table; a key mapped two different ways is an error"""
+    table = {}
+    pairs = [(garble(text), text) for text in (*PHRASES, *LETTERS, *PUNCTUATION)]
+    pairs.append(LOST_APOSTROPHE)
+    for garbled, fixed in pairs:
+        if table.setdefault(garbled, fixed) != fixed:
+            raise ValueError(f"Conflicting repairs for {garbled!r}: {table[garbled]!r} / {fixed!r}")
+    return table
+
+
+class Repairer:
+    """Table compiled into one regex; alternatives are tried longest first"""
+
+    def __init__(self, table=None):
+        self.table = build_table() if table is None else dict(table)
+        # Sorting (not table order) decides between overlapping keys
+        keys = sorted(self.table, key=lambda key: (-len(key), key))
+        self.pattern = re.compile('|'.join(map(re.escape, keys)))
+        # A match is final once the longest key fits behind it
+        self.overlap = len(keys[0]) if keys else 1
+
+    def fix(self, match):
+        """Repair of one matched key"""
+        return self.table[match.group()]
+
+    def repair(self, text):
+        """Return (repaired text, {garbled: hits})"""
+        hits = {}
+        table = self.table
+
+        def replace(match):
+            garbled = match.group()
+            hits[garbled] = hits.get(garbled, 0) + 1
+            return table[garbled]
+
+        return self.pattern.sub(replace, text), hits
+
+
+def unmangle(run):
+    """Reverse garble(): the run's cp1251 bytes decoded as UTF-8, or None"""
+    try:
+        return run.encode('cp1251', 'mojibake-c1').decode('utf-8')
+    except UnicodeError:
+        return None
+
+
+class Detector:
+    """Table-free repair of garbled runs, with each distinct run decoded once"""
+
+    # Look-ahead that decides where a run ends (separators, one more
+    # sequence) plus the WORD_TAIL after it
+    overlap = 32
+
+    def __init__(self):
+        self.pattern = RUN_PATTERN
+        # {run: repair or None}; read like Repairer.table by format_hits()
+        self.table = {}
+
+    def decode(self, run):
+        """Cached repair of a run's words that unmangle() to plausible Russian/Uzbek
+
+        A word that is a single LONE_AMBIGUOUS pair may be correct text, so
+        it is only repaired next to a word that is certainly garbled (a run
+        that is nothing but that pair is left to fix() and its context).
+        """
+        try:
+            return self.table[run]
+        except KeyError:
+            pass
+        pieces, certain = [], False
+        for match in SEQUENCE_PATTERN.finditer(run):
+            word = match.group()
+            fixed = unmangle(word)
+            if fixed is not None and PLAUSIBLE.issuperset(fixed):
+                pieces.append((match.start(), match.end(), fixed))
+                certain = certain or len(word) > 2 or word[1] not in LONE_AMBIGUOUS
+        if not pieces or not (certain or len(run) == 2):
+            fixed = None
+        else:
+            parts, last = [], 0
+            for start, end, word in pieces:
+                parts.append(run[last:start])
+                parts.append(word)
+                last = end
+            parts.append(run[last:])
+            fixed = ''.join(parts)
+        self.table[run] = fixed
+        return fixed
+
+    def fix(self, match):
+        """Repair of one scanned run, or None to leave it as is"""
+        run = match.group()
+        table = self.table
+        fixed = table[run] if run in table else self.decode(run)
+        if fixed is not None and len(run) == 2 and run[1] in LONE_AMBIGUOUS:
+            text = match.string
+            start, end = match.span()
+            before = text[start - 1] if start else ''
+            if before.islower():
+                return fixed
+            if run[1] in AMBIGUOUS:
+                after = text[end] if end < len(text) else ''
+                return fixed if after.islower() else None
+            tail = WORD_TAIL.match(text, end)
+            if not (tail and SEQUENCE_PATTERN.search(tail.group())):
+                return None
+        return fixed
+
+    def repair(self, text):
+        """Return (repaired text, {garbled: hits})"""
+        hits = {}
+        fix = self.fix
+
+        def replace(match):
+            fixed = fix(match)
+            run = match.group()
+            if fixed is None:
+                return run
+            hits[run] = hits.get(run, 0) + 1
+            return fixed
+
+        return self.pattern.sub(replace, text), hits
+
+
+def read_chunks(path, chunk_size=CHUNK_SIZE):
+    """Text of a UTF-8 file, decoded chunk_size bytes at a time from an mmap"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # The incremental decoder keeps a character split between chunks
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for start in range(0, len(data), chunk_size):
+                yield decoder.decode(data[start:start + chunk_size])
+            yield decoder.decode(b'', final=True)
+
+
+def repair_stream(repairer, chunks, hits):
+    """Repair text arriving in chunks; yields repaired pieces, counting into hits
+
+    Matches that end within repairer.overlap of the buffer's end wait for
+    the next chunk, so the result is the same as repairer.repair() on the
+    whole text. One character before the unprocessed part is kept as the
+    context the detector looks at.
+    """
+    overlap = repairer.overlap
+    buffer, pos = '', 0
+    chunks = iter(chunks)
+    while True:
+        chunk = next(chunks, None)
+        final = chunk is None
+        if not final:
+            buffer += chunk
+            if len(buffer) - pos <= overlap:
+                continue
+        limit = len(buffer) - (0 if final else overlap)
+        pieces, last = [], pos
+        for match in repairer.pattern.finditer(buffer, pos):
+            if match.end() > limit:
+                # May still grow into the next chunk; and past the limit
+                # the scanner didn't see enough to rule out other matches
+                limit = min(limit, match.start())
+                break
+            fixed = repairer.fix(match)
+            if fixed is None:
+                continue
+            garbled = match.group()
+            hits[garbled] = hits.get(garbled, 0) + 1
+            pieces.append(buffer[last:match.start()])
+            pieces.append(fixed)
+            last = match.end()
+        pieces.append(buffer[last:limit])
+        yield ''.join(pieces)
+        if final:
+            return
+        if limit:
+            buffer, pos = buffer[limit - 1:], 1
+
+
+def format_hits(hits, table, limit=10):
+    """Most frequent repairs, one per line"""
+    lines = []
+    for garbled, count in sorted(hits.items(), key=lambda item: (-item[1], item[0]))[:limit]:
+        lines.append(f"    {count:6,}  {table[garbled][:40]!r}")
+    if len(hits) > limit:
+        lines.append(f"    ... {len(hits) - limit} more patterns")
+    return '\n'.join(lines)
+
+
+def needs_repair(path, repairer, chunk_size=CHUNK_SIZE):
+    """True as soon as the streamed file shows one repair"""
+    hits = {}
+    for _ in repair_stream(repairer, read_chunks(path, chunk_size), hits):
+        if hits:
+            return True
+    return bool(hits)
+
+
+def repair_file(path, repairer=None, dry_run=False, chunk_size=CHUNK_SIZE):
+    """Repair one UTF-8 file in place, streamed; returns {garbled: hits}
+
+    A file is only rewritten once a read-only pass has found something, so
+    clean files are scanned once and never touched.
+    """
+    repairer = repairer or Detector()
+    hits = {}
+    if dry_run:
+        for _ in repair_stream(repairer, read_chunks(path, chunk_size), hits):
+            pass
+        return hits
+    if needs_repair(path, repairer, chunk_size):
+        pieces = repair_stream(repairer, read_chunks(path, chunk_size), hits)
+        atomic_write(path, (piece.encode('utf-8') for piece in pieces))
+    return hits
+
+
+def file_hash(path):
+    """sha256 of a file's bytes, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_text_files(paths):
+    """Yield files from a mix of files, directories and glob patterns, once each"""
+    seen = set()
+    for pattern in paths:
+        if any(char in pattern for char in '*?['):
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                print(f"WARNING: {pattern} matches nothing")
+        else:
+            matches = [pattern]
+        for path in matches:
+            if os.path.isdir(path):
+                found = []
+                for root, dirs, files in os.walk(path):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                    found.extend(os.path.join(root, name) for name in sorted(files)
+                                 if name.endswith(EXTENSIONS) and not name.startswith('.'))
+            else:
+                found = [path]
+            for found_path in found:
+                found_path = os.path.normpath(found_path)
+                if found_path not in seen:
+                    seen.add(found_path)
+                    yield found_path
+
+
+def repair_task(path, previous=None, engine='detector', dry_run=False):
+    """Repair one file; runs in a worker process
+
+    Returns (status, manifest entry or None, runs, patterns, detail, seconds)
+    with status 'unchanged' (skipped via previous), 'clean', 'repaired',
+    'would repair' or 'error' (detail is the message).
+    """
+    started = time.perf_counter()
+    try:
+        stat = os.stat(path)
+        if previous and previous.get('engine') == engine and previous.get('size') == stat.st_size:
+            if previous.get('mtime_ns') == stat.st_mtime_ns:
+                return 'unchanged', previous, 0, 0, '', time.perf_counter() - started
+            if file_hash(path) == previous.get('sha256'):
+                entry = dict(previous, mtime_ns=stat.st_mtime_ns)
+                return 'unchanged', entry, 0, 0, '', time.perf_counter() - started
+
+        if engine not in _ENGINES:
+            _ENGINES[engine] = Repairer() if engine == 'tables' else Detector()
+        repairer = _ENGINES[engine]
+        hits = repair_file(path, repairer, dry_run)
+    except (OSError, UnicodeDecodeError) as e:
+        return 'error', None, 0, 0, str(e), time.perf_counter() - started
+
+    entry = None
+    if not hits or not dry_run:
+        stat = os.stat(path)
+        entry = {'engine': engine, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                 'sha256': file_hash(path)}
+    status = 'clean' if not hits else 'would repair' if dry_run else 'repaired'
+    detail = format_hits(hits, repairer.table) if hits else ''
+    return status, entry, sum(hits.values()), len(hits), detail, time.perf_counter() - started
+
+
+def repair_files(paths, workers=None, manifest_path=MOJIBAKE_MANIFEST, engine='detector',
+                 dry_run=False, verbose=True):
+    """Repair every file under paths on a process pool; returns {status: files}"""
+    entries = load_hashes(manifest_path) if manifest_path else {}
+    workers = workers or os.cpu_count() or 1
+    counts = {}
+
+    own_manifest = os.path.abspath(manifest_path) if manifest_path else None
+    tasks = ((path, entries.get(path), engine, dry_run) for path in iter_text_files(paths)
+             if os.path.abspath(path) != own_manifest)
+    try:
+        for (path, *_), (status, entry, runs, patterns, detail, seconds) in run_pool(
+                repair_task, tasks, workers, 'process'):
+            counts[status] = counts.get(status, 0) + 1
+            if entry is None:
+                entries.pop(path, None)
+            else:
+                entries[path] = entry
+            if status == 'error':
+                print(f"ERROR {path}: {detail}")
+            elif status in ('repaired', 'would repair'):
+                print(f"✓ {path}: {status} {runs:,} runs ({patterns} patterns) in {seconds:.2f}s")
+                if verbose:
+                    print(detail)
+            elif status == 'clean' and verbose:
+                print(f"✓ {path}: clean in {seconds:.2f}s")
+    finally:
+        if manifest_path:
+            atomic_write(manifest_path, json.dumps(entries, sort_keys=True, indent=1))
+    return counts
+
+
+def line_index(text):
+    """Offset of the first character of every line"""
+    return [0] + [match.end() for match in NEWLINE_PATTERN.finditer(text)]
+
+
+def scan_file(path, repairer):
+    """Read-only: (line, column, garbled, fixed) for every run that would be repaired"""
+    text = ''.join(read_chunks(path))
+    findings = []
+    starts = None
+    for match in repairer.pattern.finditer(text):
+        fixed = repairer.fix(match)
+        if fixed is None:
+            continue
+        if starts is None:
+            starts = line_index(text)
+        offset = match.start()
+        line = bisect_right(starts, offset)
+        findings.append((line, offset - starts[line - 1] + 1, match.group(), fixed))
+    return findings
+
+
+def check_files(paths, engine='detector'):
+    """Report every remaining run under paths; returns (findings, files with findings, files, errors)"""
+    repairer = Repairer() if engine == 'tables' else Detector()
+    total = dirty = files = errors = 0
+    for path in iter_text_files(paths):
+        files += 1
+        try:
+            findings = scan_file(path, repairer)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"ERROR {path}: {e}")
+            errors += 1
+            continue
+        for line, column, garbled, fixed in findings:
+            print(f"{path}:{line}:{column}: {garbled[:40]!r} -> {fixed[:40]!r}")
+        total += len(findings)
+        dirty += bool(findings)
+    return total, dirty, files, errors
+
+
+def bench(size):
+    """Time the detector and the single pass against the old replace-per-pair loop"""
+    repairer = Repairer()
+    # Garbled phrases between markup and Cyrillic that is already correct
+    sample = garble(' '.join(PHRASES)) + ' <div class="x">уже правильный текст</div>\n'
+    expected = ' '.join(PHRASES) + ' <div class="x">уже правильный текст</div>\n'
+    copies = size // len(sample) + 1
+    text, expected = sample * copies, expected * copies
+
+    started = time.perf_counter()
+    fixed, hits = repairer.repair(text)
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    detected, _ = Detector().repair(text)
+    detector = time.perf_counter() - started
+
+    started = time.perf_counter()
+    legacy = text
+    for garbled, correct in repairer.table.items():
+        if legacy.count(garbled):
+            legacy = legacy.replace(garbled, correct)
+    loop = time.perf_counter() - started
+
+    print(f"{len(text):,} characters, {len(repairer.table)} patterns, {sum(hits.values()):,} repairs")
+    print(f"  replace loop: {loop:.3f}s")
+    print(f"  single pass:  {single:.3f}s ({loop / single:.1f}x)")
+    print(f"  detector:     {detector:.3f}s ({loop / detector:.1f}x)")
+    # In table order a shorter phrase splits a longer one before it gets its turn
+    print(f"  exact repair: detector {detected == expected}, single pass {fixed == expected}, "
+          f"replace loop {legacy == expected}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Repair cp1251/UTF-8 mojibake in UTF-8 text files.")
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_ASSETS_DIR],
+                        help=f"Files, directories or glob patterns to repair in place (default: {DEFAULT_ASSETS_DIR})")
+    parser.add_argument('--dry-run', action='store_true', help="Report repairs without writing")
+    parser.add_argument('--check', action='store_true',
+                        help="Read-only lint: list every run with line and column, exit 1 if any")
+    parser.add_argument('--tables', action='store_true', help="Use the merged tables instead of the detector")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--manifest', default=MOJIBAKE_MANIFEST,
+                        help=f"Manifest of files known to be clean (default: {MOJIBAKE_MANIFEST})")
+    parser.add_argument('--no-manifest', action='store_true', help="Scan every file, don't read or write the manifest")
+    parser.add_argument('--quiet', action='store_true', help="Only print repaired files and the summary")
+    parser.add_argument('--bench', type=int, metavar='N', help="Benchmark on N synthetic characters")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.bench:
+        bench(args.bench)
+        return 0
+
+    started = time.perf_counter()
+    if args.check:
+        total, dirty, files, errors = check_files(args.paths, 'tables' if args.tables else 'detector')
+        elapsed = time.perf_counter() - started
+        if total:
+            print(f"\n✗ {total:,} mojibake runs in {dirty} of {files} files ({elapsed:.2f}s)")
+        elif errors:
+            print(f"\n✗ {errors} of {files} files could not be read ({elapsed:.2f}s)")
+        else:
+            print(f"✓ No mojibake in {files} files ({elapsed:.2f}s)")
+        return 1 if total or errors else 0
+
+    counts = repair_files(args.paths, args.workers, None if args.no_manifest else args.manifest,
+                          'tables' if args.tables else 'detector', args.dry_run, not args.quiet)
+    elapsed = time.perf_counter() - started
+    repaired = counts.get('repaired', 0) + counts.get('would repair', 0)
+    print(f"\n✓ Done! {repaired} {'to repair' if args.dry_run else 'repaired'}, {counts.get('clean', 0)} clean, "
+          f"{counts.get('unchanged', 0)} unchanged since the last run, {counts.get('error', 0)} errors "
+          f"in {elapsed:.2f}s")
+    return 1 if counts.get('error') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
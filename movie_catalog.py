@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Sharded slug -> movie lookup catalog for deep links
+Writes catalog/index.json plus content-hashed shards (catalog/<hash>.json),
+one per slug prefix, each holding only the fields a movie page needs. A deep
+link like #slug.html then fetches the index and one small shard instead of
+waiting for the whole movies snapshot (see loadCatalogEntry() in index.html).
+Built by firebase_movie_generator.py on every run.
+"""
+
+import os
+import json
+import hashlib
+
+from page_writer import atomic_write, remove_file
+
+CATALOG_DIR = 'catalog'
+
+# Characters of the (lowercased) slug used as shard key; must match index.html
+PREFIX_LEN = 2
+
+# Row layout inside a shard: {slug: [one value per CATALOG_FIELDS entry, in order]}
+CATALOG_FIELDS = ('id', 'title', 'year', 'poster', 'rating', 'genre', 'srcset', 'blurhash')
+
+
+def slug_key(slug):
+    """Normalized lookup key, same as normalizeSlugKey() in index.html"""
+    return str(slug or '').strip().lower()
+
+
+def shard_prefix(key):
+    """Shard a normalized slug belongs to"""
+    return key[:PREFIX_LEN]
+
+
+def catalog_row(fields):
+    """Compact row from movie_page_fields() output plus poster_card_fields()"""
+    return [fields['movie_id'], fields['movie_title'], fields['movie_year'],
+            fields.get('poster_src') or fields['movie_poster'], fields['movie_rating'], fields['movie_genre'],
+            fields.get('poster_srcset', ''), fields.get('poster_blurhash', '')]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class CatalogBuilder:
+    """Collects catalog rows and rewrites only the shards that changed
+
+    fresh=True starts from an empty catalog (full builds); otherwise shards
+    are loaded lazily from disk when a delta run touches them.
+    """
+
+    def __init__(self, output_dir, fresh=False):
+        self.catalog_dir = os.path.join(output_dir, CATALOG_DIR)
+        self.fresh = fresh
+        self.index = {} if fresh else self._load_index()
+        self.shards = {}
+        self.dirty = set()
+
+    def _load_index(self):
+        """prefix -> shard filename from the last build"""
+        index_path = os.path.join(self.catalog_dir, 'index.json')
+        if not os.path.exists(index_path):
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: ignoring unreadable catalog index {index_path}: {e}")
+            return {}
+        if list(data.get('fields', [])) != list(CATALOG_FIELDS):
+            # Row layout changed: every shard has to be rebuilt
+            return {}
+        return dict(data.get('shards', {}))
+
+    def _shard(self, prefix):
+        """Rows of one shard, loaded from disk on first use"""
+        if prefix not in self.shards:
+            rows = {}
+            filename = self.index.get(prefix)
+            if filename:
+                try:
+                    with open(os.path.join(self.catalog_dir, filename), 'r', encoding='utf-8') as f:
+                        rows = json.load(f)
+                except (OSError, ValueError):
+                    rows = {}
+            self.shards[prefix] = rows
+        return self.shards[prefix]
+
+    def upsert(self, fields):
+        """Add or update the row for one movie"""
+        key = slug_key(fields['movie_slug'])
+        if not key:
+            return
+        prefix = shard_prefix(key)
+        row = catalog_row(fields)
+        shard = self._shard(prefix)
+        if shard.get(key) != row:
+            shard[key] = row
+            self.dirty.add(prefix)
+
+    def remove(self, slug):
+        """Drop a movie's row"""
+        key = slug_key(slug)
+        if not key:
+            return
+        prefix = shard_prefix(key)
+        if self._shard(prefix).pop(key, None) is not None:
+            self.dirty.add(prefix)
+
+    def save(self):
+        """Write changed shards and the index; returns a stats dict"""
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        written = 0
+        for prefix in sorted(self.dirty):
+            rows = self.shards[prefix]
+            if not rows:
+                self.index.pop(prefix, None)
+                continue
+            data = json.dumps(rows, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+            filename = hashlib.sha256(data.encode('utf-8')).hexdigest()[:16] + '.json'
+            filepath = os.path.join(self.catalog_dir, filename)
+            # Same content, same name: nothing to write
+            if not os.path.exists(filepath):
+                atomic_write(filepath, data)
+                written += 1
+            self.index[prefix] = filename
+        self.dirty.clear()
+
+        index = {'fields': list(CATALOG_FIELDS), 'prefixLength': PREFIX_LEN,
+                 'shards': dict(sorted(self.index.items()))}
+        atomic_write(os.path.join(self.catalog_dir, 'index.json'),
+                     json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+
+        # Shards no longer referenced by the index
+        live = set(self.index.values())
+        removed = 0
+        for name in os.listdir(self.catalog_dir):
+            if name.endswith('.json') and name != 'index.json' and name not in live:
+                remove_file(os.path.join(self.catalog_dir, name))
+                removed += 1
+
+        sizes = sorted(os.path.getsize(os.path.join(self.catalog_dir, name)) for name in live)
+        return {
+            'shards': len(sizes),
+            'written': written,
+            'removed': removed,
+            'total_bytes': sum(sizes),
+            'min': sizes[0] if sizes else 0,
+            'p50': percentile(sizes, 50),
+            'p95': percentile(sizes, 95),
+            'max': sizes[-1] if sizes else 0,
+        }
+
+
+def format_stats(stats):
+    """One line summary of CatalogBuilder.save() stats"""
+    return (f"✓ Catalog: {stats['shards']} shards ({stats['written']} written, {stats['removed']} removed), "
+            f"{stats['total_bytes']:,} bytes; shard size min {stats['min']:,} / p50 {stats['p50']:,} "
+            f"/ p95 {stats['p95']:,} / max {stats['max']:,}")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compact movie record for the page generators
+A Firestore document only needs a dozen fields to become a page. Movie
+keeps exactly those in __slots__ (no per-instance dict) and answers the
+same get()/[] calls as the plain dicts it replaces, so snapshot loading,
+the poster pipeline and movie_page_fields() work with either.
+"""
+
+# Fields pages, indexes and the delta watermark read, the derived fields
+# movie_writeback.py compares against, plus posterVariants attached by
+# poster_pipeline.py and relatedTitles looked up from `related`
+MOVIE_FIELDS = ('id', 'slug', 'title', 'year', 'originalTitle', 'description',
+                'genre', 'poster', 'rating', 'sndRating', 'sndVotes', 'updatedAt', 'related',
+                'canonicalSlug', 'pageUrl', 'searchTokens', 'pageHash',
+                'posterVariants', 'relatedTitles')
+
+
+class Movie:
+    """Page fields of one movie; a field that was never set reads as missing"""
+
+    __slots__ = MOVIE_FIELDS
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            if name in MOVIE_FIELDS:
+                setattr(self, name, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Record from a document dict; fields pages don't use are dropped"""
+        movie = cls.__new__(cls)
+        for name in MOVIE_FIELDS:
+            if name in data:
+                setattr(movie, name, data[name])
+        return movie
+
+    @classmethod
+    def from_snapshot(cls, movie_doc):
+        """Record from a Firestore snapshot, or None for an empty document"""
+        data = movie_doc.to_dict()
+        if not data:
+            return None
+        movie = cls.from_dict(data)
+        if not hasattr(movie, 'id'):
+            movie.id = movie_doc.id
+        return movie
+
+    def get(self, name, default=None):
+        """dict.get(): default when the field is missing"""
+        return getattr(self, name, default)
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name, value):
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return hasattr(self, name)
+
+    def to_dict(self):
+        """Plain dict of the fields that are set (for snapshots and JSON)"""
+        return {name: getattr(self, name) for name in MOVIE_FIELDS if hasattr(self, name)}
+
+    def __repr__(self):
+        return f"Movie({self.to_dict()!r})"
@@ -0,0 +1,789 @@
+#!/usr/bin/env python3
+"""
+Prebuilt multilingual search index for the movie catalog
+Titles come in Uzbek Latin, Uzbek/Russian Cyrillic and English, so title and
+originalTitle are folded to one Latin spelling (lowercase, Cyrillic
+transliterated, apostrophes and accents dropped) and split into padded
+trigrams. Every file has a fixed name, so index.json stays a few hundred
+bytes and type-ahead only fetches the files of its own trigrams:
+
+    search/index.json              {"buckets": n, "docBlock": 4, "pageRange": 2048, "count": n, "end": n, ...}
+    search/g/<key>.json            {trigram: [first doc, delta, ...] or doc count}
+    search/p/<hash>-<page>.json    {trigram: [first doc, delta, ...]} for one page of doc numbers
+    search/d/<block>.json          [[slug, id, title, originalTitle] or null, ...]
+    search/s/<key>.json            {slug: doc number}, only read by the builder
+
+Shards (g/) are picked by a hash of the whole trigram (FNV-1a, easy to
+repeat in JS), with enough of them to average SHARD_TARGET_BYTES or less.
+A trigram found in more than INLINE_MAX movies keeps only its count in the
+shard and its postings in pages of PAGE_RANGE doc numbers, so a common
+trigram costs one small page instead of its whole list.
+
+A movie keeps its doc number from run to run (new movies get the next free
+one), so a delta run only rewrites the shards and pages of the trigrams
+that changed, plus the movie's doc block and slug map.
+
+Built by firebase_movie_generator.py next to the slug catalog (movie_catalog.py).
+Query it: python movie_search.py "query"
+Benchmark: python movie_search.py --bench 100000
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import unicodedata
+from collections import defaultdict
+
+from movie_catalog import percentile
+from page_writer import atomic_write, remove_file
+
+SEARCH_DIR = 'search'
+
+# Bumped when the file layout changes; an index in another layout is rebuilt
+INDEX_VERSION = 2
+
+# Rows per doc block; a result page only needs the blocks its hits fall in
+DOC_BLOCK = 4
+
+# Shards are added (in powers of two) until their average size is at most this
+SHARD_TARGET_BYTES = 512
+MAX_BUCKETS = 1 << 16
+
+# Posting lists longer than this move out of the shard into pages, each
+# covering PAGE_RANGE doc numbers
+INLINE_MAX = 128
+PAGE_RANGE = 2048
+
+# Slug -> doc number maps the builder keeps next to the index
+SLUG_BUCKETS = 1024
+
+# Share of query trigrams a fuzzy (typo) match must still hit
+FUZZY_MIN_SHARE = 0.6
+
+# Uzbek/Russian Cyrillic -> Uzbek Latin; х follows Uzbek (x), not English (kh)
+_TRANSLIT = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo',
+    'ж': 'j', 'з': 'z', 'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '',
+    'ы': 'i', 'ь': '', 'э': 'e', 'ю': 'yu', 'я': 'ya', 'ў': 'o', 'қ': 'q',
+    'ғ': 'g', 'ҳ': 'h',
+}
+# o‘zbek / oʻzbek / o'zbek / o`zbek all fold to ozbek
+_APOSTROPHES = "'`‘’ʻʼ"
+FOLD_TABLE = str.maketrans({**_TRANSLIT, **{c: '' for c in _APOSTROPHES}})
+
+
+def fold(text):
+    """Lowercase, transliterate and strip accents; non-alphanumerics become spaces"""
+    text = str(text or '').lower().translate(FOLD_TABLE)
+    # Transliterate before NFKD, which would otherwise split й and ё into base + mark
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c if c.isalnum() else ' ' for c in text
+                   if not unicodedata.combining(c)).strip()
+
+
+def word_grams(word):
+    """Padded trigrams of one folded word; a single letter is its own prefix gram"""
+    padded = ' ' + word
+    if len(padded) < 3:
+        return [padded]
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def text_grams(text):
+    """Distinct grams of a whole (unfolded) text"""
+    grams = set()
+    for word in fold(text).split():
+        grams.update(word_grams(word))
+        # Prefix gram so one-letter queries still find longer words
+        grams.add(' ' + word[0])
+    return grams
+
+
+def search_tokens(*texts):
+    """Sorted distinct folded words of the texts, for array-contains queries on Firestore"""
+    return sorted({word for text in texts for word in fold(text).split()})
+
+
+def gram_hash(gram):
+    """32-bit FNV-1a of the gram's UTF-8 bytes"""
+    value = 0x811c9dc5
+    for byte in gram.encode('utf-8'):
+        value = ((value ^ byte) * 0x01000193) & 0xffffffff
+    return value
+
+
+def shard_key(gram, buckets):
+    """Shard a gram lives in out of `buckets` (a power of two)"""
+    return gram_hash(gram) & (buckets - 1)
+
+
+def delta_encode(numbers):
+    """Sorted doc numbers -> first number followed by gaps"""
+    out = []
+    previous = 0
+    for number in numbers:
+        out.append(number - previous)
+        previous = number
+    return out
+
+
+def delta_decode(deltas):
+    """Inverse of delta_encode()"""
+    out = []
+    total = 0
+    for delta in deltas:
+        total += delta
+        out.append(total)
+    return out
+
+
+def _dump(data):
+    """Compact JSON text with sorted keys, so equal data gives equal bytes"""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+
+def _shard_bytes(shard):
+    """Size of a shard file; 0 once it is empty and gets deleted"""
+    return len(_dump(shard).encode('utf-8')) if shard else 0
+
+
+def _row_grams(row):
+    """Trigrams of a doc row's titles; none for a missing row"""
+    if row is None:
+        return set()
+    return text_grams(f"{row[2]} {row[3]}")
+
+
+def shard_path(key):
+    """Shard of one bucket, relative to the search dir"""
+    return f"g/{key:x}.json"
+
+
+def page_path(gram, page):
+    """Page of a long posting list; grams whose hashes collide share the file"""
+    return f"p/{gram_hash(gram):08x}-{page}.json"
+
+
+def block_path(block):
+    """Block of doc rows"""
+    return f"d/{block}.json"
+
+
+def slug_path(slug):
+    """Builder-only slug -> doc number map the slug belongs to"""
+    return f"s/{gram_hash(slug) & (SLUG_BUCKETS - 1):x}.json"
+
+
+def _read_text(filepath):
+    """File contents, or None if it cannot be read"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class SearchIndexBuilder:
+    """Collects changed titles and updates the index files they touch
+
+    A delta run loads only the slug maps and doc blocks of the movies it
+    saw and the shards and pages of the trigrams that were added or
+    dropped, and writes back just those. A fresh (complete) build, an
+    index in another layout, or doc numbers that are more than half holes
+    rebuild every file instead, keeping the doc numbers of the movies seen
+    again; files that come out byte-identical are not rewritten.
+    """
+
+    def __init__(self, output_dir, fresh=False):
+        self.search_dir = os.path.join(output_dir, SEARCH_DIR)
+        self.fresh = fresh
+        self.meta = self._load_meta()
+        self.changes = {}
+        self.files = {}
+        self.sizes = {}
+        self.dirty = set()
+
+    def _load_meta(self):
+        """index.json of the last build, or None when missing or in another layout"""
+        index_path = os.path.join(self.search_dir, 'index.json')
+        if not os.path.exists(index_path):
+            return None
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: ignoring unreadable search index {index_path}: {e}")
+            return None
+        layout = {'version': INDEX_VERSION, 'docBlock': DOC_BLOCK, 'pageRange': PAGE_RANGE}
+        if not isinstance(meta, dict) or any(meta.get(name) != value for name, value in layout.items()):
+            if not self.fresh:
+                print(f"WARNING: search index {index_path} has an older layout; "
+                      f"it is rebuilt from this run's movies until the next full run")
+            return None
+        return meta
+
+    def upsert(self, fields):
+        """Add or update one movie from movie_page_fields() output"""
+        slug = fields['movie_slug']
+        if slug:
+            self.changes[slug] = [slug, fields['movie_id'], fields['movie_title'],
+                                  fields['movie_original_title']]
+
+    def remove(self, slug):
+        """Drop a movie"""
+        if slug:
+            self.changes[slug] = None
+
+    def _read(self, rel, default):
+        """Parsed contents of one index file, loaded once; `default` if it is missing or unreadable"""
+        if rel not in self.files:
+            data = default
+            text = _read_text(os.path.join(self.search_dir, rel))
+            if text is not None:
+                try:
+                    data = json.loads(text)
+                except ValueError:
+                    pass
+            self.files[rel] = data
+            self.sizes[rel] = len(text.encode('utf-8')) if data is not default else 0
+        return self.files[rel]
+
+    def _page_count(self):
+        """Pages the current doc numbers span"""
+        return -(-self.meta['end'] // PAGE_RANGE)
+
+    def _apply(self):
+        """Apply the queued changes to the slug maps, doc blocks and postings they touch"""
+        meta = self.meta
+        added, dropped = defaultdict(set), defaultdict(set)
+        for slug, row in sorted(self.changes.items()):
+            slugs = self._read(slug_path(slug), {})
+            number = slugs.get(slug)
+            old = None
+            if number is not None:
+                old = self._read(block_path(number // DOC_BLOCK), [None] * DOC_BLOCK)[number % DOC_BLOCK]
+            if row == old:
+                continue
+            if row is None:
+                del slugs[slug]
+                meta['count'] -= 1
+            else:
+                if number is None:
+                    number = meta['end']
+                    meta['end'] += 1
+                    slugs[slug] = number
+                if old is None:
+                    meta['count'] += 1
+            rel = block_path(number // DOC_BLOCK)
+            self._read(rel, [None] * DOC_BLOCK)[number % DOC_BLOCK] = row
+            self.dirty.update((slug_path(slug), rel))
+
+            old_grams, new_grams = _row_grams(old), _row_grams(row)
+            for gram in old_grams - new_grams:
+                dropped[gram].add(number)
+            for gram in new_grams - old_grams:
+                added[gram].add(number)
+
+        for gram in sorted(set(added) | set(dropped)):
+            self._update_postings(gram, added[gram], dropped[gram])
+        self._split_shards()
+
+    def _write_pages(self, gram, numbers):
+        """Move a posting list into its pages"""
+        pages = defaultdict(list)
+        for number in sorted(numbers):
+            pages[number // PAGE_RANGE].append(number)
+        for page, members in pages.items():
+            rel = page_path(gram, page)
+            self._read(rel, {})[gram] = delta_encode(members)
+            self.dirty.add(rel)
+
+    def _update_postings(self, gram, add, drop):
+        """Add and drop doc numbers in one trigram's postings, paging or unpaging the list as it crosses INLINE_MAX"""
+        rel = shard_path(shard_key(gram, self.meta['buckets']))
+        shard = self._read(rel, {})
+        self.dirty.add(rel)
+        entry = shard.get(gram)
+        if not isinstance(entry, int):
+            numbers = (set(delta_decode(entry or ())) | add) - drop
+            if len(numbers) > INLINE_MAX:
+                self._write_pages(gram, numbers)
+                shard[gram] = len(numbers)
+            elif numbers:
+                shard[gram] = delta_encode(sorted(numbers))
+            else:
+                shard.pop(gram, None)
+            return
+
+        count = entry
+        for page in sorted({number // PAGE_RANGE for number in add | drop}):
+            page_rel = page_path(gram, page)
+            postings = self._read(page_rel, {})
+            numbers = set(delta_decode(postings.get(gram, ())))
+            before = len(numbers)
+            numbers = (numbers | {number for number in add if number // PAGE_RANGE == page}) - drop
+            count += len(numbers) - before
+            if numbers:
+                postings[gram] = delta_encode(sorted(numbers))
+            else:
+                postings.pop(gram, None)
+            self.dirty.add(page_rel)
+        # Half of INLINE_MAX, so a list near the limit does not move on every change
+        if count > INLINE_MAX // 2:
+            shard[gram] = count
+            return
+        numbers = []
+        for page in range(self._page_count()):
+            page_rel = page_path(gram, page)
+            postings = self._read(page_rel, {})
+            if gram in postings:
+                numbers += delta_decode(postings.pop(gram))
+                self.dirty.add(page_rel)
+        if numbers:
+            shard[gram] = delta_encode(numbers)
+        else:
+            shard.pop(gram, None)
+
+    def _split_shards(self):
+        """Double the buckets while the shards average more than SHARD_TARGET_BYTES
+
+        Every shard moves when that happens; pages and doc blocks do not
+        depend on the bucket count and stay where they are.
+        """
+        meta = self.meta
+        for rel in self.dirty:
+            if rel.startswith('g/'):
+                size = _shard_bytes(self.files[rel])
+                meta['shardBytes'] += size - self.sizes[rel]
+                self.sizes[rel] = size
+        while meta['shardBytes'] > SHARD_TARGET_BYTES * meta['buckets'] and meta['buckets'] < MAX_BUCKETS:
+            buckets = meta['buckets'] * 2
+            split = [{} for _ in range(buckets)]
+            for key in range(buckets // 2):
+                for gram, entry in self._read(shard_path(key), {}).items():
+                    split[shard_key(gram, buckets)][gram] = entry
+            meta['shardBytes'] = 0
+            for key, shard in enumerate(split):
+                rel = shard_path(key)
+                self.files[rel] = shard
+                self.sizes[rel] = _shard_bytes(shard)
+                self.dirty.add(rel)
+                meta['shardBytes'] += self.sizes[rel]
+            meta['buckets'] = buckets
+
+    def _flush(self):
+        """Write every changed file, deleting the ones left empty; returns (written, removed)"""
+        written = removed = 0
+        for rel in sorted(self.dirty):
+            data = self.files[rel]
+            filepath = os.path.join(self.search_dir, rel)
+            if any(data):
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                atomic_write(filepath, _dump(data))
+                written += 1
+            elif remove_file(filepath):
+                removed += 1
+        self.dirty.clear()
+        return written, removed
+
+    def _existing_files(self):
+        """Index files on disk (relative paths), old-layout leftovers included"""
+        found = [name for name in os.listdir(self.search_dir)
+                 if name.endswith('.json') and name != 'index.json']
+        for sub in ('g', 'p', 'd', 's'):
+            folder = os.path.join(self.search_dir, sub)
+            if os.path.isdir(folder):
+                found += [f"{sub}/{name}" for name in os.listdir(folder) if name.endswith('.json')]
+        return found
+
+    def _all_numbers(self):
+        """{slug: doc number} of the whole last build"""
+        numbers = {}
+        if self.meta is None:
+            return numbers
+        for rel in self._existing_files():
+            if rel.startswith('s/'):
+                numbers.update(self._read(rel, {}))
+        return numbers
+
+    def _all_docs(self):
+        """{slug: row} of the whole index, queued changes applied"""
+        docs = {}
+        for block in range(-(-self.meta['end'] // DOC_BLOCK)):
+            for row in self._read(block_path(block), ()):
+                if row:
+                    docs[row[0]] = row
+        return docs
+
+    def _rebuild(self, docs, numbers):
+        """Write every file for `docs` ({slug: row}), keeping the given doc numbers; returns (written, removed)"""
+        numbers = {slug: number for slug, number in numbers.items() if slug in docs}
+        end = max(numbers.values(), default=-1) + 1
+        new = sorted(slug for slug in docs if slug not in numbers)
+        if end + len(new) > 2 * len(docs):
+            # More than half would be holes left by removed movies: renumber in slug order
+            numbers, end, new = {}, 0, sorted(docs)
+        for slug in new:
+            numbers[slug] = end
+            end += 1
+
+        files = defaultdict(dict)
+        postings = defaultdict(list)
+        for slug, number in sorted(numbers.items(), key=lambda item: item[1]):
+            row = docs[slug]
+            files[slug_path(slug)][slug] = number
+            files.setdefault(block_path(number // DOC_BLOCK), [None] * DOC_BLOCK)[number % DOC_BLOCK] = row
+            # Doc numbers are visited in order, so every list comes out sorted
+            for gram in _row_grams(row):
+                postings[gram].append(number)
+
+        entries = {}
+        for gram, members in postings.items():
+            if len(members) <= INLINE_MAX:
+                entries[gram] = delta_encode(members)
+                continue
+            entries[gram] = len(members)
+            pages = defaultdict(list)
+            for number in members:
+                pages[number // PAGE_RANGE].append(number)
+            for page, part in pages.items():
+                files[page_path(gram, page)][gram] = delta_encode(part)
+
+        # Each entry adds its bytes plus a comma to whichever shard it lands in
+        shard_bytes = sum(_shard_bytes({gram: entry}) + 1 for gram, entry in entries.items())
+        buckets = 1
+        while shard_bytes > SHARD_TARGET_BYTES * buckets and buckets < MAX_BUCKETS:
+            buckets *= 2
+        shards = defaultdict(dict)
+        for gram, entry in entries.items():
+            shards[shard_key(gram, buckets)][gram] = entry
+        for key, shard in shards.items():
+            files[shard_path(key)] = shard
+
+        written = 0
+        for rel, data in files.items():
+            text = _dump(data)
+            filepath = os.path.join(self.search_dir, rel)
+            if _read_text(filepath) != text:
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+                atomic_write(filepath, text)
+                written += 1
+        removed = 0
+        for rel in self._existing_files():
+            if rel not in files:
+                remove_file(os.path.join(self.search_dir, rel))
+                removed += 1
+
+        self.meta = {'version': INDEX_VERSION, 'hash': 'fnv1a32', 'buckets': buckets, 'docBlock': DOC_BLOCK,
+                     'pageRange': PAGE_RANGE, 'count': len(docs), 'end': end,
+                     'shardBytes': sum(_shard_bytes(shard) for shard in shards.values())}
+        self.files, self.sizes, self.dirty = {}, {}, set()
+        return written, removed
+
+    def save(self):
+        """Write the changed files and the index; returns a stats dict"""
+        os.makedirs(self.search_dir, exist_ok=True)
+        if self.fresh or self.meta is None:
+            docs = {slug: row for slug, row in self.changes.items() if row}
+            written, removed = self._rebuild(docs, self._all_numbers())
+            self.fresh = False
+        else:
+            self._apply()
+            if self.meta['end'] > 2 * self.meta['count']:
+                written, removed = self._rebuild(self._all_docs(), {})
+            else:
+                written, removed = self._flush()
+        self.changes = {}
+        atomic_write(os.path.join(self.search_dir, 'index.json'), _dump(self.meta))
+        return {
+            'docs': self.meta['count'],
+            'shards': self.meta['buckets'],
+            'written': written,
+            'removed': removed,
+        }
+
+
+def format_stats(stats):
+    """One line summary of SearchIndexBuilder.save() stats"""
+    return (f"✓ Search index: {stats['docs']} movies in {stats['shards']} shards "
+            f"({stats['written']} files written, {stats['removed']} removed)")
+
+
+class SearchIndex:
+    """Read side of the index; files are loaded on first use, as a client would fetch them"""
+
+    def __init__(self, output_dir):
+        self.search_dir = os.path.join(output_dir, SEARCH_DIR)
+        self._files = {}
+        self._pages = {}
+        self.bytes_loaded = 0
+        self.index = self._load('index.json')
+        if self.index is None:
+            raise FileNotFoundError(os.path.join(self.search_dir, 'index.json'))
+
+    def _load(self, rel):
+        """Parse one index file (None if it does not exist), counting the bytes fetched"""
+        if rel not in self._files:
+            data = None
+            filepath = os.path.join(self.search_dir, rel)
+            if os.path.exists(filepath):
+                self.bytes_loaded += os.path.getsize(filepath)
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            self._files[rel] = data
+        return self._files[rel]
+
+    def _page_count(self):
+        """Pages the doc numbers span"""
+        return -(-self.index['end'] // self.index['pageRange'])
+
+    def entry(self, gram):
+        """Delta-encoded postings of a trigram, its doc count if they are paged, or None"""
+        shard = self._load(shard_path(shard_key(gram, self.index['buckets']))) or {}
+        return shard.get(gram)
+
+    def page(self, gram, page):
+        """Doc numbers of a paged trigram within one page"""
+        if (gram, page) not in self._pages:
+            postings = self._load(page_path(gram, page)) or {}
+            self._pages[gram, page] = set(delta_decode(postings.get(gram, ())))
+        return self._pages[gram, page]
+
+    def doc(self, number):
+        """[slug, id, title, originalTitle] of one doc number, or None"""
+        block = self._load(block_path(number // self.index['docBlock'])) or ()
+        offset = number % self.index['docBlock']
+        return block[offset] if offset < len(block) else None
+
+    def _matches(self, number, words):
+        """True when every folded query word starts a word of the titles"""
+        row = self.doc(number)
+        if row is None:
+            return False
+        text = ' ' + fold(f"{row[2]} {row[3]}")
+        return all(' ' + word in text for word in words)
+
+    def _exact(self, grams, words, limit):
+        """Doc numbers whose words start with every query word, in doc number order
+
+        Short lists are intersected whole; paged ones are read page by page,
+        rarest trigram first, only where a match is still possible, and the
+        scan stops once `limit` results are found.
+        """
+        entries = [self.entry(gram) for gram in grams]
+        if None in entries:
+            return []
+        page_range = self.index['pageRange']
+        short = [set(delta_decode(entry)) for entry in entries if isinstance(entry, list)]
+        paged = [gram for _, gram in sorted((entry, gram) for gram, entry in zip(grams, entries)
+                                            if isinstance(entry, int))]
+        base = set.intersection(*short) if short else None
+        pages = sorted({number // page_range for number in base}) if short else range(self._page_count())
+
+        results = []
+        for page in pages:
+            candidates = None if base is None else {number for number in base if number // page_range == page}
+            for gram in paged:
+                numbers = self.page(gram, page)
+                candidates = set(numbers) if candidates is None else candidates & numbers
+                if not candidates:
+                    break
+            for number in sorted(candidates or ()):
+                if self._matches(number, words):
+                    results.append(number)
+                    if len(results) == limit:
+                        return results
+        return results
+
+    def _fuzzy(self, grams, limit, chosen):
+        """Doc numbers hitting at least FUZZY_MIN_SHARE of the trigrams, most hits first within a page"""
+        needed = max(1, int(len(grams) * FUZZY_MIN_SHARE + 0.5))
+        page_range = self.index['pageRange']
+        short = defaultdict(list)
+        paged = []
+        present = 0
+        for gram in grams:
+            entry = self.entry(gram)
+            if entry is None:
+                continue
+            present += 1
+            if isinstance(entry, int):
+                paged.append(gram)
+                continue
+            for number in delta_decode(entry):
+                short[number // page_range].append(number)
+        if present < needed:
+            return []
+        # Without enough paged trigrams to reach the share alone, a match shows up in a short list
+        pages = range(self._page_count()) if len(paged) >= needed else sorted(short)
+
+        results = []
+        for page in pages:
+            hits = defaultdict(int)
+            for number in short.get(page, ()):
+                hits[number] += 1
+            for gram in paged:
+                for number in self.page(gram, page):
+                    hits[number] += 1
+            results += [number for _, number in sorted((-count, number) for number, count in hits.items()
+                                                       if count >= needed and number not in chosen)]
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def search(self, query, limit=10):
+        """Best matches for a type-ahead query as (slug, id, title) tuples
+
+        Movies whose words start with every query word come first, in doc
+        number order. If that leaves room, movies hitting at least
+        FUZZY_MIN_SHARE of the query trigrams follow, which tolerates a typo
+        or a different transliteration.
+        """
+        words = fold(query).split()
+        grams = set()
+        for word in words:
+            grams.update(word_grams(word))
+        if not grams:
+            return []
+        grams = sorted(grams)
+
+        results = self._exact(grams, words, limit)
+        if len(results) < limit and len(grams) > 1:
+            results += self._fuzzy(grams, limit - len(results), set(results))
+        rows = (self.doc(number) for number in results)
+        return [tuple(row[:3]) for row in rows if row]
+
+
+_CONSONANTS = ('b', 'd', 'g', 'k', 'l', 'm', 'n', 'r', 's', 't', 'v', 'x', 'sh')
+_VOWELS = ('a', 'e', 'o', 'u')
+
+
+def _synthetic_word(rng):
+    """Random two to four syllable word"""
+    return ''.join(rng.choice(_CONSONANTS) + rng.choice(_VOWELS) for _ in range(rng.randint(2, 4)))
+
+
+def _synthetic_title(rng, vocabulary):
+    """Random one to three word title, words drawn from a fixed vocabulary"""
+    return ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 3))).title()
+
+
+def _to_cyrillic(text):
+    """Rough Latin -> Cyrillic so synthetic originals exercise the folding"""
+    table = {'sh': 'ш', 'a': 'а', 'b': 'б', 'd': 'д', 'e': 'е', 'g': 'г', 'k': 'к', 'l': 'л',
+             'm': 'м', 'n': 'н', 'o': 'о', 'r': 'р', 's': 'с', 't': 'т', 'u': 'у', 'v': 'в', 'x': 'х'}
+    out = text.lower().replace('sh', table['sh'])
+    return ''.join(table.get(c, c) for c in out)
+
+
+def bench(count, queries=1000):
+    """Build an index over synthetic movies in a temp dir and time queries against brute force"""
+    with tempfile.TemporaryDirectory() as output_dir:
+        _bench(output_dir, count, queries)
+
+
+def synthetic_movies(count, rng):
+    """(titles, upsert() fields) for `count` synthetic movies"""
+    # Real titles reuse words, so draw from a vocabulary that grows with the catalog
+    vocabulary = [_synthetic_word(rng) for _ in range(max(100, count // 5))]
+    titles = [_synthetic_title(rng, vocabulary) for _ in range(count)]
+    fields = [{'movie_slug': f'movie-{i:07d}', 'movie_id': str(i), 'movie_title': title,
+               'movie_original_title': _to_cyrillic(title)} for i, title in enumerate(titles)]
+    return titles, fields
+
+
+def typed_query(rng, titles):
+    """Prefix of a word from a random title, as typed into the search box"""
+    word = rng.choice(rng.choice(titles).split()).lower()
+    return word[:rng.randint(2, len(word))]
+
+
+def _bench(output_dir, count, queries):
+    """bench() body, writing into output_dir"""
+    rng = random.Random(42)
+    titles, movies = synthetic_movies(count, rng)
+    builder = SearchIndexBuilder(output_dir, fresh=True)
+    for fields in movies:
+        builder.upsert(fields)
+
+    started = time.perf_counter()
+    stats = builder.save()
+    print(f"{count} movies: built in {time.perf_counter() - started:.2f}s")
+    print(format_stats(stats))
+
+    index = SearchIndex(output_dir)
+    folded = [' ' + fold(title) for title in titles]
+    latencies = []
+    fetched = []
+    brute_time = 0.0
+    found = 0
+    for _ in range(queries):
+        query = typed_query(rng, titles)
+        started = time.perf_counter()
+        results = index.search(query)
+        latencies.append(time.perf_counter() - started)
+        # What a client without cached files would fetch for this query
+        cold = SearchIndex(output_dir)
+        cold.search(query)
+        fetched.append(cold.bytes_loaded)
+
+        started = time.perf_counter()
+        expected = sum(1 for text in folded if ' ' + query in text)
+        brute_time += time.perf_counter() - started
+        # Relevance: every true prefix match that fits in the page comes first
+        true_hits = sum(1 for _, movie_id, _ in results if ' ' + query in folded[int(movie_id)])
+        found += true_hits == min(len(results), expected) and len(results) >= min(expected, 10)
+
+    latencies.sort()
+    print(f"{queries} queries: p50 {percentile(latencies, 50) * 1e3:.2f} ms / "
+          f"p95 {percentile(latencies, 95) * 1e3:.2f} ms / max {latencies[-1] * 1e3:.2f} ms "
+          f"(brute force scan {brute_time / queries * 1e3:.2f} ms/query)")
+    print(f"  top results all true prefix matches for {found / queries * 100:.1f}% of queries")
+    print(f"  index bytes loaded across all queries: {index.bytes_loaded:,}")
+    fetched.sort()
+    print(f"  bytes fetched per query without a cache (index.json included): p50 {percentile(fetched, 50):,} / "
+          f"p95 {percentile(fetched, 95):,} / max {fetched[-1]:,}")
+
+    # One movie added and one removed: only their files and trigrams change
+    started = time.perf_counter()
+    builder = SearchIndexBuilder(output_dir)
+    builder.remove('movie-0000000')
+    builder.upsert({'movie_slug': 'movie-new', 'movie_id': str(count),
+                    'movie_title': rng.choice(titles), 'movie_original_title': ''})
+    stats = builder.save()
+    print(f"  one insert + one delete: {stats['written']} files written, {stats['removed']} removed "
+          f"in {(time.perf_counter() - started) * 1e3:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or benchmark the prebuilt movie search index.")
+    parser.add_argument('query', nargs='?', help="Search text")
+    parser.add_argument('--assets', default=os.path.join('app', 'src', 'main', 'assets'),
+                        help="Folder holding search/index.json")
+    parser.add_argument('--limit', type=int, default=10, help="Results to show (default: 10)")
+    parser.add_argument('--bench', type=int, metavar='N',
+                        help="Benchmark on N synthetic movies instead of querying")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+        return
+    if not args.query:
+        parser.error("a query or --bench N is required")
+
+    index = SearchIndex(args.assets)
+    started = time.perf_counter()
+    results = index.search(args.query, args.limit)
+    elapsed = time.perf_counter() - started
+    for slug, movie_id, title in results:
+        print(f"{title}  ->  {slug}.html")
+    print(f"\n{len(results)} results in {elapsed * 1e3:.2f} ms, {index.bytes_loaded:,} index bytes loaded")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Sharded, pre-gzipped sitemaps for the generated movie pages
+Writes sitemap-movies-N.xml.gz shards of at most 50,000 URLs plus a
+sitemap-movies.xml index. Each URL goes to the shard picked by a CRC-32 of
+its key (the movie slug), so a delta run or daemon batch re-renders only
+the shards its changed slugs fall in. Shards are rendered one at a time and
+a shard whose bytes did not change is not rewritten. Used by
+firebase_movie_generator.py after every run and daemon batch.
+"""
+
+import os
+import re
+import gzip
+import zlib
+from urllib.parse import quote, urlsplit, urlunsplit
+
+from movie_template import escape_html
+from page_writer import atomic_write
+
+# Sitemap protocol limit is 50,000 URLs per file
+SHARD_SIZE = 50000
+
+# URLs per shard after a full write; the rest is room for new movies
+SHARD_FILL = 40000
+
+SITEMAP_NAME = 'sitemap-movies'
+
+# Marks an index whose shards are picked by key hash; any other index is rewritten in full
+LAYOUT_MARKER = '<!-- shards: crc32(key) -->'
+
+
+def shard_name(name, number):
+    """File name of the n-th (1-based) shard"""
+    return f"{name}-{number}.xml.gz"
+
+
+def encode_loc(url):
+    """URL with its path percent-encoded; sitemaps only take ASCII URLs (Cyrillic slugs)"""
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(path=quote(parts.path, safe='/%')))
+
+
+def render_shard(entries):
+    """<urlset> bytes for a list of (loc, lastmod) entries"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for loc, lastmod in entries:
+        loc = escape_html(encode_loc(loc))
+        if lastmod:
+            lines.append(f'  <url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>')
+        else:
+            lines.append(f'  <url><loc>{loc}</loc></url>')
+    lines.append('</urlset>')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def render_index(shards, base_url):
+    """<sitemapindex> text for a list of (filename, lastmod) shards"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             LAYOUT_MARKER,
+             '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for filename, lastmod in shards:
+        lines.append('  <sitemap>')
+        lines.append(f'    <loc>{escape_html(f"{base_url}/{filename}")}</loc>')
+        if lastmod:
+            lines.append(f'    <lastmod>{lastmod}</lastmod>')
+        lines.append('  </sitemap>')
+    lines.append('</sitemapindex>')
+    return '\n'.join(lines) + '\n'
+
+
+def write_if_changed(filepath, data):
+    """Atomically replace filepath with data unless it already holds exactly that"""
+    if os.path.exists(filepath):
+        with open(filepath, 'rb') as f:
+            if f.read() == data:
+                return False
+    atomic_write(filepath, data)
+    return True
+
+
+class SitemapWriter:
+    """Keeps the sitemap shards in step with a set of keyed URLs
+
+    `entry(key)` returns the (loc, lastmod) of a key. write_all() renders
+    every shard; update() re-renders only the shards of the changed keys,
+    using the shard count and lastmods of the index already on disk.
+    """
+
+    def __init__(self, output_dir, base_url, name=SITEMAP_NAME, shard_size=SHARD_SIZE, shard_fill=SHARD_FILL):
+        self.output_dir = output_dir
+        self.base_url = base_url
+        self.name = name
+        self.shard_size = shard_size
+        self.shard_fill = shard_fill
+        # lastmod per shard; None until an index in this layout is loaded or written
+        self.lastmods = self._load_index()
+        # Keys per shard, collected on first use
+        self.members = None
+
+    def _load_index(self):
+        """Shard lastmods from the sitemap index, or None if it is missing or in another layout"""
+        try:
+            with open(os.path.join(self.output_dir, f"{self.name}.xml"), 'r', encoding='utf-8') as f:
+                text = f.read()
+        except OSError:
+            return None
+        if LAYOUT_MARKER not in text:
+            return None
+        lastmods = []
+        for block in re.findall(r'<sitemap>(.*?)</sitemap>', text, re.S):
+            match = re.search(r'<lastmod>([^<]*)</lastmod>', block)
+            lastmods.append(match.group(1) if match else '')
+        return lastmods or None
+
+    def shard_of(self, key):
+        """0-based shard of a key"""
+        return zlib.crc32(key.encode('utf-8')) % len(self.lastmods)
+
+    def _collect(self, keys):
+        """Sort every key into its shard"""
+        self.members = [set() for _ in self.lastmods]
+        for key in keys:
+            self.members[self.shard_of(key)].add(key)
+
+    def _render(self, shards, entry):
+        """Write the given shards; returns (written, unchanged)"""
+        written = unchanged = 0
+        for shard in shards:
+            entries = [entry(key) for key in sorted(self.members[shard])]
+            # mtime=0 keeps the gzip bytes identical for identical content
+            data = gzip.compress(render_shard(entries), compresslevel=9, mtime=0)
+            if write_if_changed(os.path.join(self.output_dir, shard_name(self.name, shard + 1)), data):
+                written += 1
+            else:
+                unchanged += 1
+            self.lastmods[shard] = max((lastmod or '' for _, lastmod in entries), default='')
+        return written, unchanged
+
+    def _write_index(self):
+        """Rewrite the sitemap index if a shard lastmod or the shard count changed"""
+        shards = [(shard_name(self.name, number), lastmod) for number, lastmod in enumerate(self.lastmods, 1)]
+        index = render_index(shards, self.base_url).encode('utf-8')
+        write_if_changed(os.path.join(self.output_dir, f"{self.name}.xml"), index)
+
+    def write_all(self, keys, entry):
+        """Render every shard for `keys`, sized to SHARD_FILL; returns (written, unchanged, removed) shard counts"""
+        self.lastmods = [''] * max(1, -(-len(keys) // self.shard_fill))
+        self._collect(keys)
+        written, unchanged = self._render(range(len(self.lastmods)), entry)
+
+        # Drop shards left over from a bigger catalog
+        removed = 0
+        number = len(self.lastmods) + 1
+        while os.path.exists(os.path.join(self.output_dir, shard_name(self.name, number))):
+            os.remove(os.path.join(self.output_dir, shard_name(self.name, number)))
+            removed += 1
+            number += 1
+
+        self._write_index()
+        return written, unchanged, removed
+
+    def update(self, keys, changed, entry):
+        """Re-render the shards holding the `changed` keys; `keys` is the whole current key set
+
+        Falls back to write_all() when there is no index in this layout yet
+        or a shard would pass the 50,000 URL limit.
+        """
+        if self.lastmods is None:
+            return self.write_all(keys, entry)
+        if self.members is None:
+            self._collect(keys)
+        touched = set()
+        for key in changed:
+            shard = self.shard_of(key)
+            touched.add(shard)
+            if key in keys:
+                self.members[shard].add(key)
+            else:
+                self.members[shard].discard(key)
+        if any(len(self.members[shard]) > self.shard_size for shard in touched):
+            return self.write_all(keys, entry)
+        written, unchanged = self._render(sorted(touched), entry)
+        self._write_index()
+        return written, unchanged, 0
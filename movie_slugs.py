@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Shared slugify and the persistent slug registry
+Every movie page is <slug>.html, so two movies must never share a slug. The
+registry remembers which movie owns which slug across runs: the first owner
+keeps a slug, later claimants get a suffix derived from their own id, and a
+movie whose slug changes leaves a redirect from the old slug behind. Large
+rebuilds therefore hand out the same filenames in any order.
+Used by firebase_movie_generator.py and generate_movie_pages.py.
+"""
+
+import os
+import re
+import json
+
+from page_writer import atomic_write
+
+# slug -> movie id, movie id -> slug and retired slug -> movie id; kept
+# outside the assets folder next to the page manifest
+SLUG_REGISTRY_PATH = 'movie_slug_registry.json'
+
+# Old slug -> current slug, published for index.html deep links
+REDIRECTS_FILE = 'slug-redirects.json'
+
+_NON_WORD_RE = re.compile(r'[^\w\s-]')
+_SEPARATOR_RE = re.compile(r'[-\s]+')
+
+
+def slugify(text):
+    """Convert text to URL-friendly slug"""
+    if not text:
+        return ''
+    # Convert to lowercase
+    text = str(text).lower()
+    # Replace spaces and special chars with hyphens
+    text = _NON_WORD_RE.sub('', text)
+    text = _SEPARATOR_RE.sub('-', text)
+    return text.strip('-')
+
+
+def wanted_slug(movie_data):
+    """Slug a movie asks for: its own slug field, else its slugified id"""
+    return movie_data.get('slug') or slugify(movie_data.get('id'))
+
+
+class SlugRegistry:
+    """Persistent, collision-free slug <-> movie id mapping"""
+
+    def __init__(self, path=SLUG_REGISTRY_PATH):
+        self.path = path
+        self.slugs = {}
+        self.ids = {}
+        self.redirects = {}
+        # (old slug, new slug) pairs assigned since the last take_renamed()
+        self.renamed = []
+        self.collisions = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.slugs = dict(data.get('slugs', {}))
+                self.redirects = dict(data.get('redirects', {}))
+            except (OSError, ValueError) as e:
+                print(f"WARNING: ignoring unreadable slug registry {path}: {e}")
+        self.ids = {movie_id: slug for slug, movie_id in self.slugs.items()}
+
+    def resolve(self, slug):
+        """Movie id owning slug, following redirects; None if unknown"""
+        movie_id = self.slugs.get(slug)
+        if movie_id is None:
+            movie_id = self.redirects.get(slug)
+        return movie_id
+
+    def slug_for(self, movie_id):
+        """Current slug of a movie id, or None"""
+        return self.ids.get(str(movie_id))
+
+    def owned_slug(self, movie_id, fallback):
+        """Slug to delete for a removed movie; None if fallback belongs to another movie"""
+        slug = self.ids.get(str(movie_id))
+        if slug is not None:
+            return slug
+        if self.slugs.get(fallback, str(movie_id)) != str(movie_id):
+            return None
+        return fallback
+
+    def assign(self, movie_id, wanted):
+        """Final slug for a movie that wants `wanted`
+
+        A slug owned by another movie gets "-<slugified id>" appended, which
+        does not depend on the order movies are processed in.
+        """
+        movie_id = str(movie_id)
+        slug = wanted
+        owner = self.slugs.get(slug)
+        if owner is not None and owner != movie_id:
+            base = slug = f"{wanted}-{slugify(movie_id)}"
+            number = 2
+            while self.slugs.get(slug, movie_id) != movie_id:
+                slug = f"{base}-{number}"
+                number += 1
+            if self.ids.get(movie_id) != slug:
+                print(f"WARNING: slug '{wanted}' of movie '{movie_id}' is taken by '{owner}'; using '{slug}'")
+                self.collisions += 1
+
+        current = self.ids.get(movie_id)
+        if current == slug:
+            return slug
+        if current is not None:
+            # Title edit: the old URL keeps working through a redirect
+            del self.slugs[current]
+            self.redirects[current] = movie_id
+            self.renamed.append((current, slug))
+        self.slugs[slug] = movie_id
+        self.ids[movie_id] = slug
+        self.redirects.pop(slug, None)
+        return slug
+
+    def release(self, slug):
+        """Forget a deleted movie and its redirects"""
+        movie_id = self.slugs.pop(slug, None)
+        if movie_id is None:
+            return
+        self.ids.pop(movie_id, None)
+        self.redirects = {old: owner for old, owner in self.redirects.items() if owner != movie_id}
+
+    def retain(self, live_slugs):
+        """Release every slug not in live_slugs (after a complete pass)"""
+        for slug in [s for s in self.slugs if s not in live_slugs]:
+            self.release(slug)
+
+    def take_renamed(self):
+        """(old, new) slug pairs since the last call"""
+        renamed, self.renamed = self.renamed, []
+        return renamed
+
+    def redirect_map(self):
+        """Old slug -> current slug"""
+        return {old: self.ids[movie_id] for old, movie_id in sorted(self.redirects.items())
+                if movie_id in self.ids}
+
+    def save(self, output_dir=None):
+        """Persist the registry and publish the redirect map"""
+        data = {'slugs': dict(sorted(self.slugs.items())), 'redirects': dict(sorted(self.redirects.items()))}
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, indent=1))
+        if output_dir is not None:
+            atomic_write(os.path.join(output_dir, REDIRECTS_FILE),
+                         json.dumps(self.redirect_map(), ensure_ascii=False, separators=(',', ':')))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Local NDJSON snapshot of the movies collection
+One JSON object per line, gzip compressed when the path ends in .gz.
+Written by: python firebase_movie_generator.py --export-snapshot movies.ndjson.gz
+Read by both generators with --from-snapshot, one line at a time.
+"""
+
+import os
+import gzip
+import json
+import tempfile
+from datetime import datetime
+from itertools import islice
+
+from movie_record import Movie
+
+# Snapshot fields stored as ISO 8601 strings and turned back into datetimes
+TIMESTAMP_FIELDS = ('updatedAt',)
+
+
+def open_snapshot(path, mode='rt'):
+    """Open a snapshot as text, transparently gzip compressed by extension"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _json_default(value):
+    """Serialize Firestore timestamps and anything else JSON can't handle"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def write_snapshot(movies, path):
+    """Stream movie dicts into path; the old snapshot stays until the new one is complete"""
+    dirname = os.path.dirname(path) or '.'
+    suffix = '.tmp.gz' if path.endswith('.gz') else '.tmp'
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.', suffix=suffix)
+    os.close(fd)
+    count = 0
+    try:
+        with open_snapshot(tmp_path, 'wt') as f:
+            for movie in movies:
+                f.write(json.dumps(movie, ensure_ascii=False, separators=(',', ':'),
+                                   default=_json_default))
+                f.write('\n')
+                count += 1
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def iter_snapshot(path):
+    """Yield Movie records from a snapshot, parsing one line at a time"""
+    with open_snapshot(path) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                movie = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: bad snapshot line: {e}") from None
+            for field in TIMESTAMP_FIELDS:
+                if isinstance(movie.get(field), str):
+                    try:
+                        movie[field] = datetime.fromisoformat(movie[field])
+                    except ValueError:
+                        pass
+            yield Movie.from_dict(movie)
+
+
+def iter_snapshot_batches(path, batch_size):
+    """Yield lists of at most batch_size movies from a snapshot"""
+    movies = iter_snapshot(path)
+    while True:
+        batch = list(islice(movies, batch_size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Write derived movie fields back to the movies collection
+The page generator already computes every movie's final slug, page URL,
+search tokens and page hash. Stored on the movie document, clients read them
+instead of recomputing them (slugify in the SPA and generate-sitemap.js).
+Each movie's derived values are compared with what its document already
+holds, and only movies where one of them changed are updated, in WriteBatches
+of BATCH_LIMIT. Commits are paced with Firestore's 500/50/5 ramp-up and
+retried with exponential backoff on transient errors.
+
+Used by firebase_movie_generator.py --writeback; updatedAt is left alone so
+the write-back never feeds the next delta run.
+"""
+
+import time
+
+from movie_search import search_tokens
+
+# Written to each movie document; also fetched with the page fields to compare
+DERIVED_FIELDS = ('canonicalSlug', 'pageUrl', 'searchTokens', 'pageHash')
+
+# Firestore limit of operations per batched write
+BATCH_LIMIT = 500
+
+# 500/50/5: start at 500 writes/s, grow 50% every 5 minutes up to the maximum
+INITIAL_WRITE_RATE = 500
+RAMP_SECONDS = 300
+MAX_WRITE_RATE = 10000
+
+# Transient errors (google.api_core exception names) and how often to retry them
+RETRYABLE_ERRORS = ('Aborted', 'DeadlineExceeded', 'InternalServerError', 'ResourceExhausted',
+                    'ServiceUnavailable')
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 1.0
+
+
+def derived_fields(fields, digest):
+    """Derived document fields from movie_page_fields() output and its page hash"""
+    return {
+        'canonicalSlug': fields['movie_slug'],
+        'pageUrl': fields['page_url'],
+        'searchTokens': search_tokens(fields['movie_title'], fields['movie_original_title']),
+        'pageHash': digest,
+    }
+
+
+class DerivedFieldWriter:
+    """Collects changed derived fields and writes them in paced, retried batches"""
+
+    def __init__(self, db, max_rate=MAX_WRITE_RATE, dry_run=False, metrics=None):
+        self.db = db
+        self.max_rate = max_rate
+        self.dry_run = dry_run
+        self.metrics = metrics
+        self.pending = {}
+        self.stats = {'checked': 0, 'changed': 0, 'written': 0, 'missing': 0, 'retries': 0}
+        self._started = None
+        self._next_commit = 0.0
+
+    def observe(self, movie_data, fields, digest):
+        """Queue an update when a derived value differs from the document's"""
+        self.stats['checked'] += 1
+        derived = derived_fields(fields, digest)
+        if all(movie_data.get(name) == value for name, value in derived.items()):
+            return
+        self.stats['changed'] += 1
+        self.pending[str(movie_data.get('id'))] = derived
+        if len(self.pending) >= BATCH_LIMIT:
+            self.flush()
+
+    def rate(self):
+        """Writes per second allowed now under the 500/50/5 ramp-up"""
+        if self._started is None:
+            return INITIAL_WRITE_RATE
+        steps = int((time.monotonic() - self._started) // RAMP_SECONDS)
+        return min(self.max_rate, INITIAL_WRITE_RATE * 1.5 ** steps)
+
+    def _throttle(self, count):
+        """Sleep until `count` more writes fit under the current rate"""
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+        if self._next_commit > now:
+            time.sleep(self._next_commit - now)
+            now = self._next_commit
+        self._next_commit = now + count / self.rate()
+
+    def _commit(self, chunk):
+        """Commit one batch with exponential backoff; NotFound raises to the caller"""
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            batch = self.db.batch()
+            for movie_id, derived in chunk:
+                batch.update(self.db.collection('movies').document(movie_id), derived)
+            self._throttle(len(chunk))
+            try:
+                batch.commit()
+                return
+            except Exception as e:
+                if type(e).__name__ not in RETRYABLE_ERRORS or attempt == MAX_ATTEMPTS:
+                    raise
+                self.stats['retries'] += 1
+                delay = BACKOFF_SECONDS * 2 ** (attempt - 1)
+                print(f"WARNING: write-back batch failed ({type(e).__name__}); retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+    def _write(self, chunk):
+        """Write one chunk; a chunk with a deleted movie is retried document by document"""
+        try:
+            self._commit(chunk)
+            self.stats['written'] += len(chunk)
+            return
+        except Exception as e:
+            if type(e).__name__ != 'NotFound':
+                raise
+        for item in chunk:
+            try:
+                self._commit([item])
+                self.stats['written'] += 1
+            except Exception as e:
+                if type(e).__name__ != 'NotFound':
+                    raise
+                self.stats['missing'] += 1
+
+    def flush(self):
+        """Write every queued update; an update leaves the queue once its batch commits"""
+        items = sorted(self.pending.items())
+        if self.dry_run or not items:
+            self.pending = {}
+            return
+        written = self.stats['written']
+        for start in range(0, len(items), BATCH_LIMIT):
+            chunk = items[start:start + BATCH_LIMIT]
+            if self.metrics is None:
+                self._write(chunk)
+            else:
+                with self.metrics.span('writeback', emit=False):
+                    self._write(chunk)
+            for movie_id, _ in chunk:
+                self.pending.pop(movie_id, None)
+        if self.metrics is not None:
+            self.metrics.count('derived_written', self.stats['written'] - written)
+
+    def summary(self):
+        """One line for the end of a run"""
+        stats = self.stats
+        line = (f"✓ Write-back: {stats['checked']} checked, {stats['changed']} changed, "
+                f"{stats['written']} written, {stats['missing']} missing")
+        if stats['retries']:
+            line += f", {stats['retries']} retries"
+        return line + (" (dry run)" if self.dry_run else "")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Shared output helpers for the movie page generators
+Atomic file writes plus a bounded worker pool fed from a prefetch queue,
+so fetching from Firestore overlaps with rendering and writing pages.
+"""
+
+import os
+import time
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# Worker pool modes: threads for I/O bound runs, processes for render bound runs
+POOL_MODES = ('thread', 'process')
+
+# Precompressed copies precompress.py writes next to an asset
+SIDECAR_SUFFIXES = ('.gz', '.br')
+
+
+def atomic_write(filepath, data, fsync=False):
+    """Write text or bytes to a temp file next to filepath, then rename it into place
+
+    With fsync=True the file is flushed to disk before the rename, so a crash
+    can't leave an empty page behind. Returns the seconds spent in fsync.
+    data may also be an iterable of bytes chunks, written as they come.
+    """
+    dirname = os.path.dirname(filepath) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.', suffix='.tmp')
+    fsync_seconds = 0.0
+    try:
+        if isinstance(data, str):
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        else:
+            f = os.fdopen(fd, 'wb')
+        with f:
+            if isinstance(data, (str, bytes, bytearray)):
+                f.write(data)
+            else:
+                f.writelines(data)
+            if fsync:
+                f.flush()
+                started = time.perf_counter()
+                os.fsync(f.fileno())
+                fsync_seconds = time.perf_counter() - started
+        # mkstemp creates 0600 files, pages must stay world readable
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return fsync_seconds
+
+
+def remove_file(filepath):
+    """Delete a file and its .gz/.br sidecars; returns True if the file existed
+
+    The server prefers an existing sidecar, so one left behind would keep a
+    deleted page online.
+    """
+    for sidecar in (filepath + suffix for suffix in SIDECAR_SUFFIXES):
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+    if not os.path.exists(filepath):
+        return False
+    os.remove(filepath)
+    return True
+
+
+def prefetch(iterable, maxsize=256):
+    """Consume iterable in a background thread through a bounded queue"""
+    items = queue.Queue(maxsize)
+    done = object()
+    stop = threading.Event()
+    errors = []
+
+    def put(item):
+        # Block while the queue is full, but give up once the consumer has left
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(done)
+
+    producer = threading.Thread(target=produce, name='prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+
+
+def make_pool(workers=4, mode='thread'):
+    """Create a thread or process pool executor"""
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown pool mode: {mode}")
+    executor_cls = ProcessPoolExecutor if mode == 'process' else ThreadPoolExecutor
+    return executor_cls(max_workers=max(1, workers))
+
+
+def run_pool(func, arg_tuples, workers=4, mode='thread', pool=None):
+    """Run func(*args) on a bounded pool, yielding (args, result) as tasks finish
+
+    At most workers * 4 tasks are in flight, so a fast producer can't pile up
+    the whole catalog in memory. For mode='process' func and its arguments
+    must be picklable (module level functions, plain dicts and strings).
+    A pool passed in by the caller is reused and left running.
+    """
+    max_in_flight = max(1, workers) * 4
+    owned = pool is None
+    if owned:
+        pool = make_pool(workers, mode)
+    pending = {}
+    try:
+        for args in arg_tuples:
+            pending[pool.submit(func, *args)] = args
+            if len(pending) >= max_in_flight:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield pending.pop(future), future.result()
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield pending.pop(future), future.result()
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        if owned:
+            pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    if owned:
+        pool.shutdown(wait=True)
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Poster download and responsive image variants
+Posters are fetched once over kept-alive connections from a thread pool,
+revalidated with ETag / Last-Modified, and resized into WebP and JPEG widths
+on a process pool. Originals are cached in poster_cache/ (outside the assets
+folder, evicted by size quota); variants are published as
+posters/<content hash>-<width>.<ext>, so an unchanged poster is never fetched
+or encoded twice and a changed one gets new URLs. With NumPy installed each
+poster also gets an inline LQIP and a BlurHash (see poster_placeholders.py).
+Run this: python poster_pipeline.py URL [URL...]
+Used by: python firebase_movie_generator.py --posters
+"""
+
+import os
+import io
+import json
+import time
+import hashlib
+import argparse
+import threading
+import http.client
+from urllib.parse import urljoin, urlsplit
+
+from page_writer import atomic_write, make_pool, run_pool
+from poster_placeholders import load_grid, np, placeholders
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    # pip install Pillow; without it the generator keeps the original poster URLs
+    Image = None
+
+# Published widths; originals smaller than a width are never upscaled
+POSTER_WIDTHS = (160, 320, 640)
+POSTER_FORMATS = ('webp', 'jpeg')
+QUALITY = {'webp': 80, 'jpeg': 82}
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# Width used for og:image / twitter:image (JPEG for the widest crawler support)
+OG_WIDTH = 640
+
+# Originals and the cache index, kept outside the assets folder
+POSTER_CACHE_DIR = 'poster_cache'
+CACHE_QUOTA_BYTES = 512 * 2 ** 20
+
+# Published variants, under the assets folder
+POSTERS_DIR = 'posters'
+
+# Cached posters younger than this are used without asking the server
+REVALIDATE_SECONDS = 24 * 3600
+
+DOWNLOAD_WORKERS = 8
+TIMEOUT = 20
+MAX_REDIRECTS = 3
+USER_AGENT = 'SND-poster-pipeline/1.0'
+
+# One kept-alive connection per (scheme, host) per downloader thread
+_local = threading.local()
+
+
+def _connection(scheme, netloc):
+    """This thread's connection to a host, created on first use"""
+    pool = getattr(_local, 'connections', None)
+    if pool is None:
+        pool = _local.connections = {}
+    conn = pool.get((scheme, netloc))
+    if conn is None:
+        conn_cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        conn = pool[(scheme, netloc)] = conn_cls(netloc, timeout=TIMEOUT)
+    return conn
+
+
+def _drop_connection(scheme, netloc):
+    """Close a connection the server hung up on"""
+    conn = getattr(_local, 'connections', {}).pop((scheme, netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def fetch(url, etag=None, last_modified=None, redirects=MAX_REDIRECTS):
+    """Conditional GET; returns (status, body, etag, last_modified)"""
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        raise ValueError(f"Unsupported poster URL: {url}")
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    headers = {'User-Agent': USER_AGENT, 'Accept': 'image/*'}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    for attempt in range(2):
+        conn = _connection(parts.scheme, parts.netloc)
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            break
+        except (http.client.HTTPException, OSError):
+            # A kept-alive connection may have been closed by the server; retry once
+            _drop_connection(parts.scheme, parts.netloc)
+            if attempt:
+                raise
+
+    location = response.getheader('Location')
+    if response.status in (301, 302, 303, 307, 308) and location and redirects:
+        return fetch(urljoin(url, location), etag, last_modified, redirects - 1)
+    return response.status, body, response.getheader('ETag'), response.getheader('Last-Modified')
+
+
+def encode_variants(src_path, digest, posters_dir, widths=POSTER_WIDTHS, formats=POSTER_FORMATS):
+    """Resize one original into every width and format; runs in a worker process
+
+    Returns {format: [[width, filename], ...]} with the real (never upscaled) widths.
+    """
+    variants = {fmt: [] for fmt in formats}
+    with Image.open(src_path) as image:
+        # Let JPEG decode at a reduced scale when the biggest variant allows it
+        image.draft('RGB', (max(widths), max(widths) * 4))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        done = set()
+        for width in sorted(widths):
+            width = min(width, image.width)
+            if width in done:
+                continue
+            done.add(width)
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                filename = f"{digest}-{width}.{EXTENSIONS[fmt]}"
+                buffer = io.BytesIO()
+                resized.save(buffer, fmt.upper(), quality=QUALITY[fmt], optimize=True)
+                atomic_write(os.path.join(posters_dir, filename), buffer.getvalue())
+                variants[fmt].append([width, filename])
+    return variants
+
+
+def try_encode_variants(src_path, digest, posters_dir):
+    """encode_variants() returning (variants, None) or (None, error); runs in a worker process"""
+    try:
+        return encode_variants(src_path, digest, posters_dir), None
+    except Exception as e:
+        # A 200 response that isn't an image (an HTML error page, a truncated file)
+        return None, f"{type(e).__name__}: {e}"
+
+
+def try_load_grid(path):
+    """load_grid() returning (grid, None) or (None, error); runs in a worker process"""
+    try:
+        return load_grid(path), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+class PosterPipeline:
+    """Cache of downloaded posters and their published variants
+
+    The index maps poster URL -> {etag, lastModified, digest, checked, used}
+    and content digest -> {size, variants, placeholder}; digests shared by
+    several URLs are stored and encoded once.
+    """
+
+    def __init__(self, output_dir, cache_dir=POSTER_CACHE_DIR, quota=CACHE_QUOTA_BYTES,
+                 workers=None, revalidate=REVALIDATE_SECONDS, base_url=''):
+        self.posters_dir = os.path.join(output_dir, POSTERS_DIR)
+        self.cache_dir = cache_dir
+        self.quota = quota
+        self.workers = workers or os.cpu_count() or 1
+        self.revalidate = revalidate
+        self.base_url = base_url.rstrip('/')
+        self.stats = {'fetched': 0, 'not_modified': 0, 'cached': 0, 'encoded': 0, 'placeholders': 0,
+                      'failed': 0, 'evicted': 0}
+        self.urls, self.digests = self._load_index()
+        # Every URL passed to process() this run
+        self.seen = set()
+        self._downloads = None
+        self._encoders = None
+        os.makedirs(os.path.join(cache_dir, 'originals'), exist_ok=True)
+        os.makedirs(self.posters_dir, exist_ok=True)
+
+    def _load_index(self):
+        """URL and digest tables from the last run"""
+        index_path = os.path.join(self.cache_dir, 'index.json')
+        if not os.path.exists(index_path):
+            return {}, {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return dict(data.get('urls', {})), dict(data.get('digests', {}))
+        except (OSError, ValueError) as e:
+            print(f"WARNING: ignoring unreadable poster cache index {index_path}: {e}")
+            return {}, {}
+
+    def _original_path(self, digest):
+        return os.path.join(self.cache_dir, 'originals', digest)
+
+    def _has_variants(self, digest):
+        """True when every published file of a digest is still on disk"""
+        variants = self.digests.get(digest, {}).get('variants')
+        if not variants:
+            return False
+        return all(os.path.exists(os.path.join(self.posters_dir, filename))
+                   for entries in variants.values() for _, filename in entries)
+
+    def _needs_fetch(self, url, now):
+        """False when the cached copy is fresh enough to use without a request"""
+        entry = self.urls.get(url)
+        if not entry or not entry.get('digest'):
+            return True
+        if not self._has_variants(entry['digest']) and not os.path.exists(self._original_path(entry['digest'])):
+            return True
+        return now - entry.get('checked', 0) > self.revalidate
+
+    def _download(self, url):
+        """Fetch or revalidate one poster; runs on a downloader thread"""
+        entry = self.urls.get(url, {})
+        digest = entry.get('digest')
+        # Only revalidate when we still have something the 304 would refer to
+        usable = digest and (self._has_variants(digest) or os.path.exists(self._original_path(digest)))
+        status, body, etag, last_modified = fetch(url, entry.get('etag') if usable else None,
+                                                  entry.get('lastModified') if usable else None)
+        if status == 304 and usable:
+            return 'not_modified', digest, len(body), etag or entry.get('etag'), last_modified or entry.get('lastModified')
+        if status != 200 or not body:
+            raise OSError(f"HTTP {status}")
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        original = self._original_path(digest)
+        if not os.path.exists(original):
+            atomic_write(original, body)
+        return 'fetched', digest, len(body), etag, last_modified
+
+    def process(self, urls):
+        """Make sure every poster URL has published variants; returns {url: variants()}"""
+        now = time.time()
+        urls = list(dict.fromkeys(u for u in urls if u))
+        self.seen.update(urls)
+        to_fetch = [u for u in urls if self._needs_fetch(u, now)]
+        self.stats['cached'] += len(urls) - len(to_fetch)
+
+        if to_fetch:
+            if self._downloads is None:
+                self._downloads = make_pool(DOWNLOAD_WORKERS, 'thread')
+            for (url,), outcome in run_pool(self._try_download, ((u,) for u in to_fetch),
+                                            DOWNLOAD_WORKERS, 'thread', self._downloads):
+                if outcome is None:
+                    continue
+                kind, digest, size, etag, last_modified = outcome
+                self.stats[kind] += 1
+                self.urls[url] = {'etag': etag, 'lastModified': last_modified, 'digest': digest,
+                                  'checked': now, 'used': now}
+                if kind == 'fetched':
+                    self.digests.setdefault(digest, {})['size'] = size
+
+        # Encode each new digest once, however many URLs point at it
+        to_encode = sorted({self.urls[u]['digest'] for u in urls if u in self.urls}
+                           - {d for d in self.digests if self._has_variants(d)})
+        to_encode = [d for d in to_encode if os.path.exists(self._original_path(d))]
+        if to_encode:
+            if self._encoders is None:
+                self._encoders = make_pool(self.workers, 'process')
+            tasks = ((self._original_path(d), d, self.posters_dir) for d in to_encode)
+            for (_, digest, _), (variants, error) in run_pool(try_encode_variants, tasks, self.workers,
+                                                              'process', self._encoders):
+                if error:
+                    self._drop_broken(digest, error)
+                    continue
+                self.digests.setdefault(digest, {})['variants'] = variants
+                self.stats['encoded'] += 1
+
+        self._add_placeholders({self.urls[u]['digest'] for u in urls if u in self.urls})
+
+        result = {}
+        for url in urls:
+            if url in self.urls:
+                self.urls[url]['used'] = now
+                variants = self.variants(url)
+                if variants:
+                    result[url] = variants
+        return result
+
+    def _add_placeholders(self, digests):
+        """Compute missing placeholders for digests in one NumPy batch"""
+        if np is None:
+            return
+        missing = sorted(d for d in digests if 'placeholder' not in self.digests.get(d, {})
+                         and self._has_variants(d))
+        if not missing:
+            return
+        if self._encoders is None:
+            self._encoders = make_pool(self.workers, 'process')
+        # The smallest published JPEG decodes much faster than the original
+        paths = [os.path.join(self.posters_dir, self.digests[d]['variants']['jpeg'][0][1]) for d in missing]
+        grids = dict(run_pool(try_load_grid, ((path,) for path in paths), self.workers, 'process', self._encoders))
+        decoded = []
+        for digest, path in zip(missing, paths):
+            grid, error = grids[(path,)]
+            if error:
+                print(f"WARNING: poster placeholder {digest}: {error}")
+                self.stats['failed'] += 1
+                continue
+            decoded.append((digest, grid))
+        if not decoded:
+            return
+        for (digest, _), placeholder in zip(decoded, placeholders([grid for _, grid in decoded])):
+            self.digests[digest]['placeholder'] = placeholder
+            self.stats['placeholders'] += 1
+
+    def _drop_broken(self, digest, error):
+        """Forget a download that couldn't be decoded, so its movies keep the original URL
+
+        The URLs are fetched again on the next run, in case the server
+        returned an error page instead of the poster.
+        """
+        urls = sorted(url for url, entry in self.urls.items() if entry.get('digest') == digest)
+        print(f"WARNING: poster {', '.join(urls) or digest}: {error}")
+        self.stats['failed'] += 1
+        for url in urls:
+            del self.urls[url]
+        self.digests.pop(digest, None)
+        if os.path.exists(self._original_path(digest)):
+            os.remove(self._original_path(digest))
+
+    def _try_download(self, url):
+        """_download() that reports failures instead of aborting the batch"""
+        try:
+            return self._download(url)
+        except Exception as e:
+            print(f"WARNING: poster {url}: {e}")
+            self.stats['failed'] += 1
+            return None
+
+    def variants(self, url):
+        """{'src', 'og', 'srcset', 'srcsetJpeg', 'lqip', 'blurhash'} for a processed poster, or None"""
+        entry = self.urls.get(url)
+        info = self.digests.get(entry['digest'], {}) if entry else {}
+        variants = info.get('variants')
+        if not variants:
+            return None
+        placeholder = info.get('placeholder', {})
+        prefix = f"{POSTERS_DIR}/"
+        webp = variants.get('webp', [])
+        jpeg = variants.get('jpeg', [])
+        og = min(jpeg, key=lambda v: abs(v[0] - OG_WIDTH))[1] if jpeg else None
+        middle = jpeg[len(jpeg) // 2][1] if jpeg else None
+        return {
+            'src': prefix + middle if middle else url,
+            'og': f"{self.base_url}/{prefix}{og}" if og else url,
+            'srcset': ', '.join(f"{prefix}{name} {width}w" for width, name in webp),
+            'srcsetJpeg': ', '.join(f"{prefix}{name} {width}w" for width, name in jpeg),
+            'lqip': placeholder.get('lqip', ''),
+            'blurhash': placeholder.get('blurhash', ''),
+        }
+
+    def annotate(self, movies):
+        """Process a batch of movie dicts and attach posterVariants to each"""
+        if Image is None:
+            return
+        found = self.process(movie.get('poster') for movie in movies)
+        for movie in movies:
+            variants = found.get(movie.get('poster'))
+            if variants:
+                movie['posterVariants'] = variants
+
+    def evict(self):
+        """Drop least recently used originals until the cache fits the quota"""
+        last_used = {}
+        for entry in self.urls.values():
+            digest = entry.get('digest')
+            if digest:
+                last_used[digest] = max(last_used.get(digest, 0), entry.get('used', 0))
+        originals = [(last_used.get(d, 0), d) for d in os.listdir(os.path.join(self.cache_dir, 'originals'))]
+        total = sum(os.path.getsize(self._original_path(d)) for _, d in originals)
+        for _, digest in sorted(originals):
+            if total <= self.quota:
+                break
+            # Published variants stay; a changed poster is downloaded again anyway
+            total -= os.path.getsize(self._original_path(digest))
+            os.remove(self._original_path(digest))
+            self.stats['evicted'] += 1
+
+    def close(self):
+        """Evict, drop variants nobody points at, save the index and stop the pools"""
+        for pool in (self._downloads, self._encoders):
+            if pool is not None:
+                pool.shutdown()
+        self._downloads = self._encoders = None
+        self.evict()
+
+        live = {entry.get('digest') for entry in self.urls.values()}
+        self.digests = {d: info for d, info in self.digests.items() if d in live}
+        published = {filename for info in self.digests.values()
+                     for entries in info.get('variants', {}).values() for _, filename in entries}
+        for name in os.listdir(self.posters_dir):
+            if name not in published and not name.startswith('.'):
+                os.remove(os.path.join(self.posters_dir, name))
+
+        data = {'urls': dict(sorted(self.urls.items())), 'digests': dict(sorted(self.digests.items()))}
+        atomic_write(os.path.join(self.cache_dir, 'index.json'), json.dumps(data, indent=1))
+
+    def retain(self, live_urls):
+        """Drop URLs no movie uses any more (after a complete pass)"""
+        self.urls = {url: entry for url, entry in self.urls.items() if url in live_urls}
+
+    def summary(self):
+        """One line of this run's counters"""
+        s = self.stats
+        return (f"✓ Posters: {s['fetched']} fetched, {s['not_modified']} not modified, {s['cached']} cached, "
+                f"{s['encoded']} encoded, {s['placeholders']} placeholders, {s['failed']} failed, "
+                f"{s['evicted']} evicted from cache")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download posters and publish resized WebP/JPEG variants.")
+    parser.add_argument('urls', nargs='+', help="Poster URLs")
+    parser.add_argument('--assets', default=os.path.join('app', 'src', 'main', 'assets'),
+                        help="Assets folder that receives posters/")
+    parser.add_argument('--cache', default=POSTER_CACHE_DIR, help=f"Cache folder (default: {POSTER_CACHE_DIR})")
+    parser.add_argument('--quota-mb', type=int, default=CACHE_QUOTA_BYTES // 2 ** 20,
+                        help="Cache size quota for originals in MiB")
+    parser.add_argument('--revalidate', type=int, default=REVALIDATE_SECONDS,
+                        help="Seconds before a cached poster is revalidated with the server")
+    args = parser.parse_args()
+
+    if Image is None:
+        print("ERROR: Pillow is not installed (pip install Pillow)")
+        return
+
+    pipeline = PosterPipeline(args.assets, args.cache, args.quota_mb * 2 ** 20, revalidate=args.revalidate)
+    started = time.perf_counter()
+    try:
+        for url, variants in pipeline.process(args.urls).items():
+            print(f"✓ {url}\n    srcset: {variants['srcset']}\n    og: {variants['og']}")
+    finally:
+        pipeline.close()
+    print(pipeline.summary() + f" in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Low-quality poster placeholders (inline LQIP data URIs and BlurHash strings)
+Every poster is reduced to a small fixed grid once; the grids of a whole
+batch are then stacked into one NumPy array, so colour conversion, pooling
+and the BlurHash DCT run as array operations over the batch instead of
+pixel loops. poster_pipeline.py caches the results by poster content hash.
+Benchmark: python poster_placeholders.py --bench 10000
+"""
+
+import io
+import time
+import base64
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    # pip install numpy; without it pages keep the plain spinner
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Posters are 2:3; every image is squeezed into this grid before batching
+GRID_WIDTH = 32
+GRID_HEIGHT = 48
+
+# Inline placeholder: grid pooled 2x2 -> 16x24 WebP of about 150 bytes
+LQIP_POOL = 2
+LQIP_QUALITY = 40
+
+# BlurHash components (x, y); 4x3 gives a 28 character hash
+BLURHASH_COMPONENTS = (4, 3)
+
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+
+def load_grid(path):
+    """Decode an image straight into a GRID_WIDTH x GRID_HEIGHT RGB buffer; runs in a worker"""
+    with Image.open(path) as image:
+        # JPEG decodes at 1/2..1/8 scale when the target allows it
+        image.draft('RGB', (GRID_WIDTH * 2, GRID_HEIGHT * 2))
+        return image.convert('RGB').resize((GRID_WIDTH, GRID_HEIGHT), Image.BOX).tobytes()
+
+
+def stack_grids(buffers):
+    """Raw grid buffers -> uint8 array of shape (n, GRID_HEIGHT, GRID_WIDTH, 3)"""
+    data = np.frombuffer(b''.join(buffers), dtype=np.uint8)
+    return data.reshape(len(buffers), GRID_HEIGHT, GRID_WIDTH, 3)
+
+
+def srgb_to_linear(values):
+    """uint8 sRGB -> float linear light, via a 256 entry lookup table"""
+    table = np.arange(256, dtype=np.float64) / 255
+    table = np.where(table <= 0.04045, table / 12.92, ((table + 0.055) / 1.055) ** 2.4)
+    return table[values]
+
+
+def linear_to_srgb(values):
+    """float linear light -> int sRGB 0..255"""
+    values = np.clip(values, 0, 1)
+    srgb = np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
+    return np.floor(srgb * 255 + 0.5).astype(np.int64)
+
+
+def _base83(value, length):
+    """Fixed width base83 digits of an int"""
+    return ''.join(BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def blurhash_batch(grids, components=BLURHASH_COMPONENTS):
+    """BlurHash strings for a (n, h, w, 3) uint8 batch"""
+    count, height, width, _ = grids.shape
+    cx, cy = components
+    linear = srgb_to_linear(grids)
+
+    # Separable cosine basis; one einsum computes every component of every image
+    basis_x = np.cos(np.pi * np.outer(np.arange(cx), np.arange(width)) / width)
+    basis_y = np.cos(np.pi * np.outer(np.arange(cy), np.arange(height)) / height)
+    factors = np.einsum('jy,ix,nyxc->njic', basis_y, basis_x, linear, optimize=True) / (width * height)
+    scale = np.full((cy, cx), 2.0)
+    scale[0, 0] = 1.0
+    factors = (factors * scale[None, :, :, None]).reshape(count, cy * cx, 3)
+
+    dc = linear_to_srgb(factors[:, 0])
+    dc_values = (dc[:, 0] << 16) + (dc[:, 1] << 8) + dc[:, 2]
+    ac = factors[:, 1:]
+    if ac.shape[1]:
+        actual_max = np.abs(ac).reshape(count, -1).max(axis=1)
+        quantised_max = np.clip(np.floor(actual_max * 166 - 0.5), 0, 82).astype(np.int64)
+        max_value = (quantised_max + 1) / 166
+        scaled = ac / max_value[:, None, None]
+        quantised = np.clip(np.floor(np.sign(scaled) * np.sqrt(np.abs(scaled)) * 9 + 9.5), 0, 18).astype(np.int64)
+        ac_values = quantised[..., 0] * 361 + quantised[..., 1] * 19 + quantised[..., 2]
+    else:
+        quantised_max = np.zeros(count, dtype=np.int64)
+        ac_values = np.zeros((count, 0), dtype=np.int64)
+
+    size_flag = _base83((cx - 1) + (cy - 1) * 9, 1)
+    return [size_flag + _base83(int(quantised_max[n]), 1) + _base83(int(dc_values[n]), 4)
+            + ''.join(_base83(int(v), 2) for v in ac_values[n])
+            for n in range(count)]
+
+
+def lqip_batch(grids, pool=LQIP_POOL):
+    """Inline data URIs of the batch pooled down by `pool` (mean of each block)"""
+    count, height, width, _ = grids.shape
+    blocks = grids.reshape(count, height // pool, pool, width // pool, pool, 3)
+    sums = blocks.sum(axis=(2, 4), dtype=np.uint32)
+    pooled = ((sums + pool * pool // 2) // (pool * pool)).astype(np.uint8)
+    uris = []
+    for small in pooled:
+        buffer = io.BytesIO()
+        Image.fromarray(small, 'RGB').save(buffer, 'WEBP', quality=LQIP_QUALITY, method=0)
+        uris.append('data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii'))
+    return uris
+
+
+def placeholders(buffers):
+    """[{'lqip', 'blurhash'}] for a list of load_grid() buffers"""
+    if not buffers:
+        return []
+    grids = stack_grids(buffers)
+    return [{'lqip': lqip, 'blurhash': blurhash}
+            for lqip, blurhash in zip(lqip_batch(grids), blurhash_batch(grids))]
+
+
+def bench(count):
+    """Time placeholder generation for `count` synthetic grids"""
+    rng = np.random.default_rng(42)
+    # Smooth-ish synthetic posters: a gradient plus noise
+    gradient = np.linspace(0, 200, GRID_HEIGHT, dtype=np.float64)[None, :, None, None]
+    grids = (gradient + rng.integers(0, 55, (count, GRID_HEIGHT, GRID_WIDTH, 3))).astype(np.uint8)
+    buffers = [grid.tobytes() for grid in grids]
+
+    started = time.perf_counter()
+    results = placeholders(buffers)
+    elapsed = time.perf_counter() - started
+    lqip_bytes = sum(len(r['lqip']) for r in results)
+    print(f"✓ {count:,} placeholders in {elapsed:.2f}s ({count / elapsed:,.0f}/s), "
+          f"LQIP avg {lqip_bytes / count:.0f} bytes, BlurHash e.g. {results[0]['blurhash']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute LQIP and BlurHash placeholders for poster images.")
+    parser.add_argument('images', nargs='*', help="Image files")
+    parser.add_argument('--bench', type=int, metavar='N', help="Benchmark N synthetic posters")
+    args = parser.parse_args()
+
+    if np is None or Image is None:
+        print("ERROR: placeholders need numpy and Pillow (pip install numpy Pillow)")
+        return
+    if args.bench:
+        bench(args.bench)
+        return
+    for path, result in zip(args.images, placeholders([load_grid(path) for path in args.images])):
+        print(f"{path}\n    blurhash: {result['blurhash']}\n    lqip: {len(result['lqip'])} bytes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Pre-compressed .gz / .br sidecars for static assets
+Writes index.html.gz / index.html.br etc. at maximum compression so the
+server can send precompressed bytes (see .htaccess) instead of compressing
+every response. Files whose content hash matches the last run are skipped,
+and sidecars whose source file is gone are deleted.
+Run this: python precompress.py [files or directories...]
+Also runs after a page build with: python firebase_movie_generator.py --precompress
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import argparse
+
+from page_writer import SIDECAR_SUFFIXES, atomic_write, run_pool
+
+try:
+    import brotli
+except ImportError:
+    # pip install brotli; without it only .gz sidecars are written
+    brotli = None
+
+# Text assets worth compressing; .xml is left out so the gzipped sitemap
+# shards (sitemap-movies-N.xml.gz) never collide with a sidecar name
+EXTENSIONS = ('.html', '.js', '.css', '.json', '.svg', '.txt')
+
+# Below this size the compressed file plus headers isn't worth it
+MIN_SIZE = 256
+
+# Content hashes of the last run, kept outside the assets folder
+PRECOMPRESS_MANIFEST = 'precompress_manifest.json'
+
+DEFAULT_ASSETS_DIR = os.path.join('app', 'src', 'main', 'assets')
+
+
+def iter_asset_files(paths):
+    """Yield compressible files from a mix of file and directory paths"""
+    for path in paths:
+        if os.path.isfile(path):
+            if path.endswith(EXTENSIONS):
+                yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(files):
+                if name.endswith(EXTENSIONS) and not name.startswith('.'):
+                    yield os.path.join(root, name)
+
+
+def prune_sidecars(paths):
+    """Delete .gz/.br sidecars under directory paths whose source file is gone"""
+    removed = 0
+    for path in paths:
+        if not os.path.isdir(path):
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(files):
+                source = name[:-3]
+                if (name.endswith(SIDECAR_SUFFIXES) and source.endswith(EXTENSIONS)
+                        and not os.path.exists(os.path.join(root, source))):
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+    return removed
+
+
+def compress_file(path, previous_hash=None):
+    """Write sidecars for one file; runs in a worker process
+
+    Returns (digest, size, gz_size, br_size); sizes are None when the file was
+    skipped because its hash matched previous_hash and the sidecars exist.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    sidecars_exist = os.path.exists(path + '.gz') and (brotli is None or os.path.exists(path + '.br'))
+    if digest == previous_hash and sidecars_exist:
+        return digest, None, None, None
+    if len(data) < MIN_SIZE:
+        # Too small to bother; drop sidecars left from when it was bigger
+        for sidecar in (path + '.gz', path + '.br'):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+        return digest, len(data), None, None
+
+    # mtime=0 keeps output identical for identical input
+    gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+    atomic_write(path + '.gz', gz_data)
+
+    br_size = None
+    if brotli is not None:
+        br_data = brotli.compress(data, quality=11)
+        atomic_write(path + '.br', br_data)
+        br_size = len(br_data)
+
+    return digest, len(data), len(gz_data), br_size
+
+
+def load_hashes(path):
+    """File path -> content hash from the previous run"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"WARNING: ignoring unreadable manifest {path}: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def ratio(size, compressed):
+    """Compressed size as a percentage of the original"""
+    if compressed is None:
+        return '-'
+    return f"{compressed:,} ({compressed / size * 100:.1f}%)"
+
+
+def precompress(paths, workers=None, manifest_path=PRECOMPRESS_MANIFEST, verbose=True):
+    """Compress every asset under paths on a process pool
+
+    Returns (compressed, skipped, bytes_in, bytes_gz, bytes_br).
+    """
+    hashes = load_hashes(manifest_path)
+    workers = workers or os.cpu_count() or 1
+    compressed = skipped = 0
+    bytes_in = bytes_gz = bytes_br = 0
+
+    if brotli is None:
+        print("WARNING: brotli not installed (pip install brotli); writing .gz sidecars only")
+
+    pruned = prune_sidecars(paths)
+    if pruned:
+        print(f"✗ Removed {pruned} sidecars of deleted files")
+    hashes = {path: digest for path, digest in hashes.items() if os.path.exists(path)}
+
+    own_manifest = os.path.abspath(manifest_path)
+    tasks = ((path, hashes.get(path)) for path in iter_asset_files(paths)
+             if os.path.abspath(path) != own_manifest)
+    try:
+        for (path, _), (digest, size, gz_size, br_size) in run_pool(compress_file, tasks, workers, 'process'):
+            hashes[path] = digest
+            if gz_size is None:
+                skipped += 1
+                continue
+            compressed += 1
+            bytes_in += size
+            bytes_gz += gz_size
+            bytes_br += br_size or 0
+            if verbose:
+                print(f"✓ {path}: {size:,} -> gz {ratio(size, gz_size)}, br {ratio(size, br_size)}")
+    finally:
+        atomic_write(manifest_path, json.dumps(hashes, sort_keys=True, indent=1))
+
+    return compressed, skipped, bytes_in, bytes_gz, bytes_br
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write .gz/.br sidecars for static assets.")
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_ASSETS_DIR],
+                        help=f"Files or directories to compress (default: {DEFAULT_ASSETS_DIR})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--manifest', default=PRECOMPRESS_MANIFEST,
+                        help=f"Content hash manifest (default: {PRECOMPRESS_MANIFEST})")
+    parser.add_argument('--quiet', action='store_true', help="Only print the summary")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    compressed, skipped, bytes_in, bytes_gz, bytes_br = precompress(
+        args.paths, args.workers, args.manifest, not args.quiet)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n✓ Done! {compressed} compressed, {skipped} unchanged or too small in {elapsed:.2f}s")
+    if compressed:
+        print(f"  {bytes_in:,} bytes -> gz {ratio(bytes_in, bytes_gz)}"
+              + (f", br {ratio(bytes_in, bytes_br)}" if brotli is not None else ''))
+
+
+if __name__ == '__main__':
+    main()
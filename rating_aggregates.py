@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Batch rating aggregation for sndRating, sndVotes and aspectScores
+Reads the per-user movies/{id}/ratings/{uid} documents with one paged
+collection group query, reduces them per movie with NumPy (bincount
+group-by over the whole page) and writes the aggregates that changed back
+to the movie documents in batched writes. The browser and the page
+generators then read one precomputed aggregate instead of recomputing it.
+Run this: python rating_aggregates.py
+
+Incremental run (fold in only ratings written since the last run):
+    python rating_aggregates.py --since
+New ratings are added to the stored totals; a movie with an edited rating
+is re-read in full. Run a full pass now and then: it also picks up ratings
+deleted by an admin.
+"""
+
+import os
+import json
+import argparse
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from firebase_admin import firestore
+except ImportError:
+    firestore = None
+
+from firestore_client import init_firestore, parse_timestamp
+from run_metrics import RunMetrics
+from page_writer import atomic_write
+
+# Aspect checkboxes of the rating modal in index.html, in column order
+ASPECTS = ('direction', 'plot', 'spectacle', 'actors')
+
+RATINGS_COLLECTION = 'ratings'
+
+# Running totals per movie, the aggregates last written and the watermark;
+# kept outside the assets folder next to the page manifest
+AGGREGATES_PATH = 'movie_rating_aggregates.json'
+
+DEFAULT_PAGE_SIZE = 1000
+
+# Firestore limit of operations per batched write
+BATCH_LIMIT = 500
+
+RATING_FIELDS = ('value', 'rating', 'aspects', 'updatedAt')
+
+
+def rating_row(data):
+    """(value, aspect flags) of one rating document, or None if it holds no 1..10 value"""
+    value = data.get('value', data.get('rating'))
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not 1 <= value <= 10:
+        return None
+    aspects = data.get('aspects') or {}
+    return value, [1 if aspects.get(name) else 0 for name in ASPECTS]
+
+
+def round_half_up(values):
+    """Math.round() semantics, so aggregates match what the browser computed"""
+    return np.floor(values + 0.5)
+
+
+class RatingTotals:
+    """Per-movie rating sums, vote counts and aspect counts as NumPy columns"""
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self.sums = np.zeros(0, dtype=np.float64)
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.aspects = np.zeros((0, len(ASPECTS)), dtype=np.int64)
+
+    def codes(self, movie_ids):
+        """Row numbers for movie ids, adding rows for new movies"""
+        codes = np.empty(len(movie_ids), dtype=np.int64)
+        for i, movie_id in enumerate(movie_ids):
+            code = self.index.get(movie_id)
+            if code is None:
+                code = self.index[movie_id] = len(self.ids)
+                self.ids.append(movie_id)
+            codes[i] = code
+        grow = len(self.ids) - len(self.counts)
+        if grow:
+            self.sums = np.concatenate([self.sums, np.zeros(grow)])
+            self.counts = np.concatenate([self.counts, np.zeros(grow, dtype=np.int64)])
+            self.aspects = np.concatenate([self.aspects, np.zeros((grow, len(ASPECTS)), dtype=np.int64)])
+        return codes
+
+    def add(self, movie_ids, values, aspects):
+        """Fold one page of ratings in: a group-by sum per column"""
+        if not len(movie_ids):
+            return
+        codes = self.codes(movie_ids)
+        size = len(self.ids)
+        self.sums += np.bincount(codes, weights=values, minlength=size)
+        self.counts += np.bincount(codes, minlength=size)
+        for column in range(len(ASPECTS)):
+            self.aspects[:, column] += np.bincount(codes, weights=aspects[:, column], minlength=size).astype(np.int64)
+
+    def reset(self, movie_ids):
+        """Zero the totals of movies about to be re-read in full"""
+        codes = self.codes(list(movie_ids))
+        self.sums[codes] = 0
+        self.counts[codes] = 0
+        self.aspects[codes] = 0
+
+    def drop(self, movie_ids):
+        """Forget the totals of movies that no longer exist"""
+        gone = {self.index[movie_id] for movie_id in movie_ids if movie_id in self.index}
+        if not gone:
+            return
+        keep = np.array([i not in gone for i in range(len(self.ids))], dtype=bool)
+        self.ids = [movie_id for movie_id, kept in zip(self.ids, keep) if kept]
+        self.index = {movie_id: i for i, movie_id in enumerate(self.ids)}
+        self.sums, self.counts, self.aspects = self.sums[keep], self.counts[keep], self.aspects[keep]
+
+    def aggregates(self):
+        """movie id -> [sndRating, sndVotes, aspect percentages...], computed for all movies at once"""
+        votes = np.maximum(self.counts, 1)
+        ratings = round_half_up(self.sums / votes * 10) / 10
+        percentages = round_half_up(self.aspects * 100 / votes[:, None]).astype(np.int64)
+        return {movie_id: [float(ratings[i]), int(self.counts[i])] + percentages[i].tolist()
+                for i, movie_id in enumerate(self.ids)}
+
+    def to_json(self):
+        """Totals as {movie id: [sum, count, aspect counts...]}"""
+        return {movie_id: [float(self.sums[i]), int(self.counts[i])] + self.aspects[i].tolist()
+                for i, movie_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_json(cls, data):
+        """Inverse of to_json()"""
+        totals = cls()
+        if data:
+            rows = np.array(list(data.values()), dtype=np.float64).reshape(len(data), 2 + len(ASPECTS))
+            totals.codes(list(data))
+            totals.sums = rows[:, 0]
+            totals.counts = rows[:, 1].astype(np.int64)
+            totals.aspects = rows[:, 2:].astype(np.int64)
+        return totals
+
+
+def load_state(path):
+    """Stored totals, published aggregates and watermark; empty if missing"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"WARNING: ignoring unreadable rating state {path}: {e}")
+        return {}
+
+
+def save_state(path, totals, published, watermark):
+    """Persist everything an incremental run needs"""
+    data = {'watermark': watermark, 'totals': totals.to_json(), 'published': published}
+    atomic_write(path, json.dumps(data, sort_keys=True, separators=(',', ':')))
+
+
+def movie_id_of(rating_doc):
+    """Movie id from a movies/{id}/ratings/{uid} snapshot"""
+    return rating_doc.reference.parent.parent.id
+
+
+def iter_rating_pages(query, page_size, metrics):
+    """Yield pages of rating snapshots, resuming each page after the last snapshot"""
+    query = query.limit(page_size)
+    last = None
+    while True:
+        page_query = query.start_after(last) if last is not None else query
+        with metrics.span('fetch_page'):
+            docs = list(page_query.stream())
+        metrics.count('ratings_read', len(docs))
+        if not docs:
+            return
+        yield docs
+        last = docs[-1]
+        if len(docs) < page_size:
+            return
+
+
+def page_arrays(docs):
+    """(movie ids, values, aspect matrix, newest updatedAt) of one page"""
+    movie_ids, values, aspects = [], [], []
+    newest = None
+    for rating_doc in docs:
+        data = rating_doc.to_dict() or {}
+        ts = data.get('updatedAt')
+        if isinstance(ts, datetime) and (newest is None or ts > newest):
+            newest = ts
+        row = rating_row(data)
+        if row is None:
+            continue
+        movie_ids.append(movie_id_of(rating_doc))
+        values.append(row[0])
+        aspects.append(row[1])
+    return (movie_ids, np.array(values, dtype=np.float64),
+            np.array(aspects, dtype=np.int64).reshape(len(aspects), len(ASPECTS)), newest)
+
+
+def aggregate_update(aggregate):
+    """Movie document fields for one aggregate row"""
+    rating, votes = aggregate[0], aggregate[1]
+    return {
+        'sndRating': rating,
+        'sndVotes': votes,
+        'aspectScores': dict(zip(ASPECTS, aggregate[2:])),
+        'ratingsAggregatedAt': firestore.SERVER_TIMESTAMP,
+        # Bumping updatedAt lets delta page builds pick the new rating up
+        'updatedAt': firestore.SERVER_TIMESTAMP,
+    }
+
+
+def write_aggregates(db, changed, metrics):
+    """Update movie documents in batches of BATCH_LIMIT; returns (written ids, missing ids)
+
+    A batch fails as a whole when one movie was deleted meanwhile; such a
+    batch is retried document by document and the missing movies skipped.
+    """
+    written, missing = [], []
+    items = sorted(changed.items())
+    for start in range(0, len(items), BATCH_LIMIT):
+        chunk = items[start:start + BATCH_LIMIT]
+        batch = db.batch()
+        for movie_id, aggregate in chunk:
+            batch.update(db.collection('movies').document(movie_id), aggregate_update(aggregate))
+        with metrics.span('write_batch'):
+            try:
+                batch.commit()
+                written.extend(movie_id for movie_id, _ in chunk)
+                continue
+            except Exception as e:
+                if type(e).__name__ != 'NotFound':
+                    raise
+        for movie_id, aggregate in chunk:
+            try:
+                db.collection('movies').document(movie_id).update(aggregate_update(aggregate))
+                written.append(movie_id)
+            except Exception as e:
+                if type(e).__name__ != 'NotFound':
+                    raise
+                missing.append(movie_id)
+    metrics.count('movies_written', len(written))
+    return written, missing
+
+
+def run_full(db, args, metrics):
+    """Aggregate every rating document from scratch"""
+    state = load_state(args.state)
+    totals = RatingTotals()
+    newest = None
+    query = db.collection_group(RATINGS_COLLECTION).select(RATING_FIELDS).order_by(
+        firestore.FieldPath.document_id())
+
+    print(f"\nReading ratings ({args.page_size} per page)...")
+    for docs in iter_rating_pages(query, args.page_size, metrics):
+        movie_ids, values, aspects, page_newest = page_arrays(docs)
+        with metrics.span('aggregate', emit=False):
+            totals.add(movie_ids, values, aspects)
+        if page_newest and (newest is None or page_newest > newest):
+            newest = page_newest
+
+    with metrics.span('aggregate'):
+        aggregates = totals.aggregates()
+    # Movies whose last rating was deleted drop back to zero
+    for movie_id in state.get('published', {}):
+        aggregates.setdefault(movie_id, [0.0, 0] + [0] * len(ASPECTS))
+    watermark = newest.isoformat() if newest else state.get('watermark')
+    publish(db, args, metrics, totals, aggregates, state.get('published', {}), watermark)
+
+
+def run_incremental(db, args, metrics):
+    """Fold ratings written after the watermark into the stored totals"""
+    state = load_state(args.state)
+    if not state.get('watermark'):
+        print(f"ERROR: no watermark in {args.state}; run a full pass first")
+        return
+    since = parse_timestamp(state['watermark'])
+    totals = RatingTotals.from_json(state.get('totals'))
+    published = state.get('published', {})
+    query = (db.collection_group(RATINGS_COLLECTION).select(RATING_FIELDS)
+             .where('updatedAt', '>', since).order_by('updatedAt'))
+
+    print(f"\nReading ratings written after {since.isoformat()}...")
+    pages, edited, newest = [], set(), since
+    for docs in iter_rating_pages(query, args.page_size, metrics):
+        for rating_doc in docs:
+            # Created before the watermark: already counted with its old value
+            created = getattr(rating_doc, 'create_time', None)
+            if created is not None and created <= since:
+                edited.add(movie_id_of(rating_doc))
+        movie_ids, values, aspects, page_newest = page_arrays(docs)
+        pages.append((movie_ids, values, aspects))
+        if page_newest and page_newest > newest:
+            newest = page_newest
+
+    with metrics.span('aggregate'):
+        for movie_ids, values, aspects in pages:
+            keep = np.array([movie_id not in edited for movie_id in movie_ids], dtype=bool)
+            totals.add([m for m, k in zip(movie_ids, keep) if k], values[keep], aspects[keep])
+
+    # Edited ratings can't be folded in without their old values: re-read those movies
+    if edited:
+        totals.reset(edited)
+        print(f"Re-reading ratings of {len(edited)} movies with edited ratings...")
+        for movie_id in sorted(edited):
+            query = db.collection('movies').document(movie_id).collection(RATINGS_COLLECTION).select(
+                RATING_FIELDS).order_by(firestore.FieldPath.document_id())
+            for docs in iter_rating_pages(query, args.page_size, metrics):
+                movie_ids, values, aspects, _ = page_arrays(docs)
+                totals.add(movie_ids, values, aspects)
+
+    with metrics.span('aggregate'):
+        aggregates = totals.aggregates()
+    publish(db, args, metrics, totals, aggregates, published, newest.isoformat())
+
+
+def publish(db, args, metrics, totals, aggregates, published, watermark):
+    """Write aggregates that differ from the last published ones, then save the state"""
+    changed = {movie_id: aggregate for movie_id, aggregate in aggregates.items()
+               if published.get(movie_id) != aggregate}
+    written, missing = [], []
+    if changed and not args.dry_run:
+        written, missing = write_aggregates(db, changed, metrics)
+        published = dict(published)
+        published.update((movie_id, changed[movie_id]) for movie_id in written)
+        # The movie was deleted: forget it instead of retrying the write every run
+        totals.drop(missing)
+        for movie_id in missing:
+            published.pop(movie_id, None)
+    if not args.dry_run:
+        save_state(args.state, totals, published, watermark)
+    print(f"\n✓ Done! {len(aggregates)} movies aggregated, {len(changed)} changed, "
+          f"{len(written)} written, {len(missing)} missing" + (" (dry run)" if args.dry_run else ""))
+
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description="Aggregate per-user movie ratings into the movie documents.")
+    parser.add_argument('--since', action='store_true',
+                        help="Incremental: only ratings written after the watermark in the state file")
+    parser.add_argument('--state', default=AGGREGATES_PATH,
+                        help=f"Totals and watermark file (default: {AGGREGATES_PATH})")
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f"Rating documents per query (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Compute and report, but write nothing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if np is None:
+        print("ERROR: numpy is not installed (pip install numpy)")
+        return
+
+    print("Initializing Firebase...")
+    db = init_firestore()
+    if db is None:
+        return
+
+    metrics = RunMetrics()
+    try:
+        if args.since:
+            run_incremental(db, args, metrics)
+        else:
+            run_full(db, args, metrics)
+    finally:
+        metrics.print_summary()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing spans and counters for generator runs
+Every span (Firestore init, one fetched page of results, render, write,
+fsync, ...) lands in a fixed-size log-bucket histogram, so a daemon that
+runs for weeks holds the same few hundred counters per stage; coarse spans are also appended to a JSONL
+file as they finish, and the run ends with one summary record holding
+p50/p95/p99 per stage plus the counters. Per-page spans only go into the
+histograms, so a 100k page run writes a few hundred lines, not 300k.
+
+    python firebase_movie_generator.py --metrics movie_run_metrics.jsonl
+"""
+
+import os
+import json
+import math
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+METRICS_PATH = 'movie_run_metrics.jsonl'
+
+# Histogram buckets start at MIN_SECONDS and split every doubling into
+# BUCKETS_PER_DOUBLING log-spaced steps, so a percentile is within ~4.5% of
+# the true value; an hour-long span lands in bucket ~255
+MIN_SECONDS = 1e-6
+BUCKETS_PER_DOUBLING = 8
+
+
+class Histogram:
+    """Durations of one stage as counts per log-spaced bucket plus exact count/total/min/max"""
+
+    __slots__ = ('buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds):
+        """Count one duration"""
+        if seconds > MIN_SECONDS:
+            bucket = math.ceil(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_DOUBLING)
+        else:
+            bucket = 0
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct):
+        """Nearest-rank percentile: geometric middle of the bucket holding that rank, within min..max"""
+        if not self.count:
+            return 0
+        rank = max(1, min(self.count, round(pct / 100 * self.count)))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                break
+        middle = MIN_SECONDS * 2 ** ((bucket - 0.5) / BUCKETS_PER_DOUBLING)
+        return min(max(middle, self.min), self.max)
+
+
+class RunMetrics:
+    """Histograms of stage durations plus counters for one run
+
+    Safe to use from the prefetch thread and the calling thread at once.
+    With verbose=False the generators skip their per-page print.
+    """
+
+    def __init__(self, path=None, verbose=False):
+        self.path = path
+        self.verbose = verbose
+        self.spans = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+        self.started = time.perf_counter()
+        self.run_id = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S.%fZ')
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def event(self, kind, **data):
+        """Append one JSONL record"""
+        if self._file is None:
+            return
+        record = {'run': self.run_id, 'type': kind,
+                  't': round(time.perf_counter() - self.started, 6), **data}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def observe(self, name, seconds):
+        """Add one duration to a stage histogram"""
+        with self._lock:
+            self.spans[name].add(seconds)
+
+    def record(self, name, seconds, emit=True, **attrs):
+        """Add a finished span; emit=False keeps it out of the JSONL file"""
+        self.observe(name, seconds)
+        if emit:
+            self.event('span', name=name, seconds=round(seconds, 6), **attrs)
+
+    def count(self, name, value=1):
+        """Increase a counter"""
+        with self._lock:
+            self.counters[name] += value
+
+    @contextmanager
+    def span(self, name, emit=True, **attrs):
+        """Time a block; emit=False keeps per-page spans out of the JSONL file"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, emit, **attrs)
+
+    def summary(self):
+        """Stage -> {count, total, p50, p95, p99, max} in seconds"""
+        with self._lock:
+            return {
+                name: {
+                    'count': histogram.count,
+                    'total': round(histogram.total, 6),
+                    'p50': round(histogram.percentile(50), 6),
+                    'p95': round(histogram.percentile(95), 6),
+                    'p99': round(histogram.percentile(99), 6),
+                    'max': round(histogram.max, 6),
+                }
+                for name, histogram in self.spans.items()
+            }
+
+    def print_summary(self):
+        """Summary table of stages and counters"""
+        summary = self.summary()
+        elapsed = time.perf_counter() - self.started
+        print(f"\n{'stage':<16}{'count':>9}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, stats in summary.items():
+            print(f"{name:<16}{stats['count']:>9,}{stats['total']:>10.3f}{stats['p50'] * 1e3:>10.2f}"
+                  f"{stats['p95'] * 1e3:>10.2f}{stats['p99'] * 1e3:>10.2f}{stats['max'] * 1e3:>10.2f}")
+        for name, value in sorted(self.counters.items()):
+            print(f"{name:<16}{value:>9,}")
+        print(f"{'elapsed':<16}{elapsed:>19.3f}")
+
+    def close(self):
+        """Write the summary record and close the JSONL file"""
+        if self._file is None:
+            return
+        self.event('summary', elapsed=round(time.perf_counter() - self.started, 6),
+                   pid=os.getpid(), spans=self.summary(), counters=dict(self.counters))
+        self._file.close()
+        self._file = None
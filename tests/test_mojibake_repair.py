@@ -0,0 +1,58 @@
+"""Detector must repair garbled text and leave correct Cyrillic alone"""
+
+import pytest
+
+from mojibake_repair import Detector, garble, read_chunks, repair_stream, scan_file
+
+# Correct text that starts with a pair the scanner looks at
+CORRECT = [
+    'Рўйхат тайёр',
+    'Рёв мотора',
+    'Ю. Т. Рі',
+    'СМС… и «ТВ»',
+]
+
+GARBLED = [
+    'Загрузки',
+    'Продолжить просмотр с этого места?',
+    'собака и кошка',
+    'Цена: 100 ₽',
+    'oʻzbek tilida',
+]
+
+
+@pytest.mark.parametrize('text', CORRECT)
+def test_correct_text_is_left_alone(text):
+    fixed, hits = Detector().repair(text)
+    assert fixed == text
+    assert hits == {}
+
+
+@pytest.mark.parametrize('text', GARBLED)
+def test_garbled_text_is_repaired(text):
+    fixed, _ = Detector().repair(garble(text))
+    assert fixed == text
+
+
+def test_partly_repaired_words():
+    # Leftovers of the old per-letter tables: one garbled letter per word part
+    fixed, _ = Detector().repair('исРїольР·ованный РїодРїиска')
+    assert fixed == 'использованный подписка'
+
+
+def test_stream_matches_whole_text(tmp_path):
+    text = '\r\n'.join(CORRECT + [garble(line) for line in GARBLED]) * 50
+    path = tmp_path / 'mixed.html'
+    path.write_bytes(text.encode('utf-8'))
+    expected, expected_hits = Detector().repair(text)
+    for chunk_size in (1, 7, 64):
+        hits = {}
+        fixed = ''.join(repair_stream(Detector(), read_chunks(str(path), chunk_size), hits))
+        assert fixed == expected
+        assert hits == expected_hits
+
+
+def test_check_reports_line_and_column(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_bytes('\r\n'.join(CORRECT + ['<p>' + garble('Загрузки') + '</p>']).encode('utf-8'))
+    assert scan_file(str(path), Detector()) == [(5, 4, garble('Загрузки'), 'Загрузки')]
@@ -0,0 +1,109 @@
+"""Search index: folded matching, bytes a cold query fetches, and delta saves"""
+
+import random
+
+import movie_search
+from movie_catalog import percentile
+from movie_search import SearchIndex, SearchIndexBuilder, fold, synthetic_movies, typed_query
+
+
+def _fields(slug, title, original=''):
+    return {'movie_slug': slug, 'movie_id': slug, 'movie_title': title, 'movie_original_title': original}
+
+
+def _slugs(output_dir, query):
+    return [slug for slug, _, _ in SearchIndex(str(output_dir)).search(query)]
+
+
+def _build(output_dir, movies, fresh=True):
+    builder = SearchIndexBuilder(str(output_dir), fresh=fresh)
+    for fields in movies:
+        builder.upsert(fields)
+    return builder.save()
+
+
+def test_scripts_and_apostrophes_fold_together(tmp_path):
+    _build(tmp_path, [
+        _fields('otkan-kunlar', 'O‘tkan kunlar', 'Ўтган кунлар'),
+        _fields('shum-bola', 'Shum bola', 'Шум бола'),
+        _fields('kelinlar', 'Kelinlar qo‘zg‘aloni', 'Келинлар қўзғолони'),
+    ])
+    assert _slugs(tmp_path, "o'tkan") == ['otkan-kunlar']
+    assert _slugs(tmp_path, 'ўтган') == ['otkan-kunlar']
+    assert _slugs(tmp_path, 'шум') == ['shum-bola']
+    assert _slugs(tmp_path, 'qozgal') == ['kelinlar']
+
+
+def test_cold_query_fetches_a_few_kilobytes(tmp_path):
+    rng = random.Random(7)
+    titles, movies = synthetic_movies(10000, rng)
+    _build(tmp_path, movies)
+    folded = [' ' + fold(title) for title in titles]
+
+    fetched = []
+    for _ in range(200):
+        query = typed_query(rng, titles)
+        index = SearchIndex(str(tmp_path))
+        results = index.search(query)
+        fetched.append(index.bytes_loaded)
+        expected = [i for i, text in enumerate(folded) if ' ' + query in text]
+        exact = [int(movie_id) for _, movie_id, _ in results[:min(len(expected), 10)]]
+        assert len(exact) == min(len(expected), 10)
+        assert all(' ' + query in folded[number] for number in exact)
+
+    fetched.sort()
+    assert percentile(fetched, 50) < 8 * 1024
+    assert percentile(fetched, 95) < 32 * 1024
+
+
+def test_delta_save_writes_only_touched_files(tmp_path):
+    _, movies = synthetic_movies(5000, random.Random(3))
+    _build(tmp_path, movies)
+
+    builder = SearchIndexBuilder(str(tmp_path))
+    builder.remove('movie-0000000')
+    builder.upsert(_fields('zarnigor', 'Zarnigor', 'Зарнигор'))
+    stats = builder.save()
+    assert stats['docs'] == 5000
+    assert stats['written'] < 40
+
+    assert _slugs(tmp_path, 'zarni') == ['zarnigor']
+    assert 'movie-0000000' not in _slugs(tmp_path, fold(movies[0]['movie_title']).split()[0])
+
+
+def test_random_deltas_match_brute_force(tmp_path, monkeypatch):
+    # Small limits so lists page, unpage and shards split within a few hundred movies
+    monkeypatch.setattr(movie_search, 'INLINE_MAX', 6)
+    monkeypatch.setattr(movie_search, 'PAGE_RANGE', 16)
+    monkeypatch.setattr(movie_search, 'SHARD_TARGET_BYTES', 128)
+    rng = random.Random(11)
+    titles, movies = synthetic_movies(300, rng)
+    current = {}
+    for start in range(0, 300, 50):
+        builder = SearchIndexBuilder(str(tmp_path))
+        for fields in movies[start:start + 50]:
+            builder.upsert(fields)
+            current[fields['movie_slug']] = fields['movie_title']
+        for slug in rng.sample(sorted(current), 20):
+            builder.remove(slug)
+            del current[slug]
+        for slug in rng.sample(sorted(current), 10):
+            current[slug] = rng.choice(titles)
+            builder.upsert(_fields(slug, current[slug]))
+        builder.save()
+
+    # Shrink the catalog: lists move back into their shards, then the holes force a renumbering
+    for count in (25, 25, 40):
+        builder = SearchIndexBuilder(str(tmp_path))
+        for slug in rng.sample(sorted(current), count):
+            builder.remove(slug)
+            del current[slug]
+        builder.save()
+
+    index = SearchIndex(str(tmp_path))
+    words = sorted({word for title in current.values() for word in fold(title).split()})
+    for word in rng.sample(words, 60):
+        query = word[:rng.randint(2, len(word))]
+        expected = {slug for slug, title in current.items() if ' ' + query in ' ' + fold(title)}
+        found = {slug for slug, _, _ in index.search(query, limit=len(current))}
+        assert expected <= found
@@ -0,0 +1,70 @@
+import gzip
+import os
+
+from movie_sitemap import SitemapWriter, render_shard
+
+
+def _entry(key):
+    return f'https://example.com/{key}.html', '2024-05-01'
+
+
+def _urls(output_dir):
+    urls = set()
+    for name in os.listdir(output_dir):
+        if name.endswith('.xml.gz'):
+            text = gzip.decompress((output_dir / name).read_bytes()).decode('ascii')
+            urls.update(line.split('<loc>')[1].split('</loc>')[0] for line in text.splitlines() if '<loc>' in line)
+    return urls
+
+
+def test_cyrillic_slug_is_percent_encoded():
+    xml = render_shard([('https://example.com/кино-2024.html', '2024-05-01')]).decode('utf-8')
+    assert '<loc>https://example.com/%D0%BA%D0%B8%D0%BD%D0%BE-2024.html</loc>' in xml
+    assert 'кино' not in xml
+
+
+def test_encoded_and_escaped_loc_is_not_double_encoded():
+    xml = render_shard([('https://example.com/a%20b.html?x=1&y=2', None)]).decode('utf-8')
+    assert '<loc>https://example.com/a%20b.html?x=1&amp;y=2</loc>' in xml
+
+
+def test_written_shard_is_ascii(tmp_path):
+    SitemapWriter(str(tmp_path), 'https://example.com').write_all(['фильм'], _entry)
+    for name in os.listdir(tmp_path):
+        data = (tmp_path / name).read_bytes()
+        if name.endswith('.gz'):
+            data = gzip.decompress(data)
+        data.decode('ascii')
+
+
+def test_rewrite_leaves_no_temp_files(tmp_path):
+    SitemapWriter(str(tmp_path), 'https://example.com').write_all(['a', 'b', 'c'], _entry)
+    SitemapWriter(str(tmp_path), 'https://example.com').write_all(['a', 'b'], _entry)
+    assert sorted(os.listdir(tmp_path)) == ['sitemap-movies-1.xml.gz', 'sitemap-movies.xml']
+    assert oct(os.stat(tmp_path / 'sitemap-movies-1.xml.gz').st_mode & 0o777) == '0o644'
+
+
+def test_update_renders_only_the_changed_shard(tmp_path):
+    keys = {f'movie-{i}' for i in range(100)}
+    SitemapWriter(str(tmp_path), 'https://example.com', shard_fill=10).write_all(keys, _entry)
+    assert len(os.listdir(tmp_path)) == 11
+
+    # A later run: shard count and lastmods come from the index on disk
+    writer = SitemapWriter(str(tmp_path), 'https://example.com', shard_fill=10)
+    keys.add('new-movie')
+    keys.discard('movie-7')
+    written, unchanged, removed = writer.update(keys, {'new-movie', 'movie-7'}, _entry)
+    touched = {writer.shard_of('new-movie'), writer.shard_of('movie-7')}
+    assert (written, unchanged, removed) == (len(touched), 0, 0)
+    assert _urls(tmp_path) == {_entry(key)[0] for key in keys}
+
+
+def test_update_past_the_url_limit_reshards(tmp_path):
+    keys = {f'movie-{i}' for i in range(20)}
+    writer = SitemapWriter(str(tmp_path), 'https://example.com', shard_size=12, shard_fill=10)
+    writer.write_all(keys, _entry)
+    added = {f'extra-{i}' for i in range(30)}
+    keys |= added
+    writer.update(keys, added, _entry)
+    assert len(writer.lastmods) == 5
+    assert _urls(tmp_path) == {_entry(key)[0] for key in keys}
@@ -0,0 +1,58 @@
+import json
+import re
+
+import pytest
+
+from movie_template import Template, _synthetic_fields, escape_js, escape_json, render_movie_page
+
+HOSTILE_TITLE = 'Kino</script><script>alert(1)</script><!-- "x" & \u2028y\u2029z\\'
+HOSTILE_SLUG = "kino';alert(1);//\\'</script>\u2028"
+
+
+def _page(**overrides):
+    fields = _synthetic_fields(1)
+    fields.update(overrides)
+    return render_movie_page(fields)
+
+
+def _scripts(page):
+    """Bodies of the inline script blocks, as an HTML parser would split them"""
+    return [body for body in re.findall(r'<script[^>]*>(.*?)</script>', page, re.S) if body]
+
+
+def test_escape_json_keeps_script_block_closed():
+    assert escape_json('</script><!--') == '\\u003c/script\\u003e\\u003c!--'
+    assert escape_json('a & "b" \\ c') == 'a \\u0026 \\"b\\" \\\\ c'
+    assert escape_json('line\u2028para\u2029end\n') == 'line\\u2028para\\u2029end\\n'
+
+
+def test_escape_js_escapes_single_quote():
+    assert escape_js("it's") == 'it\\u0027s'
+    assert escape_js("\\'") == '\\\\\\u0027'
+
+
+def test_hostile_title_stays_inside_json_ld():
+    page = _page(movie_title=HOSTILE_TITLE, movie_description=HOSTILE_TITLE)
+    scripts = _scripts(page)
+    assert len(scripts) == 2
+    data = json.loads(scripts[0])
+    assert data['name'] == HOSTILE_TITLE
+    assert data['description'] == HOSTILE_TITLE
+    assert '\u2028' not in scripts[0] and '\u2029' not in scripts[0]
+    assert '<title>Kino&lt;/script&gt;&lt;script&gt;alert(1)&lt;/script&gt;' in page
+
+
+def test_hostile_slug_stays_a_js_string():
+    page = _page(movie_slug=HOSTILE_SLUG, movie_id="1'2")
+    script = _scripts(page)[1]
+    literal = re.search(r"const movieSlug = '([^'\n\u2028]*)';", script).group(1)
+    assert json.loads(f'"{literal}"') == HOSTILE_SLUG
+    assert "const movieId = '1\\u00272';" in script
+
+
+def test_repeated_slot_is_escaped_per_context():
+    template = Template('<p>{name}</p><script>var n = "{name|json}";</script><p>{name}</p>')
+    assert template.render({'name': '<b>'}) == (
+        '<p>&lt;b&gt;</p><script>var n = "\\u003cb\\u003e";</script><p>&lt;b&gt;</p>')
+    with pytest.raises(ValueError):
+        Template('{name|css}')
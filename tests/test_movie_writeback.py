@@ -0,0 +1,56 @@
+import pytest
+
+import movie_writeback
+from movie_writeback import DerivedFieldWriter
+
+
+class Unavailable(Exception):
+    pass
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+
+    def update(self, ref, fields):
+        pass
+
+    def commit(self):
+        self.db.commits += 1
+        if self.db.commits in self.db.failing:
+            raise Unavailable('backend down')
+
+
+class FakeDb:
+    def __init__(self, failing=()):
+        self.commits = 0
+        self.failing = set(failing)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def collection(self, name):
+        return self
+
+    def document(self, movie_id):
+        return movie_id
+
+
+def test_failed_batch_stays_pending(monkeypatch):
+    monkeypatch.setattr(movie_writeback, 'MAX_ATTEMPTS', 1)
+    writer = DerivedFieldWriter(FakeDb(failing={2}), max_rate=1e9)
+    writer.rate = lambda: 1e9
+    extra = 10
+    writer.pending = {f'm{i:05d}': {'pageHash': str(i)} for i in range(movie_writeback.BATCH_LIMIT + extra)}
+    with pytest.raises(Unavailable):
+        writer.flush()
+    assert writer.stats['written'] == movie_writeback.BATCH_LIMIT
+    assert len(writer.pending) == extra
+
+
+def test_dry_run_clears_queue():
+    writer = DerivedFieldWriter(FakeDb(), dry_run=True)
+    writer.pending = {'m1': {'pageHash': 'x'}}
+    writer.flush()
+    assert writer.pending == {}
+    assert writer.stats['written'] == 0
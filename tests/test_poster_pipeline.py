@@ -0,0 +1,80 @@
+"""Poster pipeline against a local HTTP server standing in for the poster host"""
+
+import io
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+Image = pytest.importorskip('PIL.Image')
+
+from poster_pipeline import POSTERS_DIR, PosterPipeline
+
+
+def _png(width, height):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 40, 40)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+# path -> (status, content type, body)
+RESPONSES = {
+    '/poster.png': (200, 'image/png', _png(480, 720)),
+    '/error-page.png': (200, 'text/html', b'<html><body>Service unavailable</body></html>'),
+    '/missing.png': (404, 'text/plain', b'not found'),
+}
+
+
+class PosterHost(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, content_type, body = RESPONSES.get(self.path, RESPONSES['/missing.png'])
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def host():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PosterHost)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_bad_posters_are_skipped_and_counted(host, tmp_path):
+    pipeline = PosterPipeline(str(tmp_path / 'assets'), str(tmp_path / 'cache'), workers=1)
+    urls = [f"{host}/poster.png", f"{host}/error-page.png", f"{host}/missing.png"]
+    try:
+        found = pipeline.process(urls)
+    finally:
+        pipeline.close()
+
+    assert list(found) == [f"{host}/poster.png"]
+    assert pipeline.stats['fetched'] == 2
+    assert pipeline.stats['encoded'] == 1
+    assert pipeline.stats['failed'] == 2
+    # The error page is forgotten, so the next run downloads it again
+    assert f"{host}/error-page.png" not in pipeline.urls
+    published = os.listdir(tmp_path / 'assets' / POSTERS_DIR)
+    assert sorted(name.rsplit('-', 1)[1] for name in published) == [
+        '160.jpg', '160.webp', '320.jpg', '320.webp', '480.jpg', '480.webp']
+
+
+def test_unchanged_poster_is_not_encoded_twice(host, tmp_path):
+    for run in range(2):
+        pipeline = PosterPipeline(str(tmp_path / 'assets'), str(tmp_path / 'cache'), workers=1)
+        try:
+            found = pipeline.process([f"{host}/poster.png"])
+        finally:
+            pipeline.close()
+        assert found[f"{host}/poster.png"]['srcset']
+    assert pipeline.stats['cached'] == 1
+    assert pipeline.stats['encoded'] == 0
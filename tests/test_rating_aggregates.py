@@ -0,0 +1,79 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+import rating_aggregates
+from rating_aggregates import ASPECTS, RatingTotals, publish
+
+
+class NotFound(Exception):
+    pass
+
+
+class FakeRef:
+    def __init__(self, db, movie_id):
+        self.db = db
+        self.movie_id = movie_id
+
+    def update(self, fields):
+        if self.movie_id in self.db.deleted:
+            raise NotFound(self.movie_id)
+        self.db.updates.append(self.movie_id)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.refs = []
+
+    def update(self, ref, fields):
+        self.refs.append(ref)
+
+    def commit(self):
+        for ref in self.refs:
+            if ref.movie_id in self.db.deleted:
+                raise NotFound(ref.movie_id)
+        self.db.updates.extend(ref.movie_id for ref in self.refs)
+
+
+class FakeDb:
+    def __init__(self, deleted=()):
+        self.deleted = set(deleted)
+        self.updates = []
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def collection(self, name):
+        return self
+
+    def document(self, movie_id):
+        return FakeRef(self, movie_id)
+
+
+def _totals(ratings):
+    totals = RatingTotals()
+    movie_ids = [movie_id for movie_id, _ in ratings]
+    values = np.array([value for _, value in ratings], dtype=np.float64)
+    totals.add(movie_ids, values, np.zeros((len(ratings), len(ASPECTS))))
+    return totals
+
+
+def test_deleted_movie_is_dropped_not_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(rating_aggregates, 'firestore', SimpleNamespace(SERVER_TIMESTAMP=object()))
+    args = SimpleNamespace(state=str(tmp_path / 'state.json'), dry_run=False)
+    metrics = rating_aggregates.RunMetrics()
+    db = FakeDb(deleted={'gone'})
+    totals = _totals([('kept', 8), ('gone', 6), ('kept', 10)])
+
+    publish(db, args, metrics, totals, totals.aggregates(), {}, '2024-05-01T00:00:00+00:00')
+    assert db.updates == ['kept']
+    state = json.loads((tmp_path / 'state.json').read_text())
+    assert set(state['totals']) == set(state['published']) == {'kept'}
+
+    # The next run starts from the saved state and has nothing left to write
+    db.updates = []
+    totals = RatingTotals.from_json(state['totals'])
+    publish(db, args, metrics, totals, totals.aggregates(), state['published'], state['watermark'])
+    assert db.updates == []
@@ -0,0 +1,37 @@
+import random
+
+from movie_catalog import percentile
+from run_metrics import RunMetrics
+
+
+def test_percentiles_close_to_exact():
+    rng = random.Random(5)
+    values = [rng.lognormvariate(-6, 1.5) for _ in range(20000)]
+    metrics = RunMetrics()
+    for value in values:
+        metrics.observe('render', value)
+
+    stats = metrics.summary()['render']
+    values.sort()
+    assert stats['count'] == len(values)
+    assert abs(stats['total'] - round(sum(values), 6)) < 1e-5
+    assert stats['max'] == round(values[-1], 6)
+    for pct in (50, 95, 99):
+        assert abs(stats[f'p{pct}'] - percentile(values, pct)) <= 0.05 * percentile(values, pct)
+
+
+def test_memory_stays_flat_over_a_long_run():
+    metrics = RunMetrics()
+    rng = random.Random(9)
+    for _ in range(200000):
+        metrics.observe('write', rng.uniform(1e-5, 2.0))
+    assert len(metrics.spans['write'].buckets) < 200
+
+
+def test_tiny_and_single_values():
+    metrics = RunMetrics()
+    metrics.observe('fsync', 0.0)
+    metrics.observe('init', 0.25)
+    summary = metrics.summary()
+    assert summary['fsync']['p99'] == 0.0
+    assert summary['init']['p50'] == summary['init']['max'] == 0.25